@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -85,6 +87,17 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # readers don't block the writer, so several job runners can share the file
+            "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL",
+            "timeout": 30,  # seconds to wait for the write lock instead of failing
+            # take the write lock when a transaction starts, a lock upgrade
+            # mid-transaction fails right away with "database is locked"
+            "transaction_mode": "IMMEDIATE",
+        },
+        # a file rather than shared-cache memory, whose table locks fail at
+        # once, so that tests of concurrent job runners wait like they do
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
@@ -137,3 +150,104 @@ DJJP = {
     "scheduler_interval": 10,  # the interval in seconds for scheduler to run
     "stuck_jobs_requeue_interval": 60,  # the interval in seconds for resetting stuck jobs
 }
+
+JOB_RUNNER = {
+    "mode": "threads",  # `threads`: the DJJP consumer, `asyncio`: common.jobs.async_runner
+    "batch_size": 50,  # resources per pipeline in `threads` mode, 1: one per resource
+    "max_pipelines": 256,  # resources processed at once in `asyncio` mode
+    "poll_interval": 2,  # seconds between looks for new resources when idle
+    "claim_batch_size": 32,  # new resources claimed per poll in `asyncio` mode
+    "stale_claim_seconds": 900,  # claims not renewed for this long are taken over
+    "workers": os.cpu_count() or 1,  # processes started by `start_job_runners`
+    "concurrency": {  # jobs of each type in flight in `asyncio` mode
+        "jina_reader": 32,
+        "pdf_extraction": 4,
+        "chunk": 8,
+        "embed": 4,
+        "rag": 8,
+        "index": 1,
+    },
+}
+
+VECTOR_STORE_DIR = BASE_DIR / "vector_store"  # per-project memory-mapped embeddings
+VECTOR_STORE_COMPACT_RATIO = 0.25  # compact once this share of vectors is deleted
+
+ANN_INDEX = {
+    "nprobe": 8,  # clusters scanned per query by the IVF index
+    "min_train_size": 5000,  # below this many vectors brute force is used
+    "retrain_growth": 4,  # retrain centroids once the store grew this many times
+}
+
+CONFIG_CACHE_TTL = 30  # seconds a resolved project config is reused
+
+OLLAMA_BASE_URL = "http://localhost:11434"
+
+CHAT_PROMPT = {  # what goes into a chat prompt, within the model's context window
+    "retrieve_k": 20,  # chunks retrieved per question, packed best first
+    "history_share": 0.5,  # at most this much of the budget left goes to past turns
+}
+
+TUI = {
+    "resources_page_size": 50,  # resources loaded at a time into the lists
+}
+
+RESPONSE_CACHE = {  # chat answers reused for the same question and context
+    "enabled": True,
+    "max_age": 7 * 24 * 3600,  # seconds an answer is reused
+    "max_entries": 1000,  # per project, least recently used are evicted past this
+    "similarity": 0.95,  # cosine between questions to match, None for exact only
+}
+
+JINA_READER_URL = "https://r.jina.ai"
+
+CONTENT_STORE_DIR = BASE_DIR / "content_store"  # extracted text of resources
+CONTENT_FRAME_SIZE = 32 * 1024  # characters per compressed frame, read as a unit
+
+CONTENT_CACHE = {
+    "dir": BASE_DIR / "content_cache",  # deduplicated blobs of extracted text
+    "max_bytes": 2 * 1024**3,  # least recently used entries are evicted past this
+    "max_age": 7 * 24 * 3600,  # seconds before an entry is revalidated
+}
+
+HTTP_CLIENT = {
+    "connect_timeout": 5,  # seconds to establish a connection
+    "read_timeout": 60,  # seconds to wait for response data
+    "max_connections": 100,  # pooled connections per process
+    "max_keepalive_connections": 20,  # idle connections kept open for reuse
+    "per_host_concurrency": 32,  # in-flight requests per host
+}
+
+# token buckets shared by all job runners, keyed by `common.constants.Provider`
+RATE_LIMITS = {
+    "Jina AI": {"rate": 200 / 60, "burst": 10},  # requests per second, and at once
+    "Ollama": {"rate": 20, "burst": 20},
+}
+
+API_RETRY = {  # for 429, 5xx and connection errors of provider APIs
+    "max_attempts": 5,
+    "base_delay": 1,  # seconds, doubled on each attempt and jittered
+    "max_delay": 60,  # seconds, unless the response's Retry-After asks for more
+}
+
+METRICS = {
+    "enabled": True,  # record a `StageMetricRow` per pipeline stage run
+    "prometheus": False,  # serve the metrics in Prometheus text format at /metrics
+    "window_hours": 24,  # percentiles are over the stage runs of this many hours
+}
+
+ARXIV = {
+    "dir": BASE_DIR / "papers" / "content",  # downloaded PDFs, named <id>v<version>.pdf
+    "page_size": 100,  # search results fetched per API request
+    "delay_seconds": 3,  # between API requests, as asked by arXiv
+    "concurrency": 4,  # PDFs downloaded in parallel
+    "chunk_size": 64 * 1024,  # bytes written to disk at a time
+}
+
+PDF_EXTRACTION = {
+    "dir": BASE_DIR / "pdf_downloads",  # PDFs fetched for extraction
+    "processes": None,  # worker processes, defaults to the number of cores
+    "pages_per_task": 4,  # pages extracted per task sent to a worker
+}
+
+# unix sockets of processes (e.g. the TUI) listening for resource/event changes
+CHANGE_NOTIFICATIONS_DIR = Path(tempfile.gettempdir()) / "critical-reader-changes"
@@ -14,9 +14,15 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 
+from common import views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 ]
+
+if settings.METRICS['prometheus']:
+    urlpatterns.append(path('metrics', views.metrics, name='metrics'))
@@ -2,6 +2,7 @@ from django.contrib import admin
 
 
 from .models import (
+    ChunkRow,
     ResourceRow,
     ProjectRow,
     ReadingPalChat,
@@ -18,6 +19,11 @@ class ResourceTableAdmin(admin.ModelAdmin):
     list_display = ("status", "url", "date_created", "date_updated")
 
 
+@admin.register(ChunkRow)
+class ChunkTableAdmin(admin.ModelAdmin):
+    list_display = ("resource", "index", "start", "end", "date_created")
+
+
 @admin.register(ProjectRow)
 class ProjectTableAdmin(admin.ModelAdmin):
     list_display = (
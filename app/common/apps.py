@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from common import signals  # noqa: F401
+        from common.metrics import install_query_timer
+
+        connection_created.connect(install_query_timer)
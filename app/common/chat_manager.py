@@ -2,16 +2,22 @@ from typing import Self
 from dataclasses import dataclass
 from datetime import datetime
 
+from asgiref.sync import sync_to_async
 from django_llm_chat.chat import Chat
 
 from tui.models import AppState
 
 from .models import ReadingPalChat
-from configuration.models import ProjectConfigRow
+from configuration.models import LLMModel, ProjectConfigRow
+from common.constants import ChangeKind
 from common.models import EventLogRows
+from common.notifications import publish
 
 
 UI_ID_PREFIX = "chat-list-item"
+SYSTEM_PROMPT = (
+    "You are a helpful companion. Your job is to help me undersand what I'm reading."
+)
 
 
 @dataclass
@@ -34,12 +40,21 @@ class ChatManager:
     @classmethod
     async def aget_all_for_project(cls, project_id: int):
         async for c in ReadingPalChat.aget_all(project_id):
-            yield ChatSummary(
-                id=c.id,
-                name=c.name,
-                last_update=c.date_updated,
-                id_for_ui=f"{UI_ID_PREFIX}-{c.id}",
-            )
+            yield cls.make_summary(c)
+
+    @classmethod
+    async def aget_by_ids(cls, project_id: int, chat_ids: list[int]):
+        async for c in ReadingPalChat.aget_by_ids(project_id, chat_ids):
+            yield cls.make_summary(c)
+
+    @classmethod
+    def make_summary(cls, c: ReadingPalChat) -> ChatSummary:
+        return ChatSummary(
+            id=c.id,
+            name=c.name,
+            last_update=c.date_updated,
+            id_for_ui=f"{UI_ID_PREFIX}-{c.id}",
+        )
 
     @classmethod
     async def aget_by_ui_id(cls, id_for_ui: str):
@@ -56,15 +71,14 @@ class ChatManager:
         res = await ReadingPalChat.acreate(project_id, djllm_chat.chat_db_model)
         await res.aadd_id_for_ui(f"{UI_ID_PREFIX}-{res.id}")
 
-        await djllm_chat.acreate_system_message(
-            "You are a helpful companion. Your job is to help me undersand what I'm reading."
-        )
+        await djllm_chat.acreate_system_message(SYSTEM_PROMPT)
 
         await EventLogRows.acreate(
             project_id=project_id,
             type=EventLogRows.EventType.CHAT_CREATED,
             entity_id=res.id,
         )
+        publish(ChangeKind.CHAT, project_id, [res.id])
         return cls(res, djllm_chat)
 
     async def aadd_user_msg(self, user_msg: str):
@@ -79,3 +93,16 @@ class ChatManager:
             chat_id=AppState.active_chat.id, user_msg=user_msg
         )
         return res
+
+    @classmethod
+    async def allm_model(cls, project_id: int) -> LLMModel:
+        """The LLM configured for the project, e.g. `ollama_chat/qwen3:4b`."""
+        conf = await ProjectConfigRow.aget_config(project_id)
+        assert conf
+        return conf.llm_model
+
+    @classmethod
+    async def asave_exchange(cls, djllm_chat: Chat, question: str, answer: str):
+        """Keep a streamed question and answer in the chat's history."""
+        await sync_to_async(djllm_chat.create_user_message)(text=question)
+        await sync_to_async(djllm_chat.create_assistant_message)(text=answer)
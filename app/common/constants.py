@@ -1,6 +1,8 @@
 class Provider:
     JINA = "Jina AI"
     OLLAMA = "Ollama"
+    FAKE = "Fake"
+    PYPDF2 = "PyPDF2"
 
 
 class JINA_AI_MODELS:
@@ -12,9 +14,18 @@ class JINA_AI_MODELS:
         return [cls.READER_LM_V2]
 
 
+class FAKE_MODELS:
+    HASHING_EMBEDDINGS = "hashing-embeddings"
+
+
+class PDF_MODELS:
+    PYPDF2_TEXT = "PyPDF2 text extraction"
+
+
 class DownloaderType:
     WEB_PAGE_SCRAPER = "Web page scraper"
     JINA_AI_READER_USING_JINA_API = "Jina AI reader using Jina API"
+    PDF_FILE = "PDF file"
 
 
 class ResourceStatus:
@@ -23,6 +34,16 @@ class ResourceStatus:
     SCRAPED = "Scraped"
     ERROR = "Error"
     PROCESSED = "Processed"
+    RETRYING = "Retrying"
+
+
+class Stage:
+    PLAN = "plan"
+    EXTRACT = "extract"
+    CHUNK = "chunk"
+    EMBED = "embed"
+    RAG = "rag"
+    INDEX = "index"
 
 
 class ChunkerType:
@@ -32,6 +53,7 @@ class ChunkerType:
 
 class ProcessorType:
     SIMPLE_RAG = "Simple RAG"
+    IVF_RAG = "IVF RAG"
 
 
 class EventTypes:
@@ -39,6 +61,22 @@ class EventTypes:
     RESOURCE_ADDED = "Resource added"
     RESOURCE_PROCESSING_STARTED = "Resource processing started"
     RESOURCE_PROCESSING_ENCOUNTERED_ERROR = "Resource processing encountered error"
+    RESOURCE_PROCESSING_RETRYING = "Resource processing retrying"
     RESOURCE_DOWNLOADED_AND_TEXT_EXTRACTED = "Resource downloaded and text extracted"
+    RESOURCE_CHUNKED = "Resource chunked"
+    RESOURCE_EMBEDDED = "Resource embedded"
     RESOURCE_PROCESSED = "Resource processed"
+    RESOURCE_INDEXED = "Resource indexed"
     CHAT_CREATED = "Chat created"
+
+
+class ChangeKind:
+    RESOURCE = "resource"
+    EVENT = "event"
+    CHAT = "chat"
+
+
+class CompressionCodec:
+    NONE = "none"
+    ZLIB = "zlib"
+    ZSTD = "zstd"
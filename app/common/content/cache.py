@@ -0,0 +1,162 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from common.models import ContentCacheRow, ContentCacheUsageRow
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of `url` so trivially different spellings share an entry."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+@dataclass
+class ContentCache:
+    """On-disk cache of extracted text keyed by URL, extractor and model.
+
+    Blobs are stored once per content hash, so the same text reached through
+    different URLs or extractors shares storage. Entries younger than
+    `max_age` are served without a request; older ones are revalidated with
+    their ETag/Last-Modified validators. Least recently used entries are
+    evicted once the blobs exceed `max_bytes`.
+    """
+
+    root: Path = field(default_factory=lambda: Path(settings.CONTENT_CACHE["dir"]))
+    max_bytes: int = field(default_factory=lambda: settings.CONTENT_CACHE["max_bytes"])
+    max_age: timedelta = field(
+        default_factory=lambda: timedelta(seconds=settings.CONTENT_CACHE["max_age"])
+    )
+
+    @staticmethod
+    def make_key(url: str, extractor: str, model_name: str) -> str:
+        raw = "\n".join([normalize_url(url), extractor, model_name])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def get(self, url: str, extractor: str, model_name: str) -> ContentCacheRow | None:
+        entry = ContentCacheRow.get_by_key(self.make_key(url, extractor, model_name))
+        if not entry:
+            return
+        if not self.blob_path(entry.content_hash).exists():
+            self.drop(entry)
+            return
+        entry.date_accessed = timezone.now()
+        entry.save(update_fields=["date_accessed"])
+        return entry
+
+    def is_fresh(self, entry: ContentCacheRow) -> bool:
+        return timezone.now() - entry.date_fetched < self.max_age
+
+    def conditional_headers(self, entry: ContentCacheRow | None) -> dict:
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def read(self, entry: ContentCacheRow) -> str:
+        return self.blob_path(entry.content_hash).read_text(encoding="utf-8")
+
+    def mark_revalidated(self, entry: ContentCacheRow):
+        entry.date_fetched = timezone.now()
+        entry.save(update_fields=["date_fetched"])
+
+    def put(
+        self,
+        url: str,
+        extractor: str,
+        model_name: str,
+        content: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> ContentCacheRow:
+        data = content.encode("utf-8")
+        digest = content_hash(data)
+        path = self.blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+        key = self.make_key(url, extractor, model_name)
+        now = timezone.now()
+        with transaction.atomic():
+            previous = ContentCacheRow.get_by_key(key)
+            entry, _ = ContentCacheRow.objects.update_or_create(
+                key=key,
+                defaults={
+                    "url": normalize_url(url),
+                    "extractor": extractor,
+                    "model_name": model_name,
+                    "content_hash": digest,
+                    "size": len(data),
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "date_fetched": now,
+                    "date_accessed": now,
+                },
+            )
+            replaced = previous and previous.content_hash != digest
+            if (not previous or replaced) and not ContentCacheRow.is_shared(
+                digest, entry.id
+            ):
+                ContentCacheUsageRow.add(len(data))
+            orphaned = replaced and not ContentCacheRow.is_shared(
+                previous.content_hash, entry.id
+            )
+            if orphaned:
+                ContentCacheUsageRow.add(-previous.size)
+        if orphaned:
+            self.blob_path(previous.content_hash).unlink(missing_ok=True)
+        self.evict()
+        return entry
+
+    def drop(self, entry: ContentCacheRow) -> int:
+        """Delete `entry`, and its blob unless shared; return the bytes freed."""
+        with transaction.atomic():
+            entry.delete()
+            freed = (
+                0 if ContentCacheRow.is_shared(entry.content_hash, 0) else entry.size
+            )
+            ContentCacheUsageRow.add(-freed)
+        if freed:
+            self.blob_path(entry.content_hash).unlink(missing_ok=True)
+        return freed
+
+    def evict(self):
+        """Drop least recently used entries, a page at a time, until the
+        running total is within `max_bytes`."""
+        total = ContentCacheUsageRow.total()
+        while total > self.max_bytes:
+            oldest = list(ContentCacheRow.objects.order_by("date_accessed")[:100])
+            if not oldest:
+                return
+            for entry in oldest:
+                if total <= self.max_bytes:
+                    return
+                total -= self.drop(entry)
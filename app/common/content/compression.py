@@ -0,0 +1,37 @@
+import zlib
+
+from common.constants import CompressionCodec
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is always available
+    zstandard = None
+
+
+def compress(codec: str, level: int, data: bytes) -> bytes:
+    if codec == CompressionCodec.NONE:
+        return data
+    if codec == CompressionCodec.ZLIB:
+        return zlib.compress(data, level)
+    if codec == CompressionCodec.ZSTD:
+        return require_zstd().ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == CompressionCodec.NONE:
+        return data
+    if codec == CompressionCodec.ZLIB:
+        return zlib.decompress(data)
+    if codec == CompressionCodec.ZSTD:
+        return require_zstd().ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def require_zstd():
+    if zstandard is None:
+        raise ValueError(
+            "The zstd codec needs the `zstandard` package, "
+            "installed with the `zstd` extra: pip install 'critical-reader[zstd]'"
+        )
+    return zstandard
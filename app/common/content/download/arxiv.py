@@ -1,41 +1,167 @@
-import arxiv
 import re
-import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
 
-from common.utils import make_raw_content_filename
+from django.conf import settings
 
+from common.http_client import HttpClient
 
-def search_arxiv(search_term: str):
+if TYPE_CHECKING:
+    import arxiv
+
+VERSIONED_ID = re.compile(r"^(?P<id>.+?)v(?P<version>\d+)$")
+
+
+@dataclass(frozen=True)
+class ArxivPaper:
+    id: str  # without version, e.g. 2401.01234 or cs/0112017
+    version: int
+    title: str
+    summary: str
+    published_date: datetime
+
+    @property
+    def versioned_id(self) -> str:
+        return f"{self.id}v{self.version}"
+
+    @property
+    def pdf_url(self) -> str:
+        return f"https://arxiv.org/pdf/{self.versioned_id}"
+
+    @property
+    def pdf_download_url(self) -> str:
+        return f"https://export.arxiv.org/pdf/{self.versioned_id}"
+
+    @property
+    def filename(self) -> str:
+        return f"{self.versioned_id.replace('/', '_')}.pdf"
+
+
+class DownloadStatus:
+    DOWNLOADED = "downloaded"
+    RESUMED = "resumed"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class DownloadResult:
+    paper: ArxivPaper
+    path: Path | None
+    status: str  # one of DownloadStatus
+    error: str = ""
+
+
+def to_paper(result: "arxiv.Result") -> ArxivPaper:
+    match = VERSIONED_ID.match(result.get_short_id())
+    assert match, result.entry_id
+    return ArxivPaper(
+        id=match["id"],
+        version=int(match["version"]),
+        title=result.title,
+        summary=result.summary,
+        published_date=result.published,
+    )
+
+
+def search_arxiv(
+    search_term: str, max_results: int | None = None
+) -> Iterator[ArxivPaper]:
+    """Lazily page through the results, one API request per `page_size` papers."""
+    import arxiv  # slow, and the PDF jobs only need `local_pdf_path`
+
+    conf = settings.ARXIV
+    client = arxiv.Client(
+        page_size=conf["page_size"], delay_seconds=conf["delay_seconds"]
+    )
     search = arxiv.Search(
-        query="cat:cs.AI", max_results=100, sort_by=arxiv.SortCriterion.SubmittedDate
+        query=search_term,
+        max_results=max_results,
+        sort_by=arxiv.SortCriterion.SubmittedDate,
     )
-    search_result = list(search.results())
-    return search_result
-
-
-def process_search_results(search_result):
-    dataset = []
-    for p in search_result:
-        paper_dict = {}
-        for l in p.links:
-            if "pdf" in l.href:
-                paper_dict["pdf_url"] = l.href
-        if not paper_dict.get("pdf_url"):
-            raise ValueError()
-        paper_dict["id"] = p.entry_id
-        paper_dict["pdf_url_cleaned"] = re.sub(r"v\d+$", "", paper_dict["pdf_url"])
-        paper_dict["published_date"] = p.published
-        paper_dict["title"] = p.title
-        paper_dict["summary"] = p.summary
-        paper_dict["pdf_download_url"] = (
-            "https://export." + paper_dict["pdf_url_cleaned"].split("://")[-1]
-        )
-        dataset.append(paper_dict)
-    return dataset
-
-
-def download_and_(papers):
-    for p in papers:
-        r = requests.get(p["pdf_download_url"])
-        with open(f"{make_raw_content_filename(p)}", "wb") as f:
-            f.write(r.content)
+    for result in client.results(search):
+        yield to_paper(result)
+
+
+def find_downloaded(root: Path, paper: ArxivPaper) -> Path | None:
+    """The file of this paper, or of a newer version of it, if already downloaded."""
+    prefix = paper.id.replace("/", "_")
+    for path in root.glob(f"{prefix}v*.pdf"):
+        match = VERSIONED_ID.match(path.stem)
+        if match and match["id"] == prefix and int(match["version"]) >= paper.version:
+            return path
+
+
+def local_pdf_path(url: str) -> Path | None:
+    """The downloaded file of an arXiv PDF url, if it was downloaded."""
+    prefix = "https://arxiv.org/pdf/"
+    if not url.startswith(prefix):
+        return
+    match = VERSIONED_ID.match(url.removeprefix(prefix))
+    if not match:
+        return
+    path = Path(settings.ARXIV["dir"]) / f"{match[0].replace('/', '_')}.pdf"
+    return path if path.exists() else None
+
+
+def download_paper(paper: ArxivPaper, root: Path) -> DownloadResult:
+    """Stream the PDF to disk, continuing a partial download if there is one."""
+    existing = find_downloaded(root, paper)
+    if existing:
+        return DownloadResult(paper, existing, DownloadStatus.SKIPPED)
+
+    path = root / paper.filename
+    part = path.with_name(path.name + ".part")
+    offset = part.stat().st_size if part.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    try:
+        with HttpClient.get().stream(
+            "GET", paper.pdf_download_url, headers=headers, follow_redirects=True
+        ) as resp:
+            if resp.status_code == 416:  # the partial file is already complete
+                pass
+            elif resp.status_code in (200, 206):
+                if resp.status_code == 200:
+                    offset = 0  # the server ignored the range, start over
+                with open(part, "ab" if offset else "wb") as f:
+                    for chunk in resp.iter_bytes(settings.ARXIV["chunk_size"]):
+                        f.write(chunk)
+            else:
+                return DownloadResult(
+                    paper, None, DownloadStatus.FAILED, f"HTTP {resp.status_code}"
+                )
+    except Exception as e:
+        return DownloadResult(paper, None, DownloadStatus.FAILED, repr(e))
+
+    part.rename(path)
+    status = DownloadStatus.RESUMED if offset else DownloadStatus.DOWNLOADED
+    return DownloadResult(paper, path, status)
+
+
+def download_papers(
+    papers: Iterable[ArxivPaper],
+    root: Path | None = None,
+    concurrency: int | None = None,
+) -> Iterator[DownloadResult]:
+    """Download papers with a bounded pool, yielding results as they finish.
+
+    `papers` is consumed lazily: at most `concurrency` downloads are in flight
+    and only a few more search results are held in memory.
+    """
+    root = Path(root or settings.ARXIV["dir"])
+    root.mkdir(parents=True, exist_ok=True)
+    concurrency = concurrency or settings.ARXIV["concurrency"]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = set()
+        for paper in papers:
+            pending.add(pool.submit(download_paper, paper, root))
+            if len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (f.result() for f in done)
+        for f in pending:
+            yield f.result()
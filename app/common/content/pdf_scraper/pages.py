@@ -0,0 +1,59 @@
+"""Page text extraction fanned out over a pool of worker processes.
+
+Kept free of Django imports: the worker processes only import this module.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+PAGE_SEPARATOR = "\n"
+
+_pool: ProcessPoolExecutor | None = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def get_pool(processes: int | None = None) -> ProcessPoolExecutor:
+    """Process-wide pool, shared by all the extraction jobs of this process."""
+    global _pool, _pool_size
+    processes = processes or os.cpu_count() or 1
+    with _pool_lock:
+        if _pool is None or _pool_size != processes:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: forking a process running threaded jobs is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_size = processes
+        return _pool
+
+
+def count_pages(path: str) -> int:
+    import PyPDF2  # imported when a PDF is read, not by every job runner
+
+    return len(PyPDF2.PdfReader(path).pages)
+
+
+def extract_page_range(path: str, start: int, stop: int) -> list[str]:
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_page_texts(
+    path: str, processes: int | None = None, pages_per_task: int = 4
+) -> Iterator[str]:
+    """Yield the text of every page, in order, as soon as it is extracted."""
+    path = str(path)
+    num_pages = count_pages(path)
+    starts = range(0, num_pages, pages_per_task)
+    stops = [min(s + pages_per_task, num_pages) for s in starts]
+    for texts in get_pool(processes).map(
+        extract_page_range, [path] * len(starts), starts, stops
+    ):
+        yield from texts
@@ -0,0 +1,316 @@
+import bisect
+import io
+import json
+import os
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, TextIO
+
+from django.conf import settings
+
+from common.constants import CompressionCodec
+from common.content.compression import compress, decompress
+
+if TYPE_CHECKING:
+    from common.models import Chunk
+
+FRAMES_MAGIC = b"CRF1"
+FOOTER = struct.Struct("<Q")  # offset of the frame index
+
+
+class FramedWriter:
+    """Writes text as independently compressed frames followed by their index.
+
+    Each index entry is `[char_start, char_end, byte_offset, byte_length]`,
+    which lets a reader inflate only the frames covering a character range.
+    """
+
+    def __init__(self, f, codec: str, level: int, frame_size: int, split: bool = True):
+        self.f = f
+        self.codec = codec
+        self.level = level
+        self.frame_size = frame_size
+        self.split = split  # cut frames every `frame_size` characters
+        self.buffer: list[str] = []
+        self.buffered = 0
+        self.chars = 0
+        self.frames: list[list[int]] = []
+        self.f.write(FRAMES_MAGIC)
+
+    def write(self, text: str):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.split and self.buffered >= self.frame_size:
+            pending = "".join(self.buffer)
+            self.buffer, self.buffered = [], 0
+            for start in range(0, len(pending), self.frame_size):
+                part = pending[start : start + self.frame_size]
+                if len(part) == self.frame_size:
+                    self._write_frame(part)
+                else:
+                    self.buffer, self.buffered = [part], len(part)
+
+    def end_frame(self):
+        if self.buffered:
+            self._write_frame("".join(self.buffer))
+            self.buffer, self.buffered = [], 0
+
+    def _write_frame(self, text: str):
+        data = compress(self.codec, self.level, text.encode("utf-8"))
+        self.frames.append(
+            [self.chars, self.chars + len(text), self.f.tell(), len(data)]
+        )
+        self.f.write(data)
+        self.chars += len(text)
+
+    def close(self):
+        self.end_frame()
+        index_offset = self.f.tell()
+        self.f.write(json.dumps({"codec": self.codec, "frames": self.frames}).encode())
+        self.f.write(FOOTER.pack(index_offset))
+
+
+class FramedReader:
+    def __init__(self, path: Path):
+        self.f = open(path, "rb")
+        self.f.seek(-FOOTER.size, os.SEEK_END)
+        footer_offset = self.f.tell()
+        (index_offset,) = FOOTER.unpack(self.f.read(FOOTER.size))
+        self.f.seek(index_offset)
+        index = json.loads(self.f.read(footer_offset - index_offset))
+        self.codec: str = index["codec"]
+        self.frames: list[list[int]] = index["frames"]
+        self.starts = [fr[0] for fr in self.frames]
+
+    def frame(self, i: int) -> str:
+        _, _, offset, length = self.frames[i]
+        self.f.seek(offset)
+        return decompress(self.codec, self.f.read(length)).decode("utf-8")
+
+    def iter_frames(self) -> Iterator[str]:
+        for i in range(len(self.frames)):
+            yield self.frame(i)
+
+    def read_ranges(self, ranges: Iterable[tuple[int, int]]) -> list[str]:
+        """Slices of the text, inflating only the frames they overlap."""
+        cache: dict[int, str] = {}
+        result = []
+        for start, end in ranges:
+            parts = []
+            i = max(bisect.bisect_right(self.starts, start) - 1, 0)
+            while i < len(self.frames) and self.frames[i][0] < end:
+                if i not in cache:
+                    cache[i] = self.frame(i)
+                frame_start = self.frames[i][0]
+                parts.append(cache[i][max(start - frame_start, 0) : end - frame_start])
+                i += 1
+            result.append("".join(parts))
+        return result
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ContentStore:
+    """Extracted text of resources, kept in files rather than in the database.
+
+    Rows stay small, so listing resources never loads their text, and the
+    text itself can be streamed instead of read in one piece. Text is stored
+    as a plain `.txt` file, or with a codec as compressed frames (`.frames`)
+    so that one chunk can be read without inflating the whole document.
+    """
+
+    def __init__(
+        self,
+        root: Path | str | None = None,
+        codec: str = CompressionCodec.NONE,
+        level: int = 0,
+    ):
+        self.root = Path(root or settings.CONTENT_STORE_DIR)
+        self.codec = codec
+        self.level = level
+        self.frame_size = settings.CONTENT_FRAME_SIZE
+
+    @classmethod
+    def for_project(cls, project_id: int) -> "ContentStore":
+        """A store writing with the compression configured for the project."""
+        from configuration.models import ProjectConfigRow
+
+        config = ProjectConfigRow.get_config(project_id)
+        if not config:
+            return cls()
+        return cls(codec=config.compression.codec, level=config.compression.level)
+
+    def path(self, project_id: int, resource_id: int) -> Path:
+        return self.root / f"project-{project_id}" / f"{resource_id}.txt"
+
+    def frames_path(self, project_id: int, resource_id: int) -> Path:
+        return self.path(project_id, resource_id).with_suffix(".frames")
+
+    def stored_path(self, project_id: int, resource_id: int) -> Path | None:
+        for path in (
+            self.frames_path(project_id, resource_id),
+            self.path(project_id, resource_id),
+        ):
+            if path.exists():
+                return path
+
+    @contextmanager
+    def writer(
+        self, project_id: int, resource_id: int, boundaries: bool = False
+    ) -> Iterator[TextIO | FramedWriter]:
+        """File to write the content to, replacing the stored one only on success.
+
+        With `boundaries`, frames are only cut by `end_frame()` calls, e.g. at
+        chunk ends.
+        """
+        framed = self.codec != CompressionCodec.NONE
+        path = (
+            self.frames_path(project_id, resource_id)
+            if framed
+            else self.path(project_id, resource_id)
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            if framed:
+                with open(tmp, "wb") as f:
+                    w = FramedWriter(
+                        f, self.codec, self.level, self.frame_size, not boundaries
+                    )
+                    yield w
+                    w.close()
+            else:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    yield f
+            tmp.replace(path)
+            # drop the copy in the other format
+            other = (
+                self.path(project_id, resource_id)
+                if framed
+                else self.frames_path(project_id, resource_id)
+            )
+            other.unlink(missing_ok=True)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def write(self, project_id: int, resource_id: int, content: str):
+        with self.writer(project_id, resource_id) as f:
+            f.write(content)
+
+    def write_aligned(
+        self, project_id: int, resource_id: int, content: str, ends: Iterable[int]
+    ):
+        """Write `content` cutting frames only at `ends` (e.g. chunk ends).
+
+        A frame spans as many whole chunks as fit in about `frame_size`
+        characters, so a chunk is always read from a single frame.
+        """
+        with self.writer(project_id, resource_id, boundaries=True) as f:
+            start = 0
+            frame_start = 0
+            for end in ends:
+                f.write(content[start:end])
+                start = end
+                if isinstance(f, FramedWriter) and end - frame_start >= self.frame_size:
+                    f.end_frame()
+                    frame_start = end
+            f.write(content[start:])
+
+    def iter_write_chunks(
+        self, f: TextIO | FramedWriter, chunks: Iterable[tuple["Chunk", str]]
+    ) -> Iterator["Chunk"]:
+        """Write each chunk's text to `f`, from `writer(boundaries=True)`, as
+        the chunks are consumed, cutting frames like `write_aligned`."""
+        frame_start = 0
+        for c, text in chunks:
+            f.write(text)
+            if isinstance(f, FramedWriter) and c.end - frame_start >= self.frame_size:
+                f.end_frame()
+                frame_start = c.end
+            yield c
+
+    def open(self, project_id: int, resource_id: int) -> TextIO | None:
+        """Streaming reader of the content, inflating one frame at a time."""
+        path = self.stored_path(project_id, resource_id)
+        if path is None:
+            return None
+        if path.suffix == ".txt":
+            return open(path, encoding="utf-8")
+        reader = FramedReader(path)
+        return io.TextIOWrapper(
+            io.BufferedReader(_FramesStream(reader)), encoding="utf-8"
+        )
+
+    def read(self, project_id: int, resource_id: int) -> str | None:
+        f = self.open(project_id, resource_id)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def iter_read(
+        self, project_id: int, resource_id: int, size: int = 1024 * 1024
+    ) -> Iterator[str]:
+        """Stream the content `size` characters at a time."""
+        f = self.open(project_id, resource_id)
+        if f is None:
+            return
+        with f:
+            while block := f.read(size):
+                yield block
+
+    def read_ranges(
+        self, project_id: int, resource_id: int, ranges: list[tuple[int, int]]
+    ) -> list[str]:
+        """The content between each `(start, end)` character offsets."""
+        path = self.stored_path(project_id, resource_id)
+        if path is None:
+            return ["" for _ in ranges]
+        if path.suffix == ".txt":
+            text = path.read_text(encoding="utf-8")
+            return [text[start:end] for start, end in ranges]
+        with FramedReader(path) as reader:
+            return reader.read_ranges(ranges)
+
+    def size(self, project_id: int, resource_id: int) -> int:
+        path = self.stored_path(project_id, resource_id)
+        return path.stat().st_size if path else 0
+
+    def delete(self, project_id: int, resource_id: int):
+        self.path(project_id, resource_id).unlink(missing_ok=True)
+        self.frames_path(project_id, resource_id).unlink(missing_ok=True)
+
+
+class _FramesStream(io.RawIOBase):
+    """The utf-8 bytes of a framed file, decompressed as they are read."""
+
+    def __init__(self, reader: FramedReader):
+        self.reader = reader
+        self.frames = reader.iter_frames()
+        self.pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b) -> int:
+        while not self.pending:
+            frame = next(self.frames, None)
+            if frame is None:
+                return 0
+            self.pending = frame.encode("utf-8")
+        n = min(len(b), len(self.pending))
+        b[:n] = self.pending[:n]
+        self.pending = self.pending[n:]
+        return n
+
+    def close(self):
+        self.reader.close()
+        super().close()
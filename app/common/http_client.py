@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx
+from django.conf import settings
+
+
+def make_timeout() -> httpx.Timeout:
+    conf = settings.HTTP_CLIENT
+    return httpx.Timeout(
+        conf["read_timeout"],
+        connect=conf["connect_timeout"],
+        read=conf["read_timeout"],
+    )
+
+
+def make_limits() -> httpx.Limits:
+    conf = settings.HTTP_CLIENT
+    return httpx.Limits(
+        max_connections=conf["max_connections"],
+        max_keepalive_connections=conf["max_keepalive_connections"],
+    )
+
+
+class HttpClient:
+    """Process-wide keep-alive connection pool shared by the threaded jobs.
+
+    Requests to one host are capped at `HTTP_CLIENT["per_host_concurrency"]`.
+    """
+
+    _lock = threading.Lock()
+    _instance: "HttpClient | None" = None
+
+    def __init__(self):
+        self.client = httpx.Client(timeout=make_timeout(), limits=make_limits())
+        self._host_limits: dict[str, threading.BoundedSemaphore] = defaultdict(
+            lambda: threading.BoundedSemaphore(
+                settings.HTTP_CLIENT["per_host_concurrency"]
+            )
+        )
+
+    @classmethod
+    def get(cls) -> "HttpClient":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @contextmanager
+    def host_limit(self, url: str):
+        with self._lock:
+            semaphore = self._host_limits[httpx.URL(url).host]
+        with semaphore:
+            yield
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        with self.host_limit(url):
+            return self.client.request(method, url, **kwargs)
+
+    @contextmanager
+    def stream(self, method: str, url: str, **kwargs):
+        """Like `request`, but the body is read incrementally by the caller."""
+        with self.host_limit(url):
+            with self.client.stream(method, url, **kwargs) as resp:
+                yield resp
+
+
+class AsyncHttpClient:
+    """Keep-alive connection pool for coroutines running on one event loop,
+    such as the chat streaming answers in the TUI.
+
+    Requests to one host are capped at `HTTP_CLIENT["per_host_concurrency"]`.
+    """
+
+    _instances: dict[asyncio.AbstractEventLoop, "AsyncHttpClient"] = {}
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(timeout=make_timeout(), limits=make_limits())
+        self._host_limits: dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(settings.HTTP_CLIENT["per_host_concurrency"])
+        )
+
+    @classmethod
+    def get(cls) -> "AsyncHttpClient":
+        loop = asyncio.get_running_loop()
+        if loop not in cls._instances:
+            for stale in [l for l in cls._instances if l.is_closed()]:
+                del cls._instances[stale]
+            cls._instances[loop] = cls()
+        return cls._instances[loop]
+
+    @asynccontextmanager
+    async def host_limit(self, url: str):
+        async with self._host_limits[httpx.URL(url).host]:
+            yield
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async with self.host_limit(url):
+            return await self.client.request(method, url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs):
+        """Like `request`, but the body is read incrementally by the caller."""
+        async with self.host_limit(url):
+            async with self.client.stream(method, url, **kwargs) as resp:
+                yield resp
+
+    async def aclose(self):
+        await self.client.aclose()
+        self._instances.pop(asyncio.get_running_loop(), None)
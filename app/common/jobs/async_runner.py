@@ -0,0 +1,189 @@
+import asyncio
+import os
+import socket
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django_async_job_pipelines.jobs import Job
+from loguru import logger
+
+from common.constants import EventTypes, ResourceStatus, Stage
+from common.jobs.chunk.chunk_resource import achunk_resource, chunk_resource
+from common.jobs.embed.embed_chunks import (
+    aembed_resource_chunks,
+    embed_resource_chunks,
+)
+from common.jobs.extract_text.using_apis.jina_ai_api import (
+    ascrape_web_page,
+    scrape_web_page_using_requests,
+)
+from common.jobs.extract_text.using_libraries.pypdf2 import (
+    aextract_pdf_text,
+    extract_pdf_text_using_pypdf2,
+)
+from common.jobs.job_dispatcher import Planner
+from common.jobs.rags.ivf import aupdate_ivf_index, update_ivf_index
+from common.jobs.rags.simple import adummy_rag, dummy_rag
+from common.metrics import measuring
+from common.models import ResourceRow
+from configuration.models import ProjectConfigRow
+
+
+@dataclass(frozen=True)
+class AsyncJob:
+    kind: str  # key of its concurrency cap in `JOB_RUNNER["concurrency"]`
+    run: Callable[[int, int], Awaitable[None]]
+
+
+ASYNC_JOBS: dict[Job, AsyncJob] = {
+    scrape_web_page_using_requests: AsyncJob("jina_reader", ascrape_web_page),
+    extract_pdf_text_using_pypdf2: AsyncJob("pdf_extraction", aextract_pdf_text),
+    chunk_resource: AsyncJob("chunk", achunk_resource),
+    embed_resource_chunks: AsyncJob("embed", aembed_resource_chunks),
+    dummy_rag: AsyncJob("rag", adummy_rag),
+    update_ivf_index: AsyncJob("index", aupdate_ivf_index),
+}
+
+
+def worker_name(pid: int | None = None) -> str:
+    """Identifies a runner process in `ResourceRow.claimed_by`."""
+    return f"{socket.gethostname()}:{pid or os.getpid()}"
+
+
+class AsyncRunner:
+    """Runs the pipelines of many resources concurrently from one event loop.
+
+    The loop only schedules: every job runs the sync body of its DJJP job on
+    a thread pool sized by the concurrency caps. New resources are claimed
+    in batches by polling, so several runner processes can share the queue,
+    and each resource goes through the steps planned for its project. Every
+    job type has its own cap on the jobs in flight, e.g. many Jina reader
+    requests but few embedding calls. Claims in flight are renewed while
+    polling, and resources left unfinished by a runner that died are resumed.
+    """
+
+    def __init__(
+        self,
+        concurrency: dict[str, int],
+        max_pipelines: int,
+        poll_interval: float,
+        claim_batch_size: int,
+        stale_claim_seconds: float,
+        project_id: int | None = None,
+    ):
+        kinds = {j.kind for j in ASYNC_JOBS.values()}
+        self.limits = {kind: asyncio.Semaphore(concurrency[kind]) for kind in kinds}
+        # the jobs run their sync bodies in the loop's default executor
+        self.threads = sum(concurrency[kind] for kind in kinds)
+        self.max_pipelines = max_pipelines
+        self.poll_interval = poll_interval
+        self.claim_batch_size = claim_batch_size
+        self.stale_claim_seconds = stale_claim_seconds
+        self.worker = worker_name()
+        self.project_id = project_id  # only process this project's resources
+        self.in_flight: dict[int, asyncio.Task] = {}
+        self.renewed_at = time.monotonic()  # of the claims in flight
+
+    @classmethod
+    def from_settings(cls, project_id: int | None = None) -> "AsyncRunner":
+        conf = settings.JOB_RUNNER
+        return cls(
+            conf["concurrency"],
+            conf["max_pipelines"],
+            conf["poll_interval"],
+            conf["claim_batch_size"],
+            conf["stale_claim_seconds"],
+            project_id,
+        )
+
+    async def arun_job(self, job: Job, project_id: int, resource_id: int):
+        async_job = ASYNC_JOBS[job]
+        async with self.limits[async_job.kind]:
+            await async_job.run(project_id, resource_id)
+
+    async def arun_pipeline(
+        self, project_id: int, resource_id: int, status: str = ResourceStatus.NEW
+    ):
+        """Run the resource's steps, from extraction unless its text was
+        already extracted by a worker that stopped mid-pipeline."""
+        with measuring(Stage.PLAN, project_id, resource_id) as m:
+            config = await ProjectConfigRow.aget_config(project_id)
+            assert config, f"Project {project_id} has no config"
+            steps = Planner(config).pipeline_steps()
+        await sync_to_async(m.record)()
+        if status == ResourceStatus.SCRAPED:
+            steps = steps[1:]
+
+        for jobs in steps:
+            await asyncio.gather(
+                *(self.arun_job(j, project_id, resource_id) for j in jobs)
+            )
+            resource = await ResourceRow.objects.only("status").aget(id=resource_id)
+            if resource.status == ResourceStatus.ERROR:
+                return
+
+    async def _arun_pipeline(self, project_id: int, resource_id: int, status: str):
+        try:
+            await self.arun_pipeline(project_id, resource_id, status)
+        except Exception:
+            logger.error(f"Pipeline of resource {resource_id} failed")
+            resource = await ResourceRow.objects.aget(id=resource_id)
+            await resource.aadd_error(
+                traceback.format_exc(), EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR
+            )
+        finally:
+            self.in_flight.pop(resource_id, None)
+
+    async def apoll(self) -> int:
+        """Claim and start unfinished resources, as many as there is room for."""
+        if time.monotonic() - self.renewed_at > self.stale_claim_seconds / 3:
+            await ResourceRow.arenew_claims(self.worker, self.in_flight)
+            self.renewed_at = time.monotonic()
+
+        room = min(self.max_pipelines - len(self.in_flight), self.claim_batch_size)
+        if room <= 0:
+            return 0
+        claimed = await ResourceRow.aclaim(
+            self.worker,
+            room,
+            self.stale_claim_seconds,
+            project_id=self.project_id,
+            exclude=self.in_flight,
+        )
+        for resource_id, project_id, status in claimed:
+            self.in_flight[resource_id] = asyncio.create_task(
+                self._arun_pipeline(project_id, resource_id, status)
+            )
+        return len(claimed)
+
+    def use_threads(self):
+        """Give the default executor a thread for every job allowed in flight."""
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(self.threads, thread_name_prefix="job")
+        )
+
+    async def arun_until_idle(self):
+        """Process every new resource, returning once none is left."""
+        self.use_threads()
+        while await self.apoll() or self.in_flight:
+            await asyncio.wait(
+                list(self.in_flight.values()),
+                timeout=self.poll_interval,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+    async def arun_forever(self):
+        logger.info(f"Async job runner {self.worker} started: {settings.JOB_RUNNER}")
+        self.use_threads()
+        while True:
+            if not await self.apoll():
+                await asyncio.sleep(self.poll_interval)
+            elif len(self.in_flight) >= self.max_pipelines:
+                await asyncio.wait(
+                    list(self.in_flight.values()), return_when=asyncio.FIRST_COMPLETED
+                )
@@ -0,0 +1,74 @@
+import traceback
+from typing import Callable
+
+from django.db import transaction
+
+from common.constants import EventTypes, ResourceStatus
+from common.models import EventLogRows, ResourceRow, ResponseCacheRow
+
+
+class ResourceBatch:
+    """The resources handled by one job of a batch pipeline.
+
+    Resources that failed in an earlier step are left out. An error fails only
+    its own resource, and `save` writes the status changes and events of the
+    whole batch at once.
+    """
+
+    def __init__(self, project_id: int, resource_ids: list[int]):
+        self.project_id = project_id
+        found = {
+            r.id: r
+            for r in ResourceRow.objects.filter(
+                project_id=project_id, id__in=resource_ids
+            ).only(*ResourceRow.LIST_FIELDS)
+        }
+        self.missing = [id for id in resource_ids if id not in found]
+        self.resources = [
+            found[id]
+            for id in resource_ids
+            if id in found and found[id].status != ResourceStatus.ERROR
+        ]
+        self.errors: dict[int, str] = {}
+
+    def ok(self) -> list[ResourceRow]:
+        return [r for r in self.resources if r.id not in self.errors]
+
+    def fail(self, resource_id: int, error_msg: str):
+        self.errors[resource_id] = error_msg
+
+    def fail_all(self, error_msg: str):
+        for r in self.ok():
+            self.fail(r.id, error_msg)
+
+    def run(self, fn: Callable[[ResourceRow], None]):
+        for r in self.ok():
+            try:
+                fn(r)
+            except Exception:
+                self.fail(r.id, traceback.format_exc())
+
+    def start(self):
+        """Mark the batch as being processed, like `start_scraping`."""
+        self.save(EventTypes.RESOURCE_PROCESSING_STARTED, ResourceStatus.DOWNLOADED)
+
+    def save(self, event_type: str, status: str | None = None):
+        """Record `event_type` (and `status`) for the resources without errors."""
+        ok = [r.id for r in self.ok()]
+        error = EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR
+        with transaction.atomic():
+            if status and ok:
+                ResourceRow.bulk_transition(self.project_id, ok, status, event_type)
+                if status == ResourceStatus.PROCESSED:
+                    # more can be retrieved, cached answers may be outdated
+                    ResponseCacheRow.invalidate(self.project_id)
+            elif ok:
+                EventLogRows.bulk_create_events(self.project_id, event_type, ok)
+            if self.errors:
+                ResourceRow.bulk_add_errors(self.project_id, self.errors, error)
+            if self.missing:
+                EventLogRows.bulk_create_events(self.project_id, error, self.missing)
+        # the failures are recorded, the next steps skip them
+        self.resources = self.ok()
+        self.errors = {}
+        self.missing = []
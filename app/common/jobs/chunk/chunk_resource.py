@@ -0,0 +1,82 @@
+import traceback
+
+from asgiref.sync import sync_to_async
+from django_async_job_pipelines.jobs import job
+
+from common.constants import EventTypes, Stage
+from common.content.store import ContentStore
+from common.jobs.batch import ResourceBatch
+from common.jobs.chunk.chunkers import iter_text_chunks
+from common.metrics import count_bytes, instrument
+from common.models import ChunkRow, EventLogRows, ResourceRow
+from common.vectors.ivf import IVFIndex
+from common.vectors.store import VectorStore
+from configuration.models import Config, ProjectConfigRow
+
+READ_SIZE = 64 * 1024  # characters of text read at a time
+
+
+def chunk(resource: ResourceRow, config: Config):
+    """Stream the text through the chunker into `ChunkRow` batches, rewriting
+    it with frames that end on chunk ends, so a chunk is read by inflating one
+    frame. The vectors of the replaced chunks are deleted from the store."""
+    count_bytes(bytes_in=resource.scraped_content_size())
+    replaced = ChunkRow.embedded_ids(resource.id)
+    blocks = ContentStore().iter_read(resource.project_id, resource.id, READ_SIZE)
+    store = ContentStore(codec=config.compression.codec, level=config.compression.level)
+    # the old file is read until the new one replaces it on success
+    with store.writer(resource.project_id, resource.id, boundaries=True) as f:
+        chunks = iter_text_chunks(blocks, config.processor.chunker)
+        ChunkRow.replace_for_resource(resource, store.iter_write_chunks(f, chunks))
+    count_bytes(bytes_out=resource.scraped_content_size())
+
+    vectors = VectorStore(resource.project_id)
+    vectors.delete(replaced)
+    if replaced and vectors.needs_compaction():
+        IVFIndex(vectors).compact()
+
+
+@instrument(Stage.CHUNK)
+def run_chunk_resource(project_id, resource_id):
+    resource = ResourceRow.get_by_id(id=resource_id)
+
+    if not resource:
+        EventLogRows.create(
+            project_id,
+            EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR,
+            resource_id,
+        )
+        return
+
+    try:
+        config = ProjectConfigRow.get_config(resource.project_id)
+        assert config
+        chunk(resource, config)
+    except Exception:
+        resource.add_error(
+            traceback.format_exc(), EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR
+        )
+        return
+
+    EventLogRows.create(resource.project_id, EventTypes.RESOURCE_CHUNKED, resource_id)
+
+
+@job(name="chunk_resource", timeout=60)
+def chunk_resource(project_id, resource_id):
+    run_chunk_resource(project_id, resource_id)
+
+
+@job(name="chunk_resource_batch", timeout=600)
+@instrument(Stage.CHUNK)
+def chunk_resource_batch(project_id, resource_ids: list[int]):
+    batch = ResourceBatch(project_id, resource_ids)
+    config = ProjectConfigRow.get_config(project_id)
+    assert config
+    batch.run(lambda resource: chunk(resource, config))
+    batch.save(EventTypes.RESOURCE_CHUNKED)
+
+
+async def achunk_resource(project_id, resource_id):
+    await sync_to_async(run_chunk_resource, thread_sensitive=False)(
+        project_id, resource_id
+    )
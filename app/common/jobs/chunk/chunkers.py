@@ -0,0 +1,65 @@
+from typing import Iterable, Iterator
+
+from common.constants import ChunkerType
+from common.models import Chunk
+from configuration.models import Chunker
+
+
+def iter_fixed_size_text_chunks(
+    blocks: Iterable[str], size: int
+) -> Iterator[tuple[int, int, str]]:
+    """`(start, end, text)` of chunks of at most `size` characters of the text
+    read in `blocks`.
+
+    A chunk is cut at the last newline, or else the last space, in the second
+    half of its window so words are not split. At most one block and one
+    chunk are held in memory at a time, and every search is bounded by the
+    window, so the text is walked in linear time.
+    """
+    if size <= 0:
+        raise ValueError(f"Chunk size must be positive: {size}")
+
+    blocks = iter(blocks)
+    buffer = ""
+    pos = 0  # where the next chunk starts in `buffer`
+    offset = 0  # of `buffer` in the text
+    exhausted = False
+    while True:
+        # the cut is only decided once it is known whether text follows
+        while not exhausted and len(buffer) - pos <= size:
+            block = next(blocks, None)
+            if block is None:
+                exhausted = True
+            else:
+                buffer = buffer[pos:] + block
+                offset += pos
+                pos = 0
+        if pos == len(buffer):
+            return
+
+        end = min(pos + size, len(buffer))
+        if end < len(buffer):
+            lower = pos + size // 2
+            cut = buffer.rfind("\n", lower, end)
+            if cut == -1:
+                cut = buffer.rfind(" ", lower, end)
+            if cut != -1:
+                end = cut + 1
+        yield offset + pos, offset + end, buffer[pos:end]
+        pos = end
+
+
+def iter_text_chunks(
+    blocks: Iterable[str], chunker: Chunker
+) -> Iterator[tuple[Chunk, str]]:
+    """The chunks of the text read in `blocks`, each with its text."""
+    if chunker.type == ChunkerType.FIXED:
+        assert chunker.size
+        spans = iter_fixed_size_text_chunks(blocks, chunker.size)
+    elif chunker.type == ChunkerType.NO_CHUNK:
+        text = "".join(blocks)
+        spans = iter([(0, len(text), text)] if text else [])
+    else:
+        raise Exception(f"Unknown chunker: {chunker}")
+    for index, (start, end, text) in enumerate(spans):
+        yield Chunk(index=index, start=start, end=end), text
@@ -0,0 +1,16 @@
+from django_async_job_pipelines.jobs import Job
+from configuration.models import Config
+from common.constants import ChunkerType
+from common.jobs.chunk.chunk_resource import chunk_resource
+
+
+def dispatcher(project_config: Config) -> list[Job]:
+    supported_chunkers = [ChunkerType.FIXED, ChunkerType.NO_CHUNK]
+    chunker = project_config.processor.chunker
+
+    if chunker.type in supported_chunkers:
+        return [chunk_resource]
+
+    raise Exception(
+        f"Unknown chunker: [red]{chunker.type}[/]\nSupported chunkers: {supported_chunkers}"
+    )
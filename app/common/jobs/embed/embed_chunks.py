@@ -0,0 +1,80 @@
+import traceback
+
+from asgiref.sync import sync_to_async
+from django_async_job_pipelines.jobs import job
+
+from common.constants import EventTypes, Stage
+from common.jobs.batch import ResourceBatch
+from common.jobs.embed.embedders import EmbeddingClient, get_embedding_client
+from common.metrics import count_bytes, instrument
+from common.models import ChunkRow, EventLogRows, ResourceRow
+from common.vectors.store import VectorStore
+from configuration.models import ProjectConfigRow
+
+
+def embed_chunks(
+    resource: ResourceRow, client: EmbeddingClient, store: VectorStore, batch_size: int
+):
+    for ids, contents in ChunkRow.iter_unembedded_batches(resource.id, batch_size):
+        vectors = client.embed_documents(contents)
+        store.append(ids, vectors)
+        ChunkRow.set_embedded(ids)
+        count_bytes(sum(len(c.encode()) for c in contents), vectors.nbytes)
+
+
+@instrument(Stage.EMBED)
+def run_embed_resource_chunks(project_id, resource_id):
+    resource = ResourceRow.get_by_id(id=resource_id)
+
+    if not resource:
+        EventLogRows.create(
+            project_id,
+            EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR,
+            resource_id,
+        )
+        return
+
+    try:
+        config = ProjectConfigRow.get_config(resource.project_id)
+        assert config
+        embedder = config.embedder
+        embed_chunks(
+            resource,
+            get_embedding_client(embedder),
+            VectorStore(resource.project_id),
+            embedder.batch_size,
+        )
+    except Exception:
+        resource.add_error(
+            traceback.format_exc(), EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR
+        )
+        return
+
+    EventLogRows.create(resource.project_id, EventTypes.RESOURCE_EMBEDDED, resource_id)
+
+
+@job(name="embed_resource_chunks", timeout=600)
+def embed_resource_chunks(project_id, resource_id):
+    run_embed_resource_chunks(project_id, resource_id)
+
+
+@job(name="embed_resource_chunks_batch", timeout=3600)
+@instrument(Stage.EMBED)
+def embed_resource_chunks_batch(project_id, resource_ids: list[int]):
+    batch = ResourceBatch(project_id, resource_ids)
+    config = ProjectConfigRow.get_config(project_id)
+    assert config
+    client = get_embedding_client(config.embedder)
+    store = VectorStore(project_id)
+    batch.run(
+        lambda resource: embed_chunks(
+            resource, client, store, config.embedder.batch_size
+        )
+    )
+    batch.save(EventTypes.RESOURCE_EMBEDDED)
+
+
+async def aembed_resource_chunks(project_id, resource_id):
+    await sync_to_async(run_embed_resource_chunks, thread_sensitive=False)(
+        project_id, resource_id
+    )
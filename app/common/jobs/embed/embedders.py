@@ -0,0 +1,94 @@
+import hashlib
+import os
+import re
+
+import numpy as np
+from django.conf import settings
+
+from common.constants import Provider
+from common.http_client import HttpClient
+from common.rate_limit import call_api
+from configuration.models import Embedder
+
+
+class EmbeddingClient:
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed_documents([text])[0]
+
+
+class JinaEmbeddingClient(EmbeddingClient):
+    url = "https://api.jina.ai/v1/embeddings"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def _embed(self, texts: list[str], task: str) -> np.ndarray:
+        api_key = os.environ.get("JINA_AI_API_KEY")
+        resp = call_api(
+            Provider.JINA,
+            lambda: HttpClient.get().request(
+                "POST",
+                self.url,
+                headers={"Authorization": f"Bearer {api_key}"},
+                json={"model": self.model_name, "task": task, "input": texts},
+            ),
+        )
+        resp.raise_for_status()
+        data = sorted(resp.json()["data"], key=lambda d: d["index"])
+        return np.asarray([d["embedding"] for d in data], dtype=np.float32)
+
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        return self._embed(texts, "retrieval.passage")
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._embed([text], "retrieval.query")[0]
+
+
+class OllamaEmbeddingClient(EmbeddingClient):
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        resp = call_api(
+            Provider.OLLAMA,
+            lambda: HttpClient.get().request(
+                "POST",
+                f"{settings.OLLAMA_BASE_URL}/api/embed",
+                json={"model": self.model_name, "input": texts},
+            ),
+        )
+        resp.raise_for_status()
+        return np.asarray(resp.json()["embeddings"], dtype=np.float32)
+
+
+class FakeEmbeddingClient(EmbeddingClient):
+    """Deterministic, offline embeddings made by hashing words into buckets.
+
+    Texts sharing words get similar vectors, which is enough to exercise the
+    pipeline and retrieval without a model.
+    """
+
+    dim = 256
+
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+                h = int.from_bytes(digest, "little")
+                sign = 1.0 if h & 1 else -1.0
+                vectors[i, (h >> 1) % self.dim] += sign
+        return vectors
+
+
+def get_embedding_client(embedder: Embedder) -> EmbeddingClient:
+    if embedder.provider == Provider.JINA:
+        return JinaEmbeddingClient(embedder.model_name)
+    if embedder.provider == Provider.OLLAMA:
+        return OllamaEmbeddingClient(embedder.model_name)
+    if embedder.provider == Provider.FAKE:
+        return FakeEmbeddingClient()
+    raise Exception(f"Unknown embedder: {embedder}")
@@ -0,0 +1,16 @@
+from django_async_job_pipelines.jobs import Job
+from configuration.models import Config
+from common.constants import Provider
+from common.jobs.embed.embed_chunks import embed_resource_chunks
+
+
+def dispatcher(project_config: Config) -> list[Job]:
+    supported_embedders = [Provider.JINA, Provider.OLLAMA, Provider.FAKE]
+    embedder = project_config.embedder
+
+    if embedder.provider in supported_embedders:
+        return [embed_resource_chunks]
+
+    raise Exception(
+        f"Unknown embedder: [red]{embedder.provider}[/]\nSupported providers: {supported_embedders}"
+    )
@@ -4,14 +4,19 @@ from common.constants import Provider
 from common.jobs.extract_text.using_apis.jina_ai_api import (
     scrape_web_page_using_requests,
 )
+from common.jobs.extract_text.using_libraries.pypdf2 import (
+    extract_pdf_text_using_pypdf2,
+)
 
 
 def dispatcher(project_config: Config) -> Job:
-    supported_extractors = [Provider.JINA]
+    supported_extractors = [Provider.JINA, Provider.PYPDF2]
     text_extractor = project_config.text_extractor
 
     if text_extractor.provider == Provider.JINA:
         return scrape_web_page_using_requests
+    if text_extractor.provider == Provider.PYPDF2:
+        return extract_pdf_text_using_pypdf2
 
     raise Exception(
         f"Unknown text extractor: [red]{text_extractor.provider}[/]\nSupported providers: {supported_extractors}"
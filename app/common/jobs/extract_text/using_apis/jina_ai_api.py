@@ -1,66 +1,189 @@
 import os
 import traceback
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
 from django_async_job_pipelines.jobs import job
 
+from common.content.cache import ContentCache
+from common.http_client import HttpClient
+from common.models import ContentCacheRow, ResourceRow
+from common.constants import EventTypes, Provider, ResourceStatus, Stage
+from common.jobs.batch import ResourceBatch
+from common.jobs.extract_text.utils import record_error, start_scraping
+from common.metrics import instrument
+from common.rate_limit import OnRetry, call_api
 from configuration.models import ProjectConfigRow
-from common.models import ResourceRow, EventLogRows
-from common.constants import EventTypes
 
 
-@job(name="scrape_web_page_using_requests", timeout=10)
-def scrape_web_page_using_requests(project_config, resource_id):
-    resource: ResourceRow | None = ResourceRow.get_by_id(resource_id)
+def jina_reader_url(url: str) -> str:
+    return f"{settings.JINA_READER_URL}/{url}"
 
-    if not resource:
-        EventLogRows.create(
-            project_id=project_config.project_id,
-            type=EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR,
-            entity_id=resource_id,
+
+def jina_headers() -> dict:
+    api_key = os.environ.get("JINA_AI_API_KEY")
+    return {"Authorization": f"Bearer {api_key}"}
+
+
+def lookup_cache(
+    resource: ResourceRow,
+) -> tuple[str, ContentCacheRow | None, str | None]:
+    """Return the reader model, the cache entry and its content if still fresh."""
+    config = ProjectConfigRow.get_config(resource.project_id)
+    assert config
+    model_name = config.text_extractor.model_name
+
+    cache = ContentCache()
+    entry = cache.get(resource.url, Provider.JINA, model_name)
+    if entry and cache.is_fresh(entry):
+        return model_name, entry, cache.read(entry)
+    return model_name, entry, None
+
+
+def update_cache(
+    resource: ResourceRow,
+    model_name: str,
+    entry: ContentCacheRow | None,
+    status_code: int,
+    text: str,
+    headers,
+) -> tuple[int, str]:
+    cache = ContentCache()
+    if status_code == 304 and entry:
+        cache.mark_revalidated(entry)
+        return 200, cache.read(entry)
+    if status_code == 200:
+        cache.put(
+            resource.url,
+            Provider.JINA,
+            model_name,
+            text,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+    return status_code, text
+
+
+def record_response(resource: ResourceRow, status_code: int, text: str):
+    if status_code == 200:
+        resource.add_scraped_content(text)
+        resource.set_scraping_finished(
+            EventTypes.RESOURCE_DOWNLOADED_AND_TEXT_EXTRACTED
         )
+    else:
+        record_error(resource, reader_error(status_code, text))
+
+
+def reader_error(status_code: int, text: str) -> str:
+    return f"Error code from JINA API: {status_code}\nError message: {text}"
+
+
+def mark_retrying(resource: ResourceRow) -> OnRetry:
+    return lambda *_: resource.set_retrying(EventTypes.RESOURCE_PROCESSING_RETRYING)
+
+
+def request_page(resource: ResourceRow, entry: ContentCacheRow | None):
+    """Fetch the page within the Jina rate limit, retrying 429s and 5xx."""
+    return call_api(
+        Provider.JINA,
+        lambda: HttpClient.get().request(
+            "GET",
+            jina_reader_url(resource.url),
+            headers=jina_headers() | ContentCache().conditional_headers(entry),
+        ),
+        on_retry=mark_retrying(resource),
+    )
+
+
+@instrument(Stage.EXTRACT)
+def run_scrape_web_page(project_id, resource_id):
+    resource = start_scraping(project_id, resource_id)
+    if not resource:
         return
 
     try:
-        EventLogRows.create(
-            resource.project.id,
-            EventTypes.RESOURCE_PROCESSING_STARTED,
-            resource_id,
+        model_name, entry, content = lookup_cache(resource)
+        if content is not None:
+            record_response(resource, 200, content)
+            return
+
+        resp = request_page(resource, entry)
+        status_code, text = update_cache(
+            resource, model_name, entry, resp.status_code, resp.text, resp.headers
         )
+        record_response(resource, status_code, text)
+    except Exception:
+        record_error(resource, traceback.format_exc())
 
-        resource.set_download_finishied()
 
-        project_row = ProjectConfigRow.get_by_project_id_for_ui(
-            resource.project.id_for_ui
-        )
-        assert project_row
-
-        api_key = os.environ.get("JINA_AI_API_KEY")
-        resource.set_download_finishied()
-        headers = {"Authorization": f"Bearer {api_key}"}
-        resp = requests.get(f"https://r.jina.ai/{resource.url}", headers=headers)
-        if resp.status_code == 200:
-            resource.add_scraped_content(resp.text)
-            resource.set_scraping_finished()
-            EventLogRows.create(
-                resource.project.id,
-                EventTypes.RESOURCE_DOWNLOADED_AND_TEXT_EXTRACTED,
-                resource_id,
-            )
-            return
+@job(name="scrape_web_page_using_requests", timeout=300)
+def scrape_web_page_using_requests(project_id, resource_id):
+    run_scrape_web_page(project_id, resource_id)
+
+
+async def ascrape_web_page(project_id, resource_id):
+    await sync_to_async(run_scrape_web_page, thread_sensitive=False)(
+        project_id, resource_id
+    )
+
+
+@job(name="scrape_web_pages_batch", timeout=1800)
+@instrument(Stage.EXTRACT)
+def scrape_web_pages_batch(project_id, resource_ids: list[int]):
+    """Extract a batch of resources, requesting the pages concurrently.
+
+    The requests go out from a thread pool through the shared `HttpClient`,
+    up to `HTTP_CLIENT["per_host_concurrency"]` at once, and the responses
+    are stored from this thread as they arrive.
+    """
+    batch = ResourceBatch(project_id, resource_ids)
+    batch.start()
+
+    def store(resource: ResourceRow, status_code: int, text: str):
+        if status_code == 200:
+            resource.add_scraped_content(text)
         else:
-            error_msg = f"Error code from JINA API: {resp.status_code}\nError message: {resp.text}"
-            resource.add_error(error_msg)
-            EventLogRows.create(
-                resource.project.id,
-                EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR,
-                resource_id,
-            )
-    except:
-        resource.add_error(traceback.format_exc())
-        EventLogRows.create(
-            resource.project.id,
-            EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR,
-            resource_id,
-        )
-        return
+            batch.fail(resource.id, reader_error(status_code, text))
+
+    def fetch(resource: ResourceRow, entry: ContentCacheRow | None):
+        try:
+            return request_page(resource, entry)
+        finally:
+            # the rate limiter opened a connection in this pool thread
+            connections.close_all()
+
+    pending = {}
+    with ThreadPoolExecutor(settings.HTTP_CLIENT["per_host_concurrency"]) as pool:
+        for resource in batch.ok():
+            try:
+                model_name, entry, content = lookup_cache(resource)
+                if content is not None:
+                    store(resource, 200, content)
+                else:
+                    future = pool.submit(copy_context().run, fetch, resource, entry)
+                    pending[future] = resource, model_name, entry
+            except Exception:
+                batch.fail(resource.id, traceback.format_exc())
+
+        for future in as_completed(pending):
+            resource, model_name, entry = pending[future]
+            try:
+                resp = future.result()
+                status_code, text = update_cache(
+                    resource,
+                    model_name,
+                    entry,
+                    resp.status_code,
+                    resp.text,
+                    resp.headers,
+                )
+                store(resource, status_code, text)
+            except Exception:
+                batch.fail(resource.id, traceback.format_exc())
+
+    batch.save(
+        EventTypes.RESOURCE_DOWNLOADED_AND_TEXT_EXTRACTED, ResourceStatus.SCRAPED
+    )
@@ -0,0 +1,99 @@
+import traceback
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django_async_job_pipelines.jobs import job
+
+from common.constants import EventTypes, ResourceStatus, Stage
+from common.content.download.arxiv import local_pdf_path
+from common.content.pdf_scraper.pages import PAGE_SEPARATOR, iter_page_texts
+from common.http_client import HttpClient
+from common.jobs.batch import ResourceBatch
+from common.metrics import count_bytes, instrument
+from common.jobs.extract_text.utils import record_error, start_scraping
+from common.models import Page, PageRow, ResourceRow
+
+
+def extraction_dir(resource: ResourceRow) -> Path:
+    path = Path(settings.PDF_EXTRACTION["dir"]) / f"project-{resource.project_id}"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def fetch_pdf(resource: ResourceRow) -> Path:
+    """Path of the PDF on disk, downloading it unless it is already there."""
+    path = local_pdf_path(resource.url)
+    if path:
+        return path
+
+    path = extraction_dir(resource) / f"{resource.id}.pdf"
+    with HttpClient.get().stream("GET", resource.url, follow_redirects=True) as resp:
+        resp.raise_for_status()
+        with open(path, "wb") as f:
+            for chunk in resp.iter_bytes(64 * 1024):
+                f.write(chunk)
+    return path
+
+
+def extract_pages(pdf_path: Path, resource: ResourceRow) -> list[Page]:
+    """Stream the text of the pages to storage as the workers return them."""
+    conf = settings.PDF_EXTRACTION
+    pages = []
+    offset = 0
+    with resource.scraped_content_writer() as f:
+        for number, text in enumerate(
+            iter_page_texts(pdf_path, conf["processes"], conf["pages_per_task"])
+        ):
+            if number:
+                f.write(PAGE_SEPARATOR)
+                offset += len(PAGE_SEPARATOR)
+            f.write(text)
+            pages.append(Page(number=number, start=offset, end=offset + len(text)))
+            offset += len(text)
+    return pages
+
+
+def extract_pdf_text(resource: ResourceRow):
+    pdf_path = fetch_pdf(resource)
+    pages = extract_pages(pdf_path, resource)
+    PageRow.replace_for_resource(resource, pages)
+    count_bytes(pdf_path.stat().st_size, resource.scraped_content_size())
+
+
+@instrument(Stage.EXTRACT)
+def run_extract_pdf_text(project_id, resource_id):
+    resource = start_scraping(project_id, resource_id)
+    if not resource:
+        return
+
+    try:
+        extract_pdf_text(resource)
+        resource.set_scraping_finished(
+            EventTypes.RESOURCE_DOWNLOADED_AND_TEXT_EXTRACTED
+        )
+    except Exception:
+        record_error(resource, traceback.format_exc())
+
+
+@job(name="extract_pdf_text_using_pypdf2", timeout=600)
+def extract_pdf_text_using_pypdf2(project_id, resource_id):
+    run_extract_pdf_text(project_id, resource_id)
+
+
+async def aextract_pdf_text(project_id, resource_id):
+    # the pages are extracted by the process pool, the thread only waits
+    await sync_to_async(run_extract_pdf_text, thread_sensitive=False)(
+        project_id, resource_id
+    )
+
+
+@job(name="extract_pdf_text_batch", timeout=3600)
+@instrument(Stage.EXTRACT)
+def extract_pdf_text_batch(project_id, resource_ids: list[int]):
+    batch = ResourceBatch(project_id, resource_ids)
+    batch.start()
+    batch.run(extract_pdf_text)
+    batch.save(
+        EventTypes.RESOURCE_DOWNLOADED_AND_TEXT_EXTRACTED, ResourceStatus.SCRAPED
+    )
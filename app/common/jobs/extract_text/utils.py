@@ -0,0 +1,21 @@
+from common.constants import EventTypes
+from common.models import EventLogRows, ResourceRow
+
+
+def start_scraping(project_id, resource_id) -> ResourceRow | None:
+    resource: ResourceRow | None = ResourceRow.get_by_id(resource_id)
+
+    if not resource:
+        EventLogRows.create(
+            project_id=project_id,
+            type=EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR,
+            entity_id=resource_id,
+        )
+        return
+
+    resource.set_download_finishied(EventTypes.RESOURCE_PROCESSING_STARTED)
+    return resource
+
+
+def record_error(resource: ResourceRow, error_msg: str):
+    resource.add_error(error_msg, EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR)
@@ -1,13 +1,36 @@
 from dataclasses import dataclass
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from loguru import logger
 from django_async_job_pipelines.jobs import Job
 from django_async_job_pipelines.steps import Step
 
-from common.constants import DownloaderType, Provider, ProcessorType, ChunkerType
+from common.constants import DownloaderType, Provider, ProcessorType, Stage
+from common.jobs.chunk.chunk_resource import chunk_resource, chunk_resource_batch
+from common.jobs.chunk.job_dispatcher import dispatcher as chunk_dispatcher
+from common.jobs.embed.embed_chunks import (
+    embed_resource_chunks,
+    embed_resource_chunks_batch,
+)
+from common.jobs.embed.job_dispatcher import dispatcher as embed_dispatcher
 from common.jobs.extract_text.job_dispatcher import (
     dispatcher as extract_text_dispatcher,
 )
-from common.jobs.rags.simple import rag_dispatcher
+from common.jobs.extract_text.using_apis.jina_ai_api import (
+    scrape_web_page_using_requests,
+    scrape_web_pages_batch,
+)
+from common.jobs.extract_text.using_libraries.pypdf2 import (
+    extract_pdf_text_batch,
+    extract_pdf_text_using_pypdf2,
+)
+from common.jobs.rags.ivf import (
+    index_dispatcher,
+    update_ivf_index,
+    update_ivf_index_batch,
+)
+from common.jobs.rags.simple import dummy_rag, dummy_rag_batch, rag_dispatcher
+from common.metrics import measuring
 from common.models import ProjectRow
 from configuration.models import Config
 
@@ -16,54 +39,110 @@ class Event:
     RESOURCE_CREATED = "resource_created"
 
 
+# the job processing a list of resource ids in place of each per-resource job
+BATCH_JOBS: dict[Job, Job] = {
+    scrape_web_page_using_requests: scrape_web_pages_batch,
+    extract_pdf_text_using_pypdf2: extract_pdf_text_batch,
+    chunk_resource: chunk_resource_batch,
+    embed_resource_chunks: embed_resource_chunks_batch,
+    dummy_rag: dummy_rag_batch,
+    update_ivf_index: update_ivf_index_batch,
+}
+
+
 @dataclass
 class Planner:
     project_config: Config
 
     def download_job(self) -> Job | None:
-        if (
-            self.project_config.downloader.type
-            == DownloaderType.JINA_AI_READER_USING_JINA_API
+        if self.project_config.downloader.type in (
+            DownloaderType.JINA_AI_READER_USING_JINA_API,
+            # PDFs are fetched by the extraction job, unless already on disk
+            DownloaderType.PDF_FILE,
         ):
             return
         else:
             raise Exception(f"Unknown downloader: {self.project_config.downloader}")
 
     def text_extractor_job(self) -> Job | None:
-        if self.project_config.text_extractor.provider == Provider.JINA:
+        if self.project_config.text_extractor.provider in (
+            Provider.JINA,
+            Provider.PYPDF2,
+        ):
             return extract_text_dispatcher(self.project_config)
 
+    def pipeline_steps(self) -> list[list[Job]]:
+        download_job = self.download_job()
+        assert not download_job
+
+        return [[self.text_extractor_job()], *self.rag_step_jobs()]
+
     def rag_step_jobs(self):
-        if self.project_config.processor.type == ProcessorType.SIMPLE_RAG:
-            if self.project_config.processor.chunker.type == ChunkerType.NO_CHUNK:
-                yield rag_dispatcher(self.project_config)
-            else:
-                raise Exception(
-                    f"Unknown chunker: {self.project_config.processor.chunker}"
-                )
+        if self.project_config.processor.type in (
+            ProcessorType.SIMPLE_RAG,
+            ProcessorType.IVF_RAG,
+        ):
+            yield chunk_dispatcher(self.project_config)
+            yield embed_dispatcher(self.project_config)
+            yield rag_dispatcher(self.project_config)
+            if self.project_config.processor.type == ProcessorType.IVF_RAG:
+                yield index_dispatcher(self.project_config)
         else:
             raise Exception(f"Unknown processor: {self.project_config.processor}")
 
 
 async def create_resource_processing_pipeline(
     event, project_config: Config, project_id, resource_id
-) -> Job:
-    if event != Event.RESOURCE_CREATED:
-        raise Exception("Unknown event")
-
-    planner = Planner(project_config)
+):
+    await create_resource_processing_pipelines(
+        event, project_config, project_id, [resource_id]
+    )
 
-    download_job = planner.download_job()
-    assert not download_job
 
-    text_extract_step = Step()
-    text_extract_job = planner.text_extractor_job()
-    await text_extract_step.aadd_job(text_extract_job, project_id, resource_id)
+async def aenqueue_pipeline(steps: list[list[Job]], *args):
+    """Chain one DJJP step per pipeline step, each job called with `args`."""
+    current_step = Step()
+    for j in steps[0]:
+        await current_step.aadd_job(j, *args)
 
-    current_step = text_extract_step
-    for jobs in planner.rag_step_jobs():
+    for jobs in steps[1:]:
         next_step = await current_step.acreate_next_step()
         for j in jobs:
-            await next_step.aadd_job(j, project_id, resource_id)
+            await next_step.aadd_job(j, *args)
 
         current_step = next_step
+
+
+async def create_resource_processing_pipelines(
+    event, project_config: Config, project_id, resource_ids: list[int]
+):
+    """Enqueue the pipelines of the resources, planning the steps only once.
+
+    With `JOB_RUNNER["batch_size"]` above 1, each pipeline handles a batch of
+    resources, so a batch costs one job per step instead of one per resource.
+    """
+    if event != Event.RESOURCE_CREATED:
+        raise Exception("Unknown event")
+
+    with measuring(Stage.PLAN, project_id, resource_ids) as m:
+        steps = Planner(project_config).pipeline_steps()
+        if settings.JOB_RUNNER["mode"] == "asyncio":
+            pass  # the async runner picks up new resources by itself
+        elif settings.JOB_RUNNER["batch_size"] > 1:
+            await aenqueue_batch_pipelines(
+                steps, project_id, resource_ids, settings.JOB_RUNNER["batch_size"]
+            )
+        else:
+            for resource_id in resource_ids:
+                await aenqueue_pipeline(steps, project_id, resource_id)
+    await sync_to_async(m.record)()
+
+
+async def aenqueue_batch_pipelines(
+    steps: list[list[Job]], project_id, resource_ids: list[int], batch_size: int
+):
+    batch_steps = [[BATCH_JOBS[j] for j in jobs] for jobs in steps]
+    for start in range(0, len(resource_ids), batch_size):
+        await aenqueue_pipeline(
+            batch_steps, project_id, resource_ids[start : start + batch_size]
+        )
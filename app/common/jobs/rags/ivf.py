@@ -0,0 +1,62 @@
+import traceback
+
+from asgiref.sync import sync_to_async
+from configuration.models import Config
+from django_async_job_pipelines.jobs import job
+
+from common.constants import EventTypes, Stage
+from common.jobs.batch import ResourceBatch
+from common.metrics import instrument
+from common.models import EventLogRows, ResourceRow
+from common.vectors.ivf import IVFIndex
+from common.vectors.store import VectorStore
+
+
+@instrument(Stage.INDEX)
+def run_update_ivf_index(project_id, resource_id):
+    resource = ResourceRow.get_by_id(id=resource_id)
+
+    if not resource:
+        EventLogRows.create(
+            project_id,
+            EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR,
+            resource_id,
+        )
+        return
+
+    try:
+        IVFIndex(VectorStore(resource.project_id)).update()
+    except Exception:
+        resource.add_error(
+            traceback.format_exc(), EventTypes.RESOURCE_PROCESSING_ENCOUNTERED_ERROR
+        )
+        return
+
+    EventLogRows.create(resource.project_id, EventTypes.RESOURCE_INDEXED, resource_id)
+
+
+@job(name="update_ivf_index", timeout=600)
+def update_ivf_index(project_id, resource_id):
+    run_update_ivf_index(project_id, resource_id)
+
+
+@job(name="update_ivf_index_batch", timeout=600)
+@instrument(Stage.INDEX)
+def update_ivf_index_batch(project_id, resource_ids: list[int]):
+    """Update the index once for the whole batch."""
+    batch = ResourceBatch(project_id, resource_ids)
+    try:
+        IVFIndex(VectorStore(project_id)).update()
+    except Exception:
+        batch.fail_all(traceback.format_exc())
+    batch.save(EventTypes.RESOURCE_INDEXED)
+
+
+async def aupdate_ivf_index(project_id, resource_id):
+    await sync_to_async(run_update_ivf_index, thread_sensitive=False)(
+        project_id, resource_id
+    )
+
+
+def index_dispatcher(project_config: Config):
+    return [update_ivf_index]
@@ -1,12 +1,15 @@
+from asgiref.sync import sync_to_async
 from configuration.models import Config
 from django_async_job_pipelines.jobs import job
 
-from common.constants import EventTypes
-from common.models import EventLogRows, ResourceRow
+from common.constants import EventTypes, ResourceStatus, Stage
+from common.jobs.batch import ResourceBatch
+from common.metrics import instrument
+from common.models import EventLogRows, ResourceRow, ResponseCacheRow
 
 
-@job(name="dummy rag", timeout=10)
-def dummy_rag(project_id, resource_id):
+@instrument(Stage.RAG)
+def run_dummy_rag(project_id, resource_id):
     resource = ResourceRow.get_by_id(id=resource_id)
 
     if not resource:
@@ -17,8 +20,24 @@ def dummy_rag(project_id, resource_id):
         )
         return
 
-    resource.set_processed()
-    EventLogRows.create(resource.project.id, EventTypes.RESOURCE_PROCESSED, resource_id)
+    resource.set_processed(EventTypes.RESOURCE_PROCESSED)
+    ResponseCacheRow.invalidate(project_id)
+
+
+@job(name="dummy rag", timeout=10)
+def dummy_rag(project_id, resource_id):
+    run_dummy_rag(project_id, resource_id)
+
+
+@job(name="dummy_rag_batch", timeout=60)
+@instrument(Stage.RAG)
+def dummy_rag_batch(project_id, resource_ids: list[int]):
+    batch = ResourceBatch(project_id, resource_ids)
+    batch.save(EventTypes.RESOURCE_PROCESSED, ResourceStatus.PROCESSED)
+
+
+async def adummy_rag(project_id, resource_id):
+    await sync_to_async(run_dummy_rag, thread_sensitive=False)(project_id, resource_id)
 
 
 def rag_dispatcher(project_config: Config):
@@ -0,0 +1,52 @@
+import json
+from typing import AsyncIterator
+
+from django.conf import settings
+
+from common.http_client import AsyncHttpClient
+
+OLLAMA_PREFIXES = ("ollama_chat/", "ollama/")
+
+
+async def astream_chat(
+    model_name: str, messages: list[dict], context_window: int | None = None
+) -> AsyncIterator[str]:
+    """Stream the reply to `messages` as the model generates it.
+
+    `model_name` is a `provider/model` name as kept in `LLMModelRow`, e.g.
+    `ollama_chat/qwen3:4b`.
+    """
+    for prefix in OLLAMA_PREFIXES:
+        if model_name.startswith(prefix):
+            async for piece in astream_ollama_chat(
+                model_name.removeprefix(prefix), messages, context_window
+            ):
+                yield piece
+            return
+    raise ValueError(f"Streaming is not supported for: {model_name}")
+
+
+async def astream_ollama_chat(
+    model: str, messages: list[dict], context_window: int | None = None
+) -> AsyncIterator[str]:
+    """Ollama's `/api/chat` answers with one JSON object per line."""
+    body = {"model": model, "messages": messages, "stream": True}
+    if context_window:
+        # Ollama would otherwise cut prompts to its default context size
+        body["options"] = {"num_ctx": context_window}
+    async with AsyncHttpClient.get().stream(
+        "POST", f"{settings.OLLAMA_BASE_URL}/api/chat", json=body
+    ) as resp:
+        if resp.status_code != 200:
+            await resp.aread()
+            raise RuntimeError(f"Ollama error {resp.status_code}: {resp.text}")
+        async for line in resp.aiter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            if "error" in data:
+                raise RuntimeError(f"Ollama error: {data['error']}")
+            if piece := data.get("message", {}).get("content"):
+                yield piece
+            if data.get("done"):
+                return
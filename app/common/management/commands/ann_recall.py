@@ -0,0 +1,48 @@
+import time
+
+import djclick as click
+import numpy as np
+
+from common.vectors.ivf import IVFIndex
+from common.vectors.store import VectorStore
+
+
+@click.command()
+@click.argument("project_id", type=int)
+@click.option("--k", default=10)
+@click.option("--queries", default=100, help="Stored vectors used as queries")
+@click.option("--nprobes", default="1,2,4,8,16,32", help="Comma separated")
+@click.option("--retrain", is_flag=True, help="Retrain the index before measuring")
+def command(project_id, k, queries, nprobes, retrain):
+    """Report IVF recall and latency against brute force for a project."""
+    store = VectorStore(project_id)
+    index = IVFIndex(store)
+    if retrain or not index.is_trained():
+        index.train()
+    else:
+        index.update()
+    if not index.is_trained():
+        raise click.ClickException(f"No vectors stored for project {project_id}")
+
+    _, vectors = store.load()
+    rng = np.random.default_rng(0)
+    sample = vectors[
+        rng.choice(len(vectors), min(queries, len(vectors)), replace=False)
+    ]
+    # perturb the stored vectors so a query is not trivially its own neighbour
+    sample = sample + rng.normal(scale=0.05, size=sample.shape).astype(np.float32)
+
+    start = time.perf_counter()
+    for q in sample:
+        store.search(q, k)
+    brute_ms = (time.perf_counter() - start) * 1000 / len(sample)
+
+    click.echo(f"vectors={len(vectors)} k={k} queries={len(sample)}")
+    click.echo(f"brute force: {brute_ms:.2f} ms/query")
+    click.echo(f"{'nprobe':>8} {'recall':>8} {'ms/query':>10}")
+    for nprobe in [int(n) for n in nprobes.split(",")]:
+        start = time.perf_counter()
+        for q in sample:
+            index.search(q, k, nprobe)
+        ms = (time.perf_counter() - start) * 1000 / len(sample)
+        click.echo(f"{nprobe:>8} {index.recall(sample, k, nprobe):>8.3f} {ms:>10.2f}")
@@ -0,0 +1,159 @@
+import asyncio
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import djclick as click
+from django.conf import settings
+from django.db import connection
+from django.test.utils import override_settings
+
+from common.constants import ChunkerType, FAKE_MODELS, ProcessorType, Provider
+from common.jobs.async_runner import AsyncRunner
+from common.jobs.job_dispatcher import BATCH_JOBS, Planner
+from common.models import ProjectRow, ResourceRow
+from configuration.models import (
+    DownloaderRow,
+    EmbedderRow,
+    LLMModelRow,
+    ProcessorRow,
+    ProjectConfigRow,
+    TextExtractorRow,
+    ensure_default_rows,
+)
+
+PAGE = ("# A page\n\n" + "Some extracted markdown text. " * 40 + "\n\n") * 20
+
+
+def start_fake_reader(latency: float) -> ThreadingHTTPServer:
+    """A local stand-in for the Jina reader API answering after `latency`."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            body = PAGE.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def create_project(num_resources: int) -> tuple[ProjectRow, list[int]]:
+    ensure_default_rows()
+    project = ProjectRow.objects.create()
+    ProjectConfigRow.objects.create(
+        project=project,
+        downloader=DownloaderRow.objects.get(
+            downloader=DownloaderRow.Downloader.JINA_AI_API
+        ),
+        text_extractor=TextExtractorRow.objects.get(provider=Provider.JINA),
+        embedder=EmbedderRow.objects.get(
+            provider=Provider.FAKE, model_name=FAKE_MODELS.HASHING_EMBEDDINGS
+        ),
+        processor=ProcessorRow.objects.filter(
+            type=ProcessorType.SIMPLE_RAG, chunker__type=ChunkerType.FIXED
+        ).first(),
+        llm_model=LLMModelRow.objects.first(),
+    )
+    urls = [f"https://example.com/bench/{i}" for i in range(num_resources)]
+    return project, ResourceRow.bulk_create_for_project(project.id, urls)
+
+
+def run_threads(project: ProjectRow, resource_ids: list[int], threads: int):
+    """What the DJJP consumer does: each thread runs one job at a time."""
+    steps = Planner(ProjectConfigRow.get_config(project.id)).pipeline_steps()
+
+    def run_pipeline(resource_id):
+        for jobs in steps:
+            for j in jobs:
+                j(project.id, resource_id)
+        connection.close()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(run_pipeline, resource_ids))
+
+
+def run_batches(
+    project: ProjectRow, resource_ids: list[int], threads: int, batch_size: int
+):
+    """Like `run_threads`, each job handling a batch of resources."""
+    steps = Planner(ProjectConfigRow.get_config(project.id)).pipeline_steps()
+    steps = [[BATCH_JOBS[j] for j in jobs] for jobs in steps]
+    batches = [
+        resource_ids[start : start + batch_size]
+        for start in range(0, len(resource_ids), batch_size)
+    ]
+
+    def run_pipeline(batch):
+        for jobs in steps:
+            for j in jobs:
+                j(project.id, batch)
+        connection.close()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(run_pipeline, batches))
+
+
+def run_asyncio(project: ProjectRow, resource_ids: list[int]):
+    asyncio.run(AsyncRunner.from_settings(project.id).arun_until_idle())
+
+
+@click.command()
+@click.option("--resources", default=200, help="Resources processed per mode")
+@click.option("--latency", default=0.2, help="Seconds the fake reader takes")
+@click.option("--threads", default=None, type=int, help="Default: DJJP limit")
+@click.option("--batch-size", default=None, type=int, help="Default: JOB_RUNNER's")
+def command(resources, latency, threads, batch_size):
+    """Compare pipeline throughput of the thread and asyncio runner modes.
+
+    Resources go through the configured pipeline of a throwaway project whose
+    Jina reader is a local server with a fixed latency.
+    """
+    threads = threads or settings.DJJP["concurrency_limit"]
+    batch_size = batch_size or settings.JOB_RUNNER["batch_size"]
+    server = start_fake_reader(latency)
+    click.echo(f"{resources} resources, reader latency {latency}s")
+    click.echo(f"{'mode':>24} {'seconds':>8} {'resources/s':>12}")
+
+    modes = [
+        (f"threads ({threads})", lambda p, ids: run_threads(p, ids, threads)),
+        (
+            f"batches of {batch_size} ({threads})",
+            lambda p, ids: run_batches(p, ids, threads, batch_size),
+        ),
+        ("asyncio", run_asyncio),
+    ]
+    for name, run in modes:
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            override_settings(
+                JINA_READER_URL=f"http://127.0.0.1:{server.server_port}",
+                RATE_LIMITS={},  # the local reader has no quota
+                CONTENT_STORE_DIR=f"{tmp}/content",
+                VECTOR_STORE_DIR=f"{tmp}/vectors",
+                CONTENT_CACHE=settings.CONTENT_CACHE | {"dir": f"{tmp}/cache"},
+            ),
+        ):
+            project, resource_ids = create_project(resources)
+            try:
+                start = time.perf_counter()
+                run(project, resource_ids)
+                elapsed = time.perf_counter() - start
+                processed = ResourceRow.objects.filter(
+                    project=project, status=ResourceRow.Status.PROCESSED
+                ).count()
+            finally:
+                project.delete()
+        click.echo(f"{name:>24} {elapsed:>8.2f} {processed / elapsed:>12.1f}")
+
+    server.shutdown()
@@ -0,0 +1,40 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import djclick as click
+
+from common.content.pdf_scraper.pages import get_pool, iter_page_texts
+
+
+def extract_all(paths: list[Path], processes: int, pages_per_task: int) -> int:
+    """Extract every document, all of them sharing the process pool."""
+
+    def pages_of(path: Path) -> int:
+        return sum(1 for _ in iter_page_texts(path, processes, pages_per_task))
+
+    with ThreadPoolExecutor(max_workers=processes * 2) as threads:
+        return sum(threads.map(pages_of, paths))
+
+
+@click.command()
+@click.argument("pdf_dir", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--processes",
+    default=",".join(str(p) for p in sorted({1, 2, 4, os.cpu_count() or 1})),
+    help="Comma separated pool sizes",
+)
+@click.option("--pages-per-task", default=4)
+def command(pdf_dir, processes, pages_per_task):
+    """Time PDF text extraction of the PDFs in PDF_DIR for several pool sizes."""
+    paths = sorted(Path(pdf_dir).glob("*.pdf"))
+    click.echo(f"{len(paths)} PDFs, pages_per_task={pages_per_task}")
+    click.echo(f"{'processes':>10} {'pages':>8} {'seconds':>8} {'pages/s':>8}")
+
+    for n in [int(p) for p in processes.split(",")]:
+        list(get_pool(n).map(int, range(n)))  # start the workers outside the timing
+        start = time.perf_counter()
+        pages = extract_all(paths, n, pages_per_task)
+        elapsed = time.perf_counter() - start
+        click.echo(f"{n:>10} {pages:>8} {elapsed:>8.2f} {pages / elapsed:>8.1f}")
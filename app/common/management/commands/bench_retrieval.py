@@ -0,0 +1,45 @@
+import tempfile
+import time
+
+import djclick as click
+import numpy as np
+
+from common.vectors.store import VectorStore
+
+
+def fill_store(store: VectorStore, size: int, dim: int, rng: np.random.Generator):
+    block = 100_000
+    for start in range(0, size, block):
+        n = min(block, size - start)
+        store.append(
+            list(range(start, start + n)),
+            rng.standard_normal((n, dim), dtype=np.float32),
+        )
+
+
+@click.command()
+@click.option("--sizes", default="10000,100000,1000000", help="Comma separated")
+@click.option("--dim", default=256, help="Embedding dimension")
+@click.option("--k", default=10)
+@click.option("--queries", default=50, help="Queries timed per size")
+def command(sizes, dim, k, queries):
+    """Time brute-force top-k retrieval over synthetic vector stores."""
+    rng = np.random.default_rng(0)
+    click.echo(f"dim={dim} k={k} queries={queries}")
+    click.echo(f"{'chunks':>10} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+
+    for size in [int(s) for s in sizes.split(",")]:
+        with tempfile.TemporaryDirectory() as root:
+            store = VectorStore(project_id=0, root=root)
+            fill_store(store, size, dim, rng)
+            store.search(rng.standard_normal(dim), k)  # warm the page cache
+
+            timings = []
+            for _ in range(queries):
+                query = rng.standard_normal(dim)
+                start = time.perf_counter()
+                store.search(query, k)
+                timings.append((time.perf_counter() - start) * 1000)
+
+        p50, p95, worst = np.percentile(timings, [50, 95, 100])
+        click.echo(f"{size:>10} {p50:>10.2f} {p95:>10.2f} {worst:>10.2f}")
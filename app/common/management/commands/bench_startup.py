@@ -0,0 +1,61 @@
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import djclick as click
+from django.conf import settings
+
+COMMANDS = ["help", "check", "start_job_runner --help", "tui --help"]
+
+IMPORT_TIME = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def manage(args: list[str], *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, str(settings.BASE_DIR / "manage.py"), *args],
+        capture_output=True,
+        text=True,
+    )
+
+
+def slowest_imports(args: list[str], top: int) -> list[tuple[str, float]]:
+    """The top-level imports of a run taking longest, with what they import."""
+    stderr = manage(args, "-X", "importtime").stderr
+    imports = []
+    for match in IMPORT_TIME.finditer(stderr):
+        cumulative, indent, module = match.groups()
+        if len(indent) == 1:
+            imports.append((module, int(cumulative) / 1e6))
+    return sorted(imports, key=lambda i: -i[1])[:top]
+
+
+@click.command()
+@click.option(
+    "--command",
+    "commands",
+    multiple=True,
+    help=f"manage.py arguments to time, default: {', '.join(COMMANDS)}",
+)
+@click.option("--runs", default=5, help="Runs per command, the median is shown")
+@click.option("--top", default=5, help="Slowest imports listed per command")
+def command(commands, runs, top):
+    """Time how long `manage.py` commands take to start, and what they import.
+
+    Each command runs in a fresh interpreter; `--help` stops a command once
+    its module and everything it imports are loaded.
+    """
+    click.echo(f"{'command':>28} {'median s':>9} {'min s':>7}")
+    for cmd in commands or COMMANDS:
+        args = cmd.split()
+        seconds = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = manage(args)
+            seconds.append(time.perf_counter() - start)
+            if result.returncode != 0:
+                raise click.ClickException(f"{cmd} failed:\n{result.stderr}")
+        click.echo(f"{cmd:>28} {statistics.median(seconds):>9.3f} {min(seconds):>7.3f}")
+        for module, cumulative in slowest_imports(args, top):
+            click.echo(f"{'':>30}{module:<40} {cumulative:>6.3f}")
@@ -0,0 +1,70 @@
+import os
+
+import djclick as click
+from django.db import connection
+
+from common.content.store import ContentStore
+from common.models import ChunkRow, ResourceRow
+from configuration.models import ProjectConfigRow
+
+
+def megabytes(size: int) -> str:
+    return f"{size / 1024**2:.1f} MB"
+
+
+def vacuum() -> tuple[int, int]:
+    """Reclaim the space freed in the SQLite file, e.g. by dropped columns."""
+    path = connection.settings_dict["NAME"]
+    before = os.path.getsize(path)
+    with connection.cursor() as c:
+        c.execute("VACUUM")
+    return before, os.path.getsize(path)
+
+
+@click.command()
+@click.option("--project-id", type=int, default=None, help="Default: all projects")
+@click.option(
+    "--codec",
+    type=click.Choice(ProjectConfigRow.CompressionCodec.values),
+    default=None,
+    help="Default: the codec configured for each project",
+)
+@click.option("--level", type=int, default=None, help="Default: the project's level")
+@click.option("--vacuum", "run_vacuum", is_flag=True, help="Also VACUUM SQLite")
+def command(project_id, codec, level, run_vacuum):
+    """Rewrite stored resource text with compression, aligned to its chunks."""
+    resources = ResourceRow.objects.only("id", "project_id").order_by("id")
+    if project_id is not None:
+        resources = resources.filter(project_id=project_id)
+
+    stores: dict[int, ContentStore] = {}
+    count = before = after = 0
+    for r in resources.iterator(chunk_size=500):
+        if r.project_id not in stores:
+            store = ContentStore.for_project(r.project_id)
+            store.codec = codec or store.codec
+            store.level = store.level if level is None else level
+            stores[r.project_id] = store
+        store = stores[r.project_id]
+
+        size = store.size(r.project_id, r.id)
+        text = store.read(r.project_id, r.id)
+        if text is None:
+            continue
+        ends = ChunkRow.objects.filter(resource_id=r.id).order_by("index")
+        store.write_aligned(
+            r.project_id, r.id, text, list(ends.values_list("end", flat=True))
+        )
+        count += 1
+        before += size
+        after += store.size(r.project_id, r.id)
+
+    saved = 100 * (before - after) / before if before else 0
+    click.echo(
+        f"Rewrote {count} resources: {megabytes(before)} -> {megabytes(after)}"
+        f" ({saved:.1f}% saved)"
+    )
+
+    if run_vacuum and connection.vendor == "sqlite":
+        db_before, db_after = vacuum()
+        click.echo(f"Database: {megabytes(db_before)} -> {megabytes(db_after)}")
@@ -0,0 +1,49 @@
+from asgiref.sync import async_to_sync
+import djclick as click
+
+from common.content.download.arxiv import DownloadStatus, download_papers, search_arxiv
+from common.project_manager import ProjectManager
+
+
+@click.command()
+@click.argument("search_term")
+@click.option(
+    "--project-id", type=int, help="Add the downloaded papers to this project"
+)
+@click.option("--max-results", type=int, default=None, help="Default: all results")
+@click.option("--concurrency", type=int, default=None, help="Parallel downloads")
+@click.option("--batch-size", default=100, help="Papers added to the project at a time")
+def command(search_term, project_id, max_results, concurrency, batch_size):
+    """Download the PDFs of the arXiv papers matching SEARCH_TERM.
+
+    Papers already on disk are skipped and interrupted downloads are resumed,
+    so the command can simply be run again after a failure.
+    """
+    if project_id is not None:
+        try:
+            async_to_sync(ProjectManager.aget_import_config)(project_id)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    add_resources = async_to_sync(ProjectManager.abulk_add_resources)
+    counts = {}
+    urls = []
+
+    def flush():
+        if project_id is not None and urls:
+            result = add_resources(project_id, urls, batch_size)
+            counts["added"] = counts.get("added", 0) + len(result.resource_ids)
+        urls.clear()
+
+    papers = search_arxiv(search_term, max_results)
+    for result in download_papers(papers, concurrency=concurrency):
+        counts[result.status] = counts.get(result.status, 0) + 1
+        if result.status == DownloadStatus.FAILED:
+            click.secho(f"{result.paper.versioned_id}: {result.error}", fg="red")
+            continue
+        urls.append(result.paper.pdf_url)
+        if len(urls) >= batch_size:
+            flush()
+    flush()
+
+    click.echo(", ".join(f"{v} {k}" for k, v in counts.items()) or "No papers found")
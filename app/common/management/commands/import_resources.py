@@ -0,0 +1,22 @@
+import asyncio
+
+import djclick as click
+
+from common.project_manager import ProjectManager
+
+
+@click.command()
+@click.argument("project_id", type=int)
+@click.argument("urls_file", type=click.File("r"), default="-")
+@click.option("--batch-size", default=500, help="Rows inserted per query")
+def command(project_id, urls_file, batch_size):
+    """Add the URLs in URLS_FILE (one per line, `-` for stdin) to a project."""
+    result = asyncio.run(
+        ProjectManager.abulk_add_resources(project_id, urls_file, batch_size)
+    )
+
+    click.echo(f"Added {len(result.resource_ids)} resources to project-{project_id}")
+    if result.skipped_urls:
+        click.echo(f"Skipped {len(result.skipped_urls)} duplicate URLs")
+    for url in result.invalid_urls:
+        click.secho(f"Invalid URL: {url}", fg="red")
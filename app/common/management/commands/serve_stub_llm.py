@@ -0,0 +1,62 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import djclick as click
+
+REPLY = (
+    "This is a stub reply. It streams one word at a time so that the chat "
+    "view can be tried without a model. You asked: "
+)
+
+
+def stub_llm_server(
+    port: int, first_token_delay: float, token_delay: float
+) -> ThreadingHTTPServer:
+    """A stand-in for Ollama's streaming `/api/chat`; port 0 picks a free one."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/api/chat":
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            question = body["messages"][-1]["content"].split("Question: ")[-1]
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            time.sleep(first_token_delay)
+            for word in (REPLY + question).split(" "):
+                self.write_line(
+                    {
+                        "model": body["model"],
+                        "message": {"role": "assistant", "content": word + " "},
+                        "done": False,
+                    }
+                )
+                time.sleep(token_delay)
+            self.write_line({"model": body["model"], "done": True})
+
+        def write_line(self, data: dict):
+            self.wfile.write(json.dumps(data).encode() + b"\n")
+            self.wfile.flush()
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+
+@click.command()
+@click.option("--port", default=11435, help="Point OLLAMA_BASE_URL at this port")
+@click.option("--first-token-delay", default=0.5, help="Seconds before the reply")
+@click.option("--token-delay", default=0.05, help="Seconds between words")
+def command(port, first_token_delay, token_delay):
+    """Serve a stand-in for Ollama's streaming `/api/chat`, for tests."""
+    server = stub_llm_server(port, first_token_delay, token_delay)
+    click.echo(f"Stub LLM listening on http://127.0.0.1:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,38 @@
+import djclick as click
+
+from common.metrics import QUANTILES, summarize
+
+
+def seconds(values: list[float | None]) -> list[str]:
+    return ["-" if v is None else f"{v:.3f}" for v in values]
+
+
+@click.command()
+@click.option("--project-id", type=int, default=None, help="Default: all projects")
+@click.option("--hours", type=float, default=None, help="Default: METRICS window")
+@click.option("--by-project", is_flag=True, help="One line per stage and project")
+def command(project_id, hours, by_project):
+    """Print p50/p95/p99 of the pipeline stages, per resource in seconds."""
+    summaries = summarize(project_id, hours, by_project or project_id is not None)
+    if not summaries:
+        click.echo("No stage runs recorded")
+        return
+
+    qs = [f"p{round(q * 100)}" for q in QUANTILES]
+    click.echo(
+        f"{'stage':<8} {'project':>7} {'runs':>6} {'res':>6} "
+        + " ".join(f"{q:>8}" for q in qs)
+        + " "
+        + " ".join(f"{'wait ' + q:>9}" for q in qs)
+        + f" {'db s':>8} {'queries':>8} {'MB in':>8} {'MB out':>8} {'retries':>7}"
+    )
+    for s in summaries:
+        click.echo(
+            f"{s.stage:<8} {s.project_id or '*':>7} {s.runs:>6} {s.resources:>6} "
+            + " ".join(f"{v:>8}" for v in seconds(s.seconds))
+            + " "
+            + " ".join(f"{v:>9}" for v in seconds(s.queue_seconds))
+            + f" {s.db_seconds:>8.2f} {s.db_queries:>8}"
+            f" {s.bytes_in / 1024**2:>8.2f} {s.bytes_out / 1024**2:>8.2f}"
+            f" {s.retries:>7}"
+        )
@@ -1,6 +1,10 @@
+import asyncio
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
 
+from common.jobs.async_runner import AsyncRunner
 from common.jobs.extract_text.using_apis.jina_ai_api import (
     scrape_web_page_using_requests,
 )
@@ -8,5 +12,17 @@ from common.jobs.rags.simple import dummy_rag
 
 
 class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mode",
+            choices=["threads", "asyncio"],
+            default=None,
+            help="Default: JOB_RUNNER['mode']",
+        )
+
     def handle(self, *args, **options):
-        call_command("start_consumer")
+        mode = options["mode"] or settings.JOB_RUNNER["mode"]
+        if mode == "asyncio":
+            asyncio.run(AsyncRunner.from_settings().arun_forever())
+        else:
+            call_command("start_consumer")
@@ -0,0 +1,82 @@
+import signal
+import subprocess
+import sys
+import time
+
+import djclick as click
+from django.conf import settings
+from loguru import logger
+
+from common.jobs.async_runner import worker_name
+from common.models import ResourceRow
+
+RESTART_DELAY = 1  # seconds before restarting a worker that exited
+
+
+def start_worker(mode: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            str(settings.BASE_DIR / "manage.py"),
+            "start_job_runner",
+            "--mode",
+            mode,
+        ]
+    )
+
+
+@click.command()
+@click.option(
+    "--workers", type=int, default=None, help="Default: JOB_RUNNER['workers']"
+)
+@click.option(
+    "--mode",
+    type=click.Choice(["threads", "asyncio"]),
+    default="asyncio",
+    help="`threads` only runs a single worker",
+)
+def command(workers, mode):
+    """Run several job runner processes, restarting any that exits.
+
+    The workers claim new resources atomically in batches, and the unfinished
+    resources of a worker that exited are released, for the others to resume
+    from the step they reached. Only `asyncio` mode claims resources, so in
+    `threads` mode a single worker is run.
+    """
+    workers = workers or settings.JOB_RUNNER["workers"]
+    if mode == "threads" and workers > 1:
+        raise click.ClickException(
+            "threads mode does not claim resources, several workers would"
+            " process the same ones: use --mode asyncio or --workers 1"
+        )
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    procs = [start_worker(mode) for _ in range(workers)]
+    logger.info(f"Started {workers} {mode} job runners: {[p.pid for p in procs]}")
+
+    while not stopping:
+        time.sleep(RESTART_DELAY)
+        for i, p in enumerate(procs):
+            if stopping or p.poll() is None:
+                continue
+            released = ResourceRow.release_claims(worker_name(p.pid))
+            logger.warning(
+                f"Job runner {p.pid} exited with {p.returncode}, restarting"
+                f" ({released} claimed resources released)"
+            )
+            procs[i] = start_worker(mode)
+
+    logger.info("Stopping job runners")
+    for p in procs:
+        p.terminate()
+    for p in procs:
+        p.wait()
+        ResourceRow.release_claims(worker_name(p.pid))
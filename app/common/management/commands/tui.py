@@ -7,15 +7,13 @@ from textual.widgets import (
     Rule,
 )
 
-from configuration.models import create_default_rows
+from configuration.models import ensure_default_rows
 from common.models import (
     ProjectRow,
 )
-from common.project_manager import Project, ProjectManager
+from common.project_manager import Project, ProjectManager, ProjectOverview
 from tui.widgets.project import ProjectView, ProjectSummary
 
-create_default_rows()
-
 
 class CriticalReaderTUIApp(App):
     """The TUI for Critical Reader"""
@@ -36,14 +34,12 @@ class CriticalReaderTUIApp(App):
 
     async def on_mount(self):
         self.title = "Reading Pal"
-        async for c in ProjectManager.aget_all():
-            await self.mount(ProjectSummary(id=c.id_for_ui))
+        async for c in ProjectManager.aget_overviews():
+            summary = ProjectSummary(id=c.id_for_ui)
+            await self.mount(summary)
+            summary.make_rows(c)
             await self.mount(Rule())
 
-        async for c in ProjectManager.aget_all():
-            data_table = self.query_one(f"#{c.id_for_ui}", ProjectSummary)
-            data_table.make_rows(c)
-
     def action_toggle_dark(self) -> None:
         """An action to toggle dark mode."""
         self.theme = (
@@ -55,11 +51,11 @@ class CriticalReaderTUIApp(App):
 
     async def action_create_project(self):
         project_row = await ProjectRow.acreate()
-        project: Project = await Project.acreate_from_db_row(project_row)
-        self.mount(ProjectSummary(id=project.id_for_ui))
-        data_table = self.query_one(f"#{project.id_for_ui}", ProjectSummary)
-        data_table.make_rows(project)
-        self.mount(Rule())
+        project = ProjectOverview.from_values({"id": project_row.id})
+        summary = ProjectSummary(id=project.id_for_ui)
+        await self.mount(summary)
+        summary.make_rows(project)
+        await self.mount(Rule())
 
     async def on_project_summary_selected(self, message: ProjectSummary.Selected):
         project_ui_id = message.project_id
@@ -69,6 +65,7 @@ class CriticalReaderTUIApp(App):
 
 @click.command()
 def command():
+    ensure_default_rows()
     app = CriticalReaderTUIApp()
     event = app.run()
     print(event)
@@ -0,0 +1,276 @@
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from common.models import StageMetricRow
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass
+class Measurement:
+    stage: str
+    project_id: int
+    resource_id: int | None
+    resources: int
+    started_at: datetime = field(default_factory=timezone.now)
+    wall_seconds: float = 0
+    db_seconds: float = 0
+    db_queries: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    retries: int = 0
+    # pool threads running with a copy of the job's context share the measurement
+    lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add(self, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record(self):
+        if not settings.METRICS["enabled"]:
+            return
+        queue_seconds = None
+        if self.resource_id is not None:
+            ready_at = StageMetricRow.ready_at(self.resource_id)
+            if ready_at:
+                queue_seconds = (self.started_at - ready_at).total_seconds()
+        StageMetricRow.objects.create(
+            project_id=self.project_id,
+            resource_id=self.resource_id,
+            resources=self.resources,
+            stage=self.stage,
+            started_at=self.started_at,
+            wall_seconds=self.wall_seconds,
+            queue_seconds=queue_seconds,
+            db_seconds=self.db_seconds,
+            db_queries=self.db_queries,
+            bytes_in=self.bytes_in,
+            bytes_out=self.bytes_out,
+            retries=self.retries,
+        )
+
+
+# the measurement of the stage running in this thread or task, if any
+_current: ContextVar[Measurement | None] = ContextVar("measurement", default=None)
+
+
+@contextmanager
+def measuring(
+    stage: str, project_id: int, resources: int | list[int] | None = None
+) -> Iterator[Measurement]:
+    """Measure the code in the block; `record()` the result once outside it."""
+    ids = resources if isinstance(resources, list) else [resources]
+    m = Measurement(
+        stage,
+        project_id,
+        ids[0] if ids else None,
+        len(ids) if resources is not None else 0,
+    )
+    token = _current.set(m)
+    start = time.perf_counter()
+    try:
+        yield m
+    finally:
+        m.wall_seconds = time.perf_counter() - start
+        _current.reset(token)
+
+
+def instrument(stage: str):
+    """Measure each call of a job taking `(project_id, resource_id or ids)`."""
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def awrapper(project_id, resources, *args, **kwargs):
+                try:
+                    with measuring(stage, project_id, resources) as m:
+                        return await fn(project_id, resources, *args, **kwargs)
+                finally:
+                    await sync_to_async(m.record)()
+
+            return awrapper
+
+        @functools.wraps(fn)
+        def wrapper(project_id, resources, *args, **kwargs):
+            try:
+                with measuring(stage, project_id, resources) as m:
+                    return fn(project_id, resources, *args, **kwargs)
+            finally:
+                m.record()
+
+        return wrapper
+
+    return decorator
+
+
+def count_bytes(bytes_in: int = 0, bytes_out: int = 0):
+    if m := _current.get():
+        m.add(bytes_in=bytes_in, bytes_out=bytes_out)
+
+
+def count_retry():
+    if m := _current.get():
+        m.add(retries=1)
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper adding the query to the current measurement."""
+    m = _current.get()
+    if m is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        m.add(db_seconds=time.perf_counter() - start, db_queries=1)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def percentiles(values: list[float]) -> list[float | None]:
+    if not values:
+        return [None for _ in QUANTILES]
+    import numpy as np  # the app loads this module at startup, see `apps.py`
+
+    return [float(v) for v in np.quantile(values, QUANTILES)]
+
+
+@dataclass
+class StageSummary:
+    stage: str
+    project_id: int | None
+    runs: int
+    resources: int
+    seconds: list[float | None]  # per resource, at each of QUANTILES
+    queue_seconds: list[float | None]
+    db_seconds: float
+    db_queries: int
+    bytes_in: int
+    bytes_out: int
+    retries: int
+
+
+def summarize(
+    project_id: int | None = None,
+    hours: float | None = None,
+    by_project: bool = False,
+) -> list[StageSummary]:
+    """Percentiles of the stage runs of the last `hours`, per stage and
+    optionally per project."""
+    hours = settings.METRICS["window_hours"] if hours is None else hours
+    rows = StageMetricRow.objects.filter(
+        started_at__gte=timezone.now() - timedelta(hours=hours)
+    )
+    if project_id is not None:
+        rows = rows.filter(project_id=project_id)
+
+    groups: dict[tuple[str, int | None], list] = {}
+    for row in rows.values_list(
+        "stage",
+        "project_id",
+        "resources",
+        "wall_seconds",
+        "queue_seconds",
+        "db_seconds",
+        "db_queries",
+        "bytes_in",
+        "bytes_out",
+        "retries",
+    ).iterator(chunk_size=2000):
+        key = (row[0], row[1] if by_project else None)
+        groups.setdefault(key, []).append(row)
+
+    summaries = []
+    for (stage, pid), group in sorted(groups.items(), key=lambda g: str(g[0])):
+        summaries.append(
+            StageSummary(
+                stage=stage,
+                project_id=pid,
+                runs=len(group),
+                resources=sum(r[2] for r in group),
+                seconds=percentiles([r[3] / max(r[2], 1) for r in group]),
+                queue_seconds=percentiles([r[4] for r in group if r[4] is not None]),
+                db_seconds=sum(r[5] for r in group),
+                db_queries=sum(r[6] for r in group),
+                bytes_in=sum(r[7] for r in group),
+                bytes_out=sum(r[8] for r in group),
+                retries=sum(r[9] for r in group),
+            )
+        )
+    return summaries
+
+
+def prometheus_text() -> str:
+    """The metrics in the Prometheus text exposition format.
+
+    Quantiles cover `METRICS["window_hours"]`, the totals every recorded run.
+    """
+    lines = []
+
+    def quantile_gauge(name: str, help: str, attr: str):
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} gauge")
+        for s in summaries:
+            for q, value in zip(QUANTILES, getattr(s, attr)):
+                if value is not None:
+                    lines.append(
+                        f'{name}{{stage="{s.stage}",quantile="{q}"}} {value:.6f}'
+                    )
+
+    summaries = summarize()
+    quantile_gauge(
+        "critical_reader_stage_seconds",
+        "Wall time per resource of pipeline stage runs.",
+        "seconds",
+    )
+    quantile_gauge(
+        "critical_reader_stage_queue_seconds",
+        "Time resources waited for a pipeline stage.",
+        "queue_seconds",
+    )
+
+    totals = StageMetricRow.objects.values("stage").annotate(
+        runs=Sum("resources"),
+        wall_seconds=Sum("wall_seconds"),
+        db_seconds=Sum("db_seconds"),
+        db_queries=Sum("db_queries"),
+        bytes_in=Sum("bytes_in"),
+        bytes_out=Sum("bytes_out"),
+        retries=Sum("retries"),
+    )
+    counters = [
+        ("resources", "runs", "Resources that went through the stage."),
+        ("seconds", "wall_seconds", "Wall time spent in the stage."),
+        ("db_seconds", "db_seconds", "Time spent in database queries."),
+        ("db_queries", "db_queries", "Database queries."),
+        ("bytes_in", "bytes_in", "Bytes read by the stage."),
+        ("bytes_out", "bytes_out", "Bytes written by the stage."),
+        ("retries", "retries", "Retried provider API calls."),
+    ]
+    totals = list(totals.order_by("stage"))
+    for name, key, help in counters:
+        metric = f"critical_reader_stage_{name}_total"
+        lines.append(f"# HELP {metric} {help}")
+        lines.append(f"# TYPE {metric} counter")
+        for t in totals:
+            lines.append(f'{metric}{{stage="{t["stage"]}"}} {t[key] or 0}')
+    return "\n".join(lines) + "\n"
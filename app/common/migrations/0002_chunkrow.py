@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2025-12-02 18:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.IntegerField()),
+                ('start', models.IntegerField()),
+                ('end', models.IntegerField()),
+                ('content', models.TextField()),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='common.projectrow')),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='common.resourcerow')),
+            ],
+            options={
+                'unique_together': {('resource', 'index')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2025-12-03 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_chunkrow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chunkrow',
+            name='is_embedded',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2025-12-06 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_chunkrow_is_embedded'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentCacheRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('url', models.TextField()),
+                ('extractor', models.CharField(max_length=1024)),
+                ('model_name', models.CharField(max_length=1024)),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('etag', models.CharField(blank=True, max_length=1024, null=True)),
+                ('last_modified', models.CharField(blank=True, max_length=1024, null=True)),
+                ('date_fetched', models.DateTimeField()),
+                ('date_accessed', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
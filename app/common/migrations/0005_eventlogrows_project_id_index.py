@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0004_contentcacherow'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventlogrows',
+            index=models.Index(fields=['project', 'id'], name='common_even_project_b27a29_idx'),
+        ),
+    ]
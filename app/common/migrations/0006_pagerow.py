@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0005_eventlogrows_project_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.IntegerField()),
+                ('start', models.IntegerField()),
+                ('end', models.IntegerField()),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pages', to='common.resourcerow')),
+            ],
+            options={
+                'unique_together': {('resource', 'number')},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:20
+
+from django.db import migrations
+
+from common.migrations._content_files import read_text, write_text
+
+
+def move_to_store(apps, schema_editor):
+    ResourceRow = apps.get_model('common', 'ResourceRow')
+    rows = (
+        ResourceRow.objects.exclude(scraped_content__isnull=True)
+        .only('id', 'project_id', 'scraped_content')
+        .iterator(chunk_size=100)
+    )
+    for r in rows:
+        write_text(r.project_id, r.id, r.scraped_content)
+
+
+def move_to_db(apps, schema_editor):
+    ResourceRow = apps.get_model('common', 'ResourceRow')
+    for r in list(ResourceRow.objects.only('id', 'project_id')):
+        content = read_text(r.project_id, r.id)
+        if content is not None:
+            ResourceRow.objects.filter(id=r.id).update(scraped_content=content)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0006_pagerow'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_to_store, move_to_db),
+        migrations.RemoveField(
+            model_name='resourcerow',
+            name='scraped_content',
+        ),
+    ]
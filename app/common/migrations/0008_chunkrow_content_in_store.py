@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:40
+
+from django.db import migrations
+
+from common.migrations._content_files import read_text
+
+
+def restore_chunk_contents(apps, schema_editor):
+    ChunkRow = apps.get_model('common', 'ChunkRow')
+    chunks = list(
+        ChunkRow.objects.order_by('resource_id').values_list(
+            'id', 'project_id', 'resource_id', 'start', 'end'
+        )
+    )
+    texts = {}
+    for id, project_id, resource_id, start, end in chunks:
+        if resource_id not in texts:
+            texts = {resource_id: read_text(project_id, resource_id) or ''}
+        content = texts[resource_id][start:end]
+        ChunkRow.objects.filter(id=id).update(content=content)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0007_move_scraped_content_to_store'),
+    ]
+
+    operations = [
+        # chunks are read from the resource's text in the content store
+        migrations.RunPython(migrations.RunPython.noop, restore_chunk_contents),
+        migrations.RemoveField(
+            model_name='chunkrow',
+            name='content',
+        ),
+    ]
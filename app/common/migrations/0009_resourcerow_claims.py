@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0008_chunkrow_content_in_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resourcerow',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resourcerow',
+            name='claimed_by',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='resourcerow',
+            index=models.Index(fields=['status', 'id'], name='common_reso_status_4b83b1_idx'),
+        ),
+    ]
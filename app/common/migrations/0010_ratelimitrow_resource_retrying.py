@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0009_resourcerow_claims'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=1024, unique=True)),
+                ('empty_at', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='resourcerow',
+            name='status',
+            field=models.CharField(choices=[('New', 'New'), ('Downloaded', 'Downloaded'), ('Scraped', 'Scraped'), ('Error', 'Error'), ('Processed', 'Processed'), ('Retrying', 'Retrying')], default='New', max_length=1024),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0010_ratelimitrow_resource_retrying'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StageMetricRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_id', models.BigIntegerField(null=True)),
+                ('resources', models.IntegerField(default=1)),
+                ('stage', models.CharField(max_length=64)),
+                ('started_at', models.DateTimeField()),
+                ('wall_seconds', models.FloatField()),
+                ('queue_seconds', models.FloatField(null=True)),
+                ('db_seconds', models.FloatField(default=0)),
+                ('db_queries', models.IntegerField(default=0)),
+                ('bytes_in', models.BigIntegerField(default=0)),
+                ('bytes_out', models.BigIntegerField(default=0)),
+                ('retries', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='common.projectrow')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resource_id', 'id'], name='common_stag_resourc_cbda30_idx'), models.Index(fields=['started_at'], name='common_stag_started_3820c7_idx')],
+            },
+        ),
+    ]
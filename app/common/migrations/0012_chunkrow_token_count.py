@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0011_stagemetricrow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chunkrow',
+            name='token_count',
+            field=models.IntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0012_chunkrow_token_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseCacheRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=1024)),
+                ('context_key', models.CharField(max_length=64)),
+                ('question', models.TextField()),
+                ('question_vector', models.BinaryField(null=True)),
+                ('answer', models.TextField()),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_accessed', models.DateTimeField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='common.projectrow')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'model_name', 'context_key'], name='common_resp_project_068a23_idx'), models.Index(fields=['project', 'date_accessed'], name='common_resp_project_06862d_idx')],
+            },
+        ),
+    ]
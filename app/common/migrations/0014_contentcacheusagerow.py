@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:10
+
+from django.db import migrations, models
+from django.db.models import Min, Sum
+
+
+def count_cached_bytes(apps, schema_editor):
+    ContentCacheRow = apps.get_model('common', 'ContentCacheRow')
+    ContentCacheUsageRow = apps.get_model('common', 'ContentCacheUsageRow')
+    # entries sharing a blob have the same hash and size, count one of each
+    one_per_blob = ContentCacheRow.objects.values('content_hash').annotate(
+        first=Min('id')
+    ).values('first')
+    total = ContentCacheRow.objects.filter(id__in=one_per_blob).aggregate(
+        total=Sum('size')
+    )['total']
+    ContentCacheUsageRow.objects.create(id=1, bytes=total or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0013_responsecacherow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentCacheUsageRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bytes', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_cached_bytes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+"""Content store file access as of the migrations that move text out of the
+database, frozen so that later changes to `ContentStore` do not alter them."""
+
+import json
+import os
+import struct
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+
+FOOTER = struct.Struct("<Q")
+
+
+def text_path(project_id, resource_id) -> Path:
+    return (
+        Path(settings.CONTENT_STORE_DIR)
+        / f"project-{project_id}"
+        / f"{resource_id}.txt"
+    )
+
+
+def write_text(project_id, resource_id, content: str):
+    path = text_path(project_id, resource_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(content, encoding="utf-8")
+    tmp.replace(path)
+
+
+def read_text(project_id, resource_id) -> str | None:
+    """The stored text, also when it was since compressed into frames."""
+    path = text_path(project_id, resource_id)
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    frames_path = path.with_suffix(".frames")
+    if not frames_path.exists():
+        return None
+    data = frames_path.read_bytes()
+    (index_offset,) = FOOTER.unpack(data[-FOOTER.size :])
+    index = json.loads(data[index_offset : -FOOTER.size])
+    return "".join(
+        _decompress(index["codec"], data[offset : offset + length]).decode("utf-8")
+        for _, _, offset, length in index["frames"]
+    )
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "none":
+        return data
+    if codec == "zlib":
+        return zlib.decompress(data)
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompress(data)
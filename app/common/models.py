@@ -1,15 +1,25 @@
+import time
+from collections import defaultdict
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
-from datetime import datetime
-from typing import Self
-
-from django.db import models
+from datetime import datetime, timedelta
+from typing import Iterable, Self
+
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from django_llm_chat.models import Chat
 
 from common.constants import (
+    ChangeKind,
     ResourceStatus,
     EventTypes,
 )
+from common.content.store import ContentStore
+from common.notifications import publish, publish_on_commit
+from common.tokens import estimate_tokens
 
 if TYPE_CHECKING:
     from django.db.models.manager import RelatedManager
@@ -28,6 +38,7 @@ class ResourceRow(models.Model):
         SCRAPED = ResourceStatus.SCRAPED, ResourceStatus.SCRAPED
         ERROR = ResourceStatus.ERROR, ResourceStatus.ERROR
         PROCESSED = ResourceStatus.PROCESSED, ResourceStatus.PROCESSED
+        RETRYING = ResourceStatus.RETRYING, ResourceStatus.RETRYING
 
     project = models.ForeignKey(
         "ProjectRow", on_delete=models.CASCADE, related_name="resources"
@@ -39,38 +50,90 @@ class ResourceRow(models.Model):
     status = models.CharField(
         max_length=1024, choices=Status.choices, default=Status.NEW
     )
-    scraped_content = models.TextField(null=True, blank=True)
     error_msg = models.TextField(null=True, blank=True)
+    # the job runner process that took the resource, see `aclaim`
+    claimed_by = models.CharField(max_length=255, null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
     if TYPE_CHECKING:
         id: int
+        project_id: int
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"])]
+
+    # statuses a job runner may still have to move the resource out of
+    UNFINISHED = (Status.NEW, Status.DOWNLOADED, Status.SCRAPED, Status.RETRYING)
+
+    # enough to list resources, the extracted text is in the `ContentStore`
+    LIST_FIELDS = ("id", "project_id", "url", "status", "error_msg", "date_updated")
+
+    def transition(
+        self,
+        status: str,
+        event_type: str | None = None,
+        error_msg: str | None = None,
+    ):
+        """Move to `status`, writing only the changed columns, and log
+        `event_type` for the resource in the same transaction."""
+        self.status = status
+        fields = ["status", "date_updated"]
+        if error_msg is not None:
+            self.error_msg = error_msg
+            fields.append("error_msg")
+        with transaction.atomic():
+            self.save(update_fields=fields)
+            if event_type:
+                EventLogRows.create(self.project_id, event_type, self.id)
+            publish_on_commit(ChangeKind.RESOURCE, self.project_id, [self.id])
+
+    async def atransition(
+        self,
+        status: str,
+        event_type: str | None = None,
+        error_msg: str | None = None,
+    ):
+        await sync_to_async(self.transition)(status, event_type, error_msg)
+
+    def set_download_finishied(self, event_type: str | None = None):
+        self.transition(self.Status.DOWNLOADED, event_type)
+
+    def set_scraping_finished(self, event_type: str | None = None):
+        self.transition(self.Status.SCRAPED, event_type)
+
+    def set_processed(self, event_type: str | None = None):
+        self.transition(self.Status.PROCESSED, event_type)
+
+    def set_retrying(self, event_type: str | None = None):
+        self.transition(self.Status.RETRYING, event_type)
+
+    def add_error(self, error_msg: str, event_type: str | None = None):
+        self.transition(self.Status.ERROR, event_type, error_msg)
+
+    async def aadd_error(self, error_msg: str, event_type: str | None = None):
+        await self.atransition(self.Status.ERROR, event_type, error_msg)
 
-    def set_download_finishied(self):
-        self.status = self.Status.DOWNLOADED
-        self.save()
-
-    def set_scraping_finished(self):
-        self.status = self.Status.SCRAPED
-        self.save()
-
-    def set_processed(self):
-        self.status = self.Status.PROCESSED
-        self.save()
-
-    def add_error(self, error_msg: str):
-        self.status = self.Status.ERROR
-        self.error_msg = error_msg
-        self.save()
+    @classmethod
+    async def aget_all_by_project_id(cls, project_id: int):
+        async for r in (
+            cls.objects.filter(project_id=project_id)
+            .only(*cls.LIST_FIELDS)
+            .order_by("-date_updated")
+        ):
+            yield r
 
-    async def aadd_error(self, error_msg: str):
-        self.status = self.Status.ERROR
-        self.error_msg = error_msg
-        await self.asave()
+    @classmethod
+    async def aget_by_ids(cls, ids: list[int]):
+        async for r in cls.objects.filter(id__in=ids).only(*cls.LIST_FIELDS):
+            yield r
 
     @classmethod
-    async def aget_all_by_project_id(cls, project_id: int):
-        async for r in cls.objects.filter(
-            project_id=project_id,
-        ).order_by("-date_updated"):
+    async def aget_page(cls, project_id: int, before_id: int | None, limit: int):
+        """Up to `limit` resources of the project, newest first, older than
+        `before_id` to fetch the next page."""
+        rows = cls.objects.filter(project_id=project_id)
+        if before_id is not None:
+            rows = rows.filter(id__lt=before_id)
+        async for r in rows.only(*cls.LIST_FIELDS).order_by("-id")[:limit]:
             yield r
 
     @classmethod
@@ -79,6 +142,7 @@ class ResourceRow(models.Model):
             project_id=project_id,
             url=url,
         )
+        publish(ChangeKind.RESOURCE, project_id, [res.id])
         await EventLogRows.acreate(
             project_id,
             EventTypes.RESOURCE_ADDED,
@@ -86,6 +150,128 @@ class ResourceRow(models.Model):
         )
         return res
 
+    @classmethod
+    def bulk_transition(
+        cls,
+        project_id: int,
+        ids: list[int],
+        status: str,
+        event_type: str | None = None,
+    ):
+        """`transition` for many resources: one UPDATE and one events INSERT."""
+        with transaction.atomic():
+            cls.objects.filter(id__in=ids).update(
+                status=status, date_updated=timezone.now()
+            )
+            if event_type:
+                EventLogRows.bulk_create_events(project_id, event_type, ids)
+            publish_on_commit(ChangeKind.RESOURCE, project_id, ids)
+
+    @classmethod
+    def bulk_add_errors(
+        cls, project_id: int, errors: dict[int, str], event_type: str | None = None
+    ):
+        """Fail many resources, each with its own error message."""
+        now = timezone.now()
+        with transaction.atomic():
+            cls.objects.bulk_update(
+                [
+                    cls(id=id, status=cls.Status.ERROR, error_msg=msg, date_updated=now)
+                    for id, msg in errors.items()
+                ],
+                ["status", "error_msg", "date_updated"],
+                batch_size=500,
+            )
+            if event_type:
+                EventLogRows.bulk_create_events(project_id, event_type, list(errors))
+            publish_on_commit(ChangeKind.RESOURCE, project_id, list(errors))
+
+    @classmethod
+    async def aclaim(
+        cls,
+        worker: str,
+        limit: int,
+        stale_after: float,
+        project_id: int | None = None,
+        exclude: Iterable[int] = (),
+    ) -> list[tuple[int, int, str]]:
+        """Claim up to `limit` unfinished resources for `worker`, returning
+        their `(id, project_id, status)`.
+
+        The claim is a single conditional UPDATE, so concurrent workers never
+        get the same resource. Resources that are not claimed, or whose claim
+        is older than `stale_after` seconds, e.g. of a worker that died
+        mid-pipeline, can be taken over; their status tells where to resume.
+        """
+        now = timezone.now()
+        free = Q(claimed_by__isnull=True) | Q(
+            claimed_at__lt=now - timedelta(seconds=stale_after)
+        )
+        candidates = cls.objects.filter(free, status__in=cls.UNFINISHED).exclude(
+            id__in=list(exclude)
+        )
+        if project_id is not None:
+            candidates = candidates.filter(project_id=project_id)
+        candidates = candidates.order_by("id").values("id")[:limit]
+
+        claimed = await cls.objects.filter(free, id__in=candidates).aupdate(
+            claimed_by=worker, claimed_at=now
+        )
+        if not claimed:
+            return []
+        return [
+            r
+            async for r in cls.objects.filter(claimed_by=worker, claimed_at=now)
+            .order_by("id")
+            .values_list("id", "project_id", "status")
+        ]
+
+    @classmethod
+    async def arenew_claims(cls, worker: str, ids: Iterable[int]) -> int:
+        """Keep the claims of resources still being processed from going stale."""
+        return await cls.objects.filter(claimed_by=worker, id__in=list(ids)).aupdate(
+            claimed_at=timezone.now()
+        )
+
+    @classmethod
+    def release_claims(cls, worker: str) -> int:
+        """Free the unfinished resources claimed by `worker`, e.g. after it
+        exited, for other workers to resume."""
+        return cls.objects.filter(claimed_by=worker, status__in=cls.UNFINISHED).update(
+            claimed_by=None, claimed_at=None
+        )
+
+    @classmethod
+    def bulk_create_for_project(
+        cls, project_id: int, urls: list[str], batch_size: int = 500
+    ) -> list[int]:
+        """Insert resources and their `RESOURCE_ADDED` events in batches."""
+        ids = []
+        for start in range(0, len(urls), batch_size):
+            with transaction.atomic():
+                rows = cls.objects.bulk_create(
+                    [
+                        cls(project_id=project_id, url=url)
+                        for url in urls[start : start + batch_size]
+                    ]
+                )
+                batch_ids = [r.id for r in rows]
+                EventLogRows.bulk_create_events(
+                    project_id, EventTypes.RESOURCE_ADDED, batch_ids
+                )
+                publish_on_commit(ChangeKind.RESOURCE, project_id, batch_ids)
+            ids.extend(batch_ids)
+        return ids
+
+    @classmethod
+    async def aget_urls_for_project(cls, project_id: int) -> set[str]:
+        return {
+            u
+            async for u in cls.objects.filter(project_id=project_id).values_list(
+                "url", flat=True
+            )
+        }
+
     @classmethod
     def get_by_id(cls, id: int | str) -> Self | None:
         try:
@@ -94,8 +280,212 @@ class ResourceRow(models.Model):
             return
 
     def add_scraped_content(self, content: str):
-        self.scraped_content = content
-        self.save()
+        from common.metrics import count_bytes
+
+        ContentStore.for_project(self.project_id).write(
+            self.project_id, self.id, content
+        )
+        count_bytes(bytes_out=self.scraped_content_size())
+
+    def scraped_content_size(self) -> int:
+        """Bytes the text takes in the store, compressed or not."""
+        return ContentStore().size(self.project_id, self.id)
+
+    def scraped_content_writer(self):
+        """Context manager giving a file to stream the extracted text into."""
+        return ContentStore.for_project(self.project_id).writer(
+            self.project_id, self.id
+        )
+
+    def open_scraped_content(self):
+        """Streaming reader of the extracted text, `None` if there is none."""
+        return ContentStore().open(self.project_id, self.id)
+
+    def read_scraped_content(self) -> str | None:
+        return ContentStore().read(self.project_id, self.id)
+
+
+@dataclass
+class Page:
+    number: int  # 0-based
+    start: int
+    end: int
+
+
+class PageRow(models.Model):
+    """Where each page of an extracted document is in its text."""
+
+    resource = models.ForeignKey(
+        ResourceRow, on_delete=models.CASCADE, related_name="pages"
+    )
+    number = models.IntegerField()
+    start = models.IntegerField()
+    end = models.IntegerField()
+    if TYPE_CHECKING:
+        resource_id: int
+
+    class Meta:
+        unique_together = [("resource", "number")]
+
+    @classmethod
+    def replace_for_resource(cls, resource: ResourceRow, pages: list[Page]):
+        with transaction.atomic():
+            cls.objects.filter(resource=resource).delete()
+            cls.objects.bulk_create(
+                [
+                    cls(resource=resource, number=p.number, start=p.start, end=p.end)
+                    for p in pages
+                ],
+                batch_size=500,
+            )
+
+    def to_obj(self) -> Page:
+        return Page(number=self.number, start=self.start, end=self.end)
+
+
+@dataclass
+class Chunk:
+    """A span of the resource's text, read through `ChunkRow.get_contents`."""
+
+    index: int
+    start: int
+    end: int
+
+
+class ChunkRow(models.Model):
+    resource = models.ForeignKey(
+        ResourceRow, on_delete=models.CASCADE, related_name="chunks"
+    )
+    project = models.ForeignKey("ProjectRow", on_delete=models.CASCADE)
+    index = models.IntegerField()
+    start = models.IntegerField()
+    end = models.IntegerField()
+    is_embedded = models.BooleanField(default=False)
+    token_count = models.IntegerField(null=True)  # estimated when first needed
+    date_created = models.DateTimeField(auto_now_add=True)
+    if TYPE_CHECKING:
+        id: int
+        resource_id: int
+        project_id: int
+
+    class Meta:
+        unique_together = [("resource", "index")]
+
+    @classmethod
+    def replace_for_resource(
+        cls, resource: ResourceRow, chunks: Iterable[Chunk], batch_size: int = 500
+    ) -> int:
+        """Replace the chunks of `resource`, consuming `chunks` lazily in batches."""
+        count = 0
+        with transaction.atomic():
+            cls.objects.filter(resource=resource).delete()
+            batch = []
+            for c in chunks:
+                batch.append(
+                    cls(
+                        resource=resource,
+                        project_id=resource.project_id,
+                        index=c.index,
+                        start=c.start,
+                        end=c.end,
+                    )
+                )
+                if len(batch) >= batch_size:
+                    cls.objects.bulk_create(batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                cls.objects.bulk_create(batch)
+                count += len(batch)
+        return count
+
+    @classmethod
+    def embedded_ids(cls, resource_id: int) -> list[int]:
+        return list(
+            cls.objects.filter(resource_id=resource_id, is_embedded=True).values_list(
+                "id", flat=True
+            )
+        )
+
+    @classmethod
+    def iter_unembedded_batches(cls, resource_id: int, batch_size: int):
+        """Yield `(ids, contents)` of chunks that are not embedded yet, in order."""
+        last_index = -1
+        store = ContentStore()
+        while True:
+            batch = list(
+                cls.objects.filter(
+                    resource_id=resource_id,
+                    is_embedded=False,
+                    index__gt=last_index,
+                )
+                .order_by("index")
+                .values_list("id", "index", "start", "end", "project_id")[:batch_size]
+            )
+            if not batch:
+                return
+            last_index = batch[-1][1]
+            contents = store.read_ranges(
+                batch[0][4], resource_id, [(b[2], b[3]) for b in batch]
+            )
+            yield [b[0] for b in batch], contents
+
+    @classmethod
+    def get_contents(cls, ids: list[int]) -> dict[int, str]:
+        """Text of the chunks, inflating only the frames that hold them."""
+        by_resource = defaultdict(list)
+        for id, project_id, resource_id, start, end in cls.objects.filter(
+            id__in=ids
+        ).values_list("id", "project_id", "resource_id", "start", "end"):
+            by_resource[(project_id, resource_id)].append((id, start, end))
+
+        store = ContentStore()
+        contents = {}
+        for (project_id, resource_id), chunks in by_resource.items():
+            texts = store.read_ranges(
+                project_id, resource_id, [(start, end) for _, start, end in chunks]
+            )
+            contents.update(zip((c[0] for c in chunks), texts))
+        return contents
+
+    @classmethod
+    async def aget_contents(cls, ids: list[int]) -> dict[int, str]:
+        return await sync_to_async(cls.get_contents)(ids)
+
+    @classmethod
+    def get_token_counts(cls, contents: dict[int, str]) -> dict[int, int]:
+        """Token counts of the chunks in `contents`, estimated once per chunk."""
+        counts = dict(
+            cls.objects.filter(id__in=contents, token_count__isnull=False).values_list(
+                "id", "token_count"
+            )
+        )
+        missing = [
+            cls(id=id, token_count=estimate_tokens(text))
+            for id, text in contents.items()
+            if id not in counts
+        ]
+        if missing:
+            cls.objects.bulk_update(missing, ["token_count"], batch_size=500)
+            counts.update((c.id, c.token_count) for c in missing)
+        return counts
+
+    @classmethod
+    async def aget_token_counts(cls, contents: dict[int, str]) -> dict[int, int]:
+        return await sync_to_async(cls.get_token_counts)(contents)
+
+    @classmethod
+    async def aexisting_ids(cls, ids: list[int]) -> set[int]:
+        return {
+            r async for r in cls.objects.filter(id__in=ids).values_list("id", flat=True)
+        }
+
+    @classmethod
+    def set_embedded(cls, ids: list[int]):
+        cls.objects.filter(id__in=ids).update(is_embedded=True)
+
+    def to_obj(self) -> Chunk:
+        return Chunk(index=self.index, start=self.start, end=self.end)
 
 
 class ProjectRow(models.Model):
@@ -136,6 +526,30 @@ class ProjectRow(models.Model):
         async for r in cls.objects.all():
             yield r
 
+    @classmethod
+    async def aiter_overviews(cls):
+        """Resource counts per status and config labels of every project, in
+        one query: `{"id", "<status>", ..., "downloader", ...}` dicts."""
+        counts = {
+            status: Count("resources", filter=Q(resources__status=status))
+            for status in ResourceRow.Status.values
+        }
+        config = "projectconfigrow__"
+        async for r in (
+            cls.objects.annotate(**counts)
+            .values(
+                "id",
+                *counts,
+                downloader=F(f"{config}downloader__downloader"),
+                text_extractor=F(f"{config}text_extractor__model_name"),
+                embedder=F(f"{config}embedder__model_name"),
+                processor=F(f"{config}processor__type"),
+                llm_model=F(f"{config}llm_model__model_name"),
+            )
+            .order_by("id")
+        ):
+            yield r
+
     @classmethod
     def all(cls):
         return cls.objects.all()
@@ -143,6 +557,7 @@ class ProjectRow(models.Model):
 
 @dataclass
 class EventLog:
+    id: int
     project_db_id: int
     event_type: str
     date_created: datetime
@@ -167,6 +582,7 @@ class EventLogRows(models.Model):
     @classmethod
     def create(cls, project_id: int, type, entity_id):
         res = cls.objects.create(type=type, project_id=project_id, entity_id=entity_id)
+        publish_on_commit(ChangeKind.EVENT, project_id, [res.id])
         return res
 
     @classmethod
@@ -174,26 +590,204 @@ class EventLogRows(models.Model):
         res = await cls.objects.acreate(
             type=type, project_id=project_id, entity_id=entity_id
         )
+        publish(ChangeKind.EVENT, project_id, [res.id])
         return res
 
     @classmethod
-    async def aget_logs_for_project(cls, project_id: int) -> list[EventLog]:
-        project_row = await ProjectRow.aget_by_id(project_id)
-        if not project_row:
-            raise ValueError(f"Unknown project: {project_id}")
+    def bulk_create_events(cls, project_id: int, type, entity_ids: list):
+        rows = cls.objects.bulk_create(
+            [
+                cls(type=type, project_id=project_id, entity_id=entity_id)
+                for entity_id in entity_ids
+            ]
+        )
+        publish_on_commit(ChangeKind.EVENT, project_id, [r.id for r in rows])
+        return rows
 
-        logs = []
-        async for l in cls.objects.filter(project=project_row).order_by("date_updated"):
-            logs.append(
-                EventLog(
-                    project_db_id=project_row.id,
-                    event_type=l.type,
-                    date_created=l.date_created,
-                    entity_id=l.entity_id,
-                )
+    @classmethod
+    async def aiter_after(
+        cls, project_id: int, after_id: int = 0, limit: int | None = None
+    ):
+        """Stream the project's events with id > after_id, oldest first.
+
+        Uses the (project, id) index, so tailing costs O(new events).
+        """
+        qs = cls.objects.filter(project_id=project_id, id__gt=after_id).order_by("id")
+        if limit is not None:
+            qs = qs[:limit]
+        async for l in qs:
+            yield EventLog(
+                id=l.id,
+                project_db_id=project_id,
+                event_type=l.type,
+                date_created=l.date_created,
+                entity_id=l.entity_id,
+            )
+
+    @classmethod
+    async def aget_logs_for_project(
+        cls, project_id: int, after_id: int = 0
+    ) -> list[EventLog]:
+        return [l async for l in cls.aiter_after(project_id, after_id)]
+
+    class Meta:
+        indexes = [models.Index(fields=["project", "id"])]
+
+
+class ContentCacheRow(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    url = models.TextField()
+    extractor = models.CharField(max_length=1024)
+    model_name = models.CharField(max_length=1024)
+    content_hash = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField()
+    etag = models.CharField(max_length=1024, null=True, blank=True)
+    last_modified = models.CharField(max_length=1024, null=True, blank=True)
+    date_fetched = models.DateTimeField()
+    date_accessed = models.DateTimeField(db_index=True)
+    if TYPE_CHECKING:
+        id: int
+
+    @classmethod
+    def get_by_key(cls, key: str) -> Self | None:
+        try:
+            return cls.objects.get(key=key)
+        except cls.DoesNotExist:
+            return
+
+    @classmethod
+    def is_shared(cls, content_hash: str, exclude_id: int) -> bool:
+        return (
+            cls.objects.filter(content_hash=content_hash)
+            .exclude(id=exclude_id)
+            .exists()
+        )
+
+
+class ContentCacheUsageRow(models.Model):
+    """Running total of the bytes of distinct `ContentCacheRow` blobs.
+
+    A single row, updated as blobs are added and dropped, so that checking
+    the cache size does not scan every entry.
+    """
+
+    bytes = models.BigIntegerField(default=0)
+
+    @classmethod
+    def total(cls) -> int:
+        return cls.objects.filter(id=1).values_list("bytes", flat=True).first() or 0
+
+    @classmethod
+    def add(cls, delta: int):
+        if delta and not cls.objects.filter(id=1).update(bytes=F("bytes") + delta):
+            cls.objects.get_or_create(id=1)
+            cls.objects.filter(id=1).update(bytes=F("bytes") + delta)
+
+
+class StageMetricRow(models.Model):
+    """Timings and volumes of one run of a pipeline stage, see `common.metrics`.
+
+    A batch job is one row for `resources` resources, keyed by the first one.
+    """
+
+    project = models.ForeignKey("ProjectRow", on_delete=models.CASCADE)
+    resource_id = models.BigIntegerField(null=True)
+    resources = models.IntegerField(default=1)
+    stage = models.CharField(max_length=64)
+    started_at = models.DateTimeField()
+    wall_seconds = models.FloatField()
+    # since the resource's previous stage ended, or since it was added
+    queue_seconds = models.FloatField(null=True)
+    db_seconds = models.FloatField(default=0)
+    db_queries = models.IntegerField(default=0)
+    bytes_in = models.BigIntegerField(default=0)
+    bytes_out = models.BigIntegerField(default=0)
+    retries = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["resource_id", "id"]),
+            models.Index(fields=["started_at"]),
+        ]
+
+    @classmethod
+    def ready_at(cls, resource_id: int) -> datetime | None:
+        """When the resource was ready for its next stage."""
+        last = (
+            cls.objects.filter(resource_id=resource_id)
+            .order_by("-id")
+            .values_list("started_at", "wall_seconds")
+            .first()
+        )
+        if last:
+            return last[0] + timedelta(seconds=last[1])
+        return (
+            ResourceRow.objects.filter(id=resource_id)
+            .values_list("date_created", flat=True)
+            .first()
+        )
+
+
+class RateLimitRow(models.Model):
+    """Token bucket of a provider, shared by every job runner process.
+
+    The bucket is kept as the time `empty_at` it runs out of tokens, so taking
+    a token is one UPDATE and needs no lock held between reading and writing.
+    """
+
+    provider = models.CharField(max_length=1024, unique=True)
+    empty_at = models.FloatField(default=0)  # unix time
+
+    @classmethod
+    def reserve(cls, provider: str, interval: float, burst: int) -> float:
+        """Take a token, returning the seconds to wait before it is available."""
+        cls.objects.bulk_create([cls(provider=provider)], ignore_conflicts=True)
+        now = time.time()
+        with transaction.atomic():
+            # a bucket that refilled holds at most `burst` tokens
+            cls.objects.filter(provider=provider).update(
+                empty_at=Greatest(F("empty_at"), Value(now - burst * interval))
+                + interval
             )
+            empty_at = cls.objects.values_list("empty_at", flat=True).get(
+                provider=provider
+            )
+        return max(0.0, empty_at - now)
+
+    @classmethod
+    def pause(cls, provider: str, seconds: float):
+        """Hold back every worker's requests for `seconds`, e.g. on a 429."""
+        cls.objects.bulk_create([cls(provider=provider)], ignore_conflicts=True)
+        cls.objects.filter(provider=provider).update(
+            empty_at=Greatest(F("empty_at"), Value(time.time() + seconds))
+        )
 
-        return logs
+
+class ResponseCacheRow(models.Model):
+    """An LLM answer to a chat question, see `common.response_cache`."""
+
+    project = models.ForeignKey("ProjectRow", on_delete=models.CASCADE)
+    model_name = models.CharField(max_length=1024)
+    # digest of the retrieved chunks and system prompt the question was sent with
+    context_key = models.CharField(max_length=64)
+    question = models.TextField()  # normalized
+    question_vector = models.BinaryField(null=True)  # float32 query embedding
+    answer = models.TextField()
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_accessed = models.DateTimeField()
+    if TYPE_CHECKING:
+        id: int
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "model_name", "context_key"]),
+            models.Index(fields=["project", "date_accessed"]),
+        ]
+
+    @classmethod
+    def invalidate(cls, project_id: int):
+        """Forget the project's answers, e.g. once more of it can be retrieved."""
+        cls.objects.filter(project_id=project_id).delete()
 
 
 class ReadingPalChat(models.Model):
@@ -212,6 +806,13 @@ class ReadingPalChat(models.Model):
         ):
             yield r
 
+    @classmethod
+    async def aget_by_ids(cls, project_id, ids: list[int]):
+        async for r in cls.objects.filter(project_id=project_id, id__in=ids).order_by(
+            "date_updated"
+        ):
+            yield r
+
     @classmethod
     async def acreate(cls, project_id, djllmchat: Chat):
         return await cls.objects.acreate(project_id=project_id, djllmchat=djllmchat)
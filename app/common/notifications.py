@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from loguru import logger
+
+# ids per datagram, keeping every datagram well below the socket buffer size
+MAX_IDS_PER_MESSAGE = 1000
+
+
+@dataclass(frozen=True)
+class Change:
+    kind: str
+    project_id: int
+    entity_ids: tuple[int, ...]
+
+
+def notifications_dir() -> Path:
+    path = Path(settings.CHANGE_NOTIFICATIONS_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+_sender: socket.socket | None = None
+_sender_lock = threading.Lock()
+
+
+def _get_sender() -> socket.socket:
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            _sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            _sender.setblocking(False)
+        return _sender
+
+
+_listeners: tuple[int, list[Path]] | None = None
+
+
+def _get_listeners() -> list[Path]:
+    """The listening sockets, globbed again only when the directory changed."""
+    global _listeners
+    directory = notifications_dir()
+    version = directory.stat().st_mtime_ns
+    if _listeners is None or _listeners[0] != version:
+        _listeners = (version, list(directory.glob("*.sock")))
+    return _listeners[1]
+
+
+def _forget_listener(path: Path):
+    global _listeners
+    _listeners = None
+    path.unlink(missing_ok=True)  # listener exited without cleanup
+
+
+def publish(kind: str, project_id: int, entity_ids: list[int]):
+    """Tell every listening process (e.g. running TUIs) that entities changed.
+
+    Delivery is best effort: publishing never blocks or raises, and nothing is
+    sent when no process is listening.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return
+    try:
+        listeners = _get_listeners()
+    except OSError:
+        return
+    if not listeners:
+        return
+
+    sender = _get_sender()
+    for start in range(0, max(len(entity_ids), 1), MAX_IDS_PER_MESSAGE):
+        change = Change(
+            kind=kind,
+            project_id=int(project_id),
+            entity_ids=tuple(
+                int(i) for i in entity_ids[start : start + MAX_IDS_PER_MESSAGE]
+            ),
+        )
+        payload = json.dumps(asdict(change)).encode()
+        for path in listeners:
+            try:
+                sender.sendto(payload, str(path))
+            except (ConnectionRefusedError, FileNotFoundError):
+                _forget_listener(path)
+            except OSError as e:
+                logger.debug(f"Dropped change notification for {path}: {e}")
+
+
+def publish_on_commit(kind: str, project_id: int, entity_ids: list[int]):
+    """`publish` once the current transaction commits, so listeners can read it."""
+    transaction.on_commit(lambda: publish(kind, project_id, entity_ids))
+
+
+class ChangeSubscriber:
+    """Receives the changes published by any process, as an async iterator."""
+
+    def __init__(self):
+        self.path = notifications_dir() / f"{os.getpid()}-{id(self)}.sock"
+        self.path.unlink(missing_ok=True)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(str(self.path))
+        self.sock.setblocking(False)
+        self.queue: asyncio.Queue[Change] = asyncio.Queue()
+        self.loop = asyncio.get_running_loop()
+        self.loop.add_reader(self.sock.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        while True:
+            try:
+                payload = self.sock.recv(65536)
+            except BlockingIOError:
+                return
+            data = json.loads(payload)
+            self.queue.put_nowait(
+                Change(
+                    kind=data["kind"],
+                    project_id=data["project_id"],
+                    entity_ids=tuple(data["entity_ids"]),
+                )
+            )
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Change:
+        return await self.queue.get()
+
+    def close(self):
+        self.loop.remove_reader(self.sock.fileno())
+        self.sock.close()
+        self.path.unlink(missing_ok=True)
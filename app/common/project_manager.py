@@ -1,9 +1,22 @@
-from typing import Self
+import asyncio
+from typing import Iterable, Self
 from dataclasses import dataclass
 
-from common.models import Resource, ResourceRow, ProjectRow
-from configuration.models import ProjectConfigRow
-
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+
+from common.constants import ProcessorType
+from common.jobs.job_dispatcher import (
+    Event,
+    Planner,
+    create_resource_processing_pipelines,
+)
+from common.jobs.embed.embedders import get_embedding_client
+from common.models import ChunkRow, ResourceRow, ProjectRow
+from common.vectors.ivf import IVFIndex
+from configuration.models import Config, ProjectConfigRow
 
 # TODO AppState management should be done in the TUI code
 
@@ -12,24 +25,15 @@ from configuration.models import ProjectConfigRow
 class Project:
     id_in_db: int
     id_for_ui: str
-    resources: list[Resource]
     config: dict
 
     @classmethod
     async def acreate_from_db_row(cls, project_db_row: ProjectRow) -> Self:
-        resources = []
-        async for r in ResourceRow.aget_all_by_project_id(project_db_row.id):
-            resources.append(Resource(url=r.url, status=r.status))
-
-        config_row = await ProjectConfigRow.aget_by_project(project_db_row.id)
-        if config_row:
-            config = await config_row.ato_dict()
-        else:
-            config = {}
+        config_obj = await ProjectConfigRow.aget_config(project_db_row.id)
+        config = config_obj.to_dict() if config_obj else {}
         return cls(
             id_in_db=project_db_row.id,
             id_for_ui=cls.make_id_for_ui(project_db_row.id),
-            resources=resources,
             config=config,
         )
 
@@ -45,6 +49,69 @@ class Project:
         return int(ui_id.split("project-")[-1])
 
 
+@dataclass
+class ProjectOverview:
+    """What the project list shows, the resources themselves are paged in."""
+
+    id_in_db: int
+    id_for_ui: str
+    status_counts: dict[str, int]
+    config: str  # labels of the configured rows, empty without a config
+
+    @property
+    def resource_count(self) -> int:
+        return sum(self.status_counts.values())
+
+    @classmethod
+    def from_values(cls, values: dict) -> Self:
+        labels = [
+            values[k]
+            for k in (
+                "downloader",
+                "text_extractor",
+                "embedder",
+                "processor",
+                "llm_model",
+            )
+            if values.get(k)
+        ]
+        return cls(
+            id_in_db=values["id"],
+            id_for_ui=Project.make_id_for_ui(values["id"]),
+            status_counts={s: values.get(s, 0) for s in ResourceRow.Status.values},
+            config=", ".join(labels),
+        )
+
+
+@dataclass
+class RetrievalResult:
+    chunk_ids: list[int]
+    scores: list[float]
+    query_vector: np.ndarray | None = None
+
+
+@dataclass
+class BulkImportResult:
+    resource_ids: list[int]
+    invalid_urls: list[str]
+    skipped_urls: list[str]
+
+
+def split_valid_urls(urls: Iterable[str]) -> tuple[list[str], list[str]]:
+    validate = URLValidator()
+    valid, invalid = [], []
+    for url in urls:
+        url = url.strip()
+        if not url or url.startswith("#"):
+            continue
+        try:
+            validate(url)
+            valid.append(url)
+        except ValidationError:
+            invalid.append(url)
+    return valid, invalid
+
+
 @dataclass
 class ProjectManager:
     @classmethod
@@ -68,7 +135,90 @@ class ProjectManager:
         project_id = AppState.active_project.id_in_db
         return await ResourceRow.acreate(project_id=project_id, url=url)
 
+    @classmethod
+    async def aget_import_config(cls, project_id: int) -> Config:
+        """The project's config, or ValueError if resources cannot be processed
+        with it, so that an import fails before doing any work."""
+        config = await ProjectConfigRow.aget_config(project_id)
+        if not config:
+            raise ValueError(f"Project {project_id} has no config")
+        try:
+            Planner(config).pipeline_steps()
+        except Exception as e:
+            raise ValueError(f"Project {project_id} config is not usable: {e}") from e
+        return config
+
+    @classmethod
+    async def abulk_add_resources(
+        cls, project_id: int, urls: Iterable[str], batch_size: int = 500
+    ) -> BulkImportResult:
+        """Add many resources to a project and enqueue their pipelines.
+
+        Invalid URLs and URLs already in the project (or repeated in `urls`)
+        are skipped. Resources and their events are inserted `batch_size` at a
+        time and the project config is resolved once for the whole import.
+        """
+        config = await cls.aget_import_config(project_id)
+
+        valid, invalid = split_valid_urls(urls)
+        seen = await ResourceRow.aget_urls_for_project(project_id)
+        new, skipped = [], []
+        for url in valid:
+            if url in seen:
+                skipped.append(url)
+            else:
+                seen.add(url)
+                new.append(url)
+
+        resource_ids = await sync_to_async(ResourceRow.bulk_create_for_project)(
+            project_id, new, batch_size
+        )
+        await create_resource_processing_pipelines(
+            Event.RESOURCE_CREATED, config, project_id, resource_ids
+        )
+        return BulkImportResult(
+            resource_ids=resource_ids, invalid_urls=invalid, skipped_urls=skipped
+        )
+
     @classmethod
     async def aget_all(cls):
         async for c in ProjectRow.aall():
             yield await Project.acreate_from_db_row(c)
+
+    @classmethod
+    async def aget_overviews(cls):
+        async for values in ProjectRow.aiter_overviews():
+            yield ProjectOverview.from_values(values)
+
+    @classmethod
+    async def aretrieve(cls, query: str, k: int = 5) -> RetrievalResult:
+        """Find the `k` chunks of the active project most similar to `query`.
+
+        Scores are cosine similarities, best first. Chunks deleted since they
+        were embedded are left out, so fewer than `k` ids may be returned.
+        Projects using the IVF processor are searched through their ANN index
+        once it is trained, and by brute force before that.
+        """
+        from tui.models import AppState
+
+        project_id = AppState.active_project.id_in_db
+        config = await ProjectConfigRow.aget_config(project_id)
+        if not config:
+            return RetrievalResult(chunk_ids=[], scores=[])
+
+        client = get_embedding_client(config.embedder)
+        query_vector = await asyncio.to_thread(client.embed_query, query)
+        index = IVFIndex.for_project(project_id)
+        if config.processor.type == ProcessorType.IVF_RAG and index.is_trained():
+            search = index.search
+        else:
+            search = index.store.search
+        ids, scores = await asyncio.to_thread(search, query_vector, k)
+
+        existing_ids = await ChunkRow.aexisting_ids(ids.tolist())
+        result = RetrievalResult(chunk_ids=[], scores=[], query_vector=query_vector)
+        for chunk_id, score in zip(ids.tolist(), scores.tolist()):
+            if chunk_id in existing_ids:
+                result.chunk_ids.append(chunk_id)
+                result.scores.append(score)
+        return result
@@ -0,0 +1,121 @@
+import hashlib
+import json
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from common.models import ChunkRow
+from common.project_manager import RetrievalResult
+from common.tokens import estimate_tokens
+from configuration.models import LLMModel
+
+CONTEXT_INTRO = "Use this context from what I'm reading:\n\n"
+CHUNK_SEPARATOR = "\n\n---\n\n"
+MESSAGE_OVERHEAD = 4  # tokens the chat template adds around each message
+
+
+@dataclass
+class ChatPrompt:
+    messages: list[dict]
+    tokens: int
+    chunk_ids: list[int]  # the retrieved chunks that fit, best first
+    dropped_turns: int  # earlier question and answer pairs left out
+
+    @property
+    def context_key(self) -> str:
+        """Digest of the retrieved chunks and the system prompt the question
+        is sent with; past turns are left out so that a question asked again
+        later in a chat, or in another one, can reuse its answer."""
+        raw = json.dumps([sorted(self.chunk_ids), self.messages[0]["content"]])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def message_tokens(message: dict) -> int:
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+
+def pack_prompt(
+    system: str,
+    history: list[dict],
+    question: str,
+    chunks: list[tuple[int, str, int]],
+    budget: int,
+    history_share: float,
+) -> ChatPrompt:
+    """Fit the chat into `budget` tokens.
+
+    The system prompt and the question are always sent. The latest turns of
+    `history` come next, up to `history_share` of what is left, and older
+    turns are dropped in question and answer pairs. The rest is filled with
+    the `(id, text, tokens)` of retrieved chunks, best first, skipping those
+    that do not fit.
+    """
+    head = [{"role": "system", "content": system}]
+    used = message_tokens(head[0]) + estimate_tokens(question) + MESSAGE_OVERHEAD
+
+    history_budget = int(max(budget - used, 0) * history_share)
+    kept_from = len(history)
+    history_used = 0
+    for start in range(len(history) - 2, -1, -2):
+        turn = sum(message_tokens(m) for m in history[start : start + 2])
+        if history_used + turn > history_budget:
+            break
+        history_used += turn
+        kept_from = start
+    dropped = kept_from // 2
+    while dropped:
+        note = {
+            "role": "system",
+            "content": f"{dropped} earlier question(s) of this chat were left out.",
+        }
+        if history_used + message_tokens(note) <= history_budget:
+            head.append(note)
+            history_used += message_tokens(note)
+            break
+        if kept_from == len(history):
+            break  # not even the note fits
+        # make room for the note by leaving out the oldest turn kept
+        kept = history[kept_from : kept_from + 2]
+        history_used -= sum(message_tokens(m) for m in kept)
+        kept_from += 2
+        dropped += 1
+    used += history_used
+
+    context, chunk_ids = [], []
+    overhead = estimate_tokens(CONTEXT_INTRO) + estimate_tokens("Question: ")
+    for id, text, tokens in chunks:
+        cost = tokens + estimate_tokens(CHUNK_SEPARATOR)
+        if used + overhead + cost > budget:
+            continue
+        used += cost
+        context.append(text)
+        chunk_ids.append(id)
+
+    if context:
+        used += overhead
+        question = (
+            f"{CONTEXT_INTRO}{CHUNK_SEPARATOR.join(context)}\n\nQuestion: {question}"
+        )
+    messages = head + history[kept_from:] + [{"role": "user", "content": question}]
+    return ChatPrompt(messages, used, chunk_ids, dropped)
+
+
+async def abuild_chat_prompt(
+    system: str,
+    history: list[dict],
+    question: str,
+    retrieved: RetrievalResult,
+    llm_model: LLMModel,
+) -> ChatPrompt:
+    """The messages to send for `question`, within the model's context window."""
+    contents = await ChunkRow.aget_contents(retrieved.chunk_ids)
+    counts = await ChunkRow.aget_token_counts(contents)
+    chunks = [(i, contents[i], counts[i]) for i in retrieved.chunk_ids if i in contents]
+    return pack_prompt(
+        system,
+        history,
+        question,
+        chunks,
+        llm_model.prompt_budget,
+        settings.CHAT_PROMPT["history_share"],
+    )
@@ -0,0 +1,111 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
+import httpx
+from django.conf import settings
+from loguru import logger
+
+from common.metrics import count_bytes, count_retry
+from common.models import RateLimitRow
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_EXCEPTIONS = (httpx.TransportError,)
+
+# called with the attempt that failed, the seconds until the next one and why
+OnRetry = Callable[[int, float, str], None]
+
+
+class RateLimiter:
+    """Requests per second allowed to a provider across all job runners."""
+
+    def __init__(self, provider: str, rate: float, burst: int):
+        self.provider = provider
+        self.interval = 1 / rate
+        self.burst = burst
+
+    @classmethod
+    def for_provider(cls, provider: str) -> "RateLimiter | None":
+        conf = settings.RATE_LIMITS.get(provider)
+        if conf is None:
+            return None
+        return cls(provider, conf["rate"], conf["burst"])
+
+    def acquire(self):
+        time.sleep(RateLimitRow.reserve(self.provider, self.interval, self.burst))
+
+    def pause(self, seconds: float):
+        RateLimitRow.pause(self.provider, seconds)
+
+
+def retry_after(resp) -> float | None:
+    """Seconds asked for by the `Retry-After` header, in either of its forms."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, after: float | None = None) -> float:
+    """Exponential backoff with full jitter, never shorter than `Retry-After`."""
+    conf = settings.API_RETRY
+    cap = min(conf["max_delay"], conf["base_delay"] * 2 ** (attempt - 1))
+    delay = random.uniform(0, cap)
+    return max(delay, after) if after is not None else delay
+
+
+def _next_attempt(
+    limiter: RateLimiter | None, attempt: int, resp=None, error=None
+) -> tuple[float, str] | None:
+    """The delay before retrying and why, or None if the result is final."""
+    if attempt >= settings.API_RETRY["max_attempts"]:
+        return None
+    if error is not None:
+        return backoff_delay(attempt), repr(error)
+    if resp.status_code not in RETRY_STATUSES:
+        return None
+    after = retry_after(resp)
+    if resp.status_code == 429 and after is not None and limiter:
+        limiter.pause(after)
+    return backoff_delay(attempt, after), f"HTTP {resp.status_code}"
+
+
+def call_api(
+    provider: str, send: Callable[[], object], on_retry: OnRetry | None = None
+):
+    """Send a request to `provider` within its rate limit, retrying on 429, 5xx
+    and connection errors. Returns the last response."""
+    limiter = RateLimiter.for_provider(provider)
+    attempt = 0
+    while True:
+        attempt += 1
+        if limiter:
+            limiter.acquire()
+        try:
+            resp = send()
+        except RETRY_EXCEPTIONS as e:
+            retry = _next_attempt(limiter, attempt, error=e)
+            if retry is None:
+                raise
+        else:
+            retry = _next_attempt(limiter, attempt, resp=resp)
+            if retry is None:
+                count_bytes(bytes_in=len(resp.content))
+                return resp
+
+        delay, reason = retry
+        logger.warning(f"{provider}: {reason}, retrying in {delay:.1f}s")
+        count_retry()
+        if on_retry:
+            on_retry(attempt, delay, reason)
+        time.sleep(delay)
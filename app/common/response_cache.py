@@ -0,0 +1,123 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from common.models import ResponseCacheRow
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+@dataclass
+class ResponseCache:
+    """Chat answers reused for the same question asked with the same context.
+
+    Entries are keyed by project, model and `ChatPrompt.context_key`, so a
+    question is only answered from the cache when it would be sent with the
+    same retrieved chunks. Within that, the question matches when it is the
+    same once normalized or, if `similarity` is set, when the cosine of the
+    query embeddings reaches it. Entries older than `max_age` are not used,
+    least recently used ones are evicted past `max_entries` per project, and
+    a project's entries are dropped whenever a batch of its resources has
+    been processed.
+    """
+
+    enabled: bool = field(default_factory=lambda: settings.RESPONSE_CACHE["enabled"])
+    max_age: timedelta = field(
+        default_factory=lambda: timedelta(seconds=settings.RESPONSE_CACHE["max_age"])
+    )
+    max_entries: int = field(
+        default_factory=lambda: settings.RESPONSE_CACHE["max_entries"]
+    )
+    similarity: float | None = field(
+        default_factory=lambda: settings.RESPONSE_CACHE["similarity"]
+    )
+
+    def get(
+        self,
+        project_id: int,
+        model_name: str,
+        context_key: str,
+        question: str,
+        question_vector: np.ndarray | None = None,
+    ) -> str | None:
+        if not self.enabled:
+            return
+        question = normalize_question(question)
+        candidates = ResponseCacheRow.objects.filter(
+            project_id=project_id,
+            model_name=model_name,
+            context_key=context_key,
+            date_created__gte=timezone.now() - self.max_age,
+        ).values_list("id", "question", "question_vector")
+
+        best_id, best_score = None, self.similarity
+        for id, cached_question, cached_vector in candidates:
+            if cached_question == question:
+                best_id = id
+                break
+            if best_score is None or question_vector is None or not cached_vector:
+                continue
+            score = cosine(question_vector, np.frombuffer(cached_vector, np.float32))
+            if score >= best_score:
+                best_id, best_score = id, score
+        if best_id is None:
+            return
+
+        ResponseCacheRow.objects.filter(id=best_id).update(date_accessed=timezone.now())
+        return (
+            ResponseCacheRow.objects.filter(id=best_id)
+            .values_list("answer", flat=True)
+            .first()
+        )
+
+    async def aget(self, *args, **kwargs) -> str | None:
+        return await sync_to_async(self.get)(*args, **kwargs)
+
+    def put(
+        self,
+        project_id: int,
+        model_name: str,
+        context_key: str,
+        question: str,
+        answer: str,
+        question_vector: np.ndarray | None = None,
+    ):
+        if not self.enabled:
+            return
+        ResponseCacheRow.objects.create(
+            project_id=project_id,
+            model_name=model_name,
+            context_key=context_key,
+            question=normalize_question(question),
+            question_vector=(
+                None
+                if question_vector is None
+                else np.asarray(question_vector, np.float32).tobytes()
+            ),
+            answer=answer,
+            date_accessed=timezone.now(),
+        )
+        self.evict(project_id)
+
+    async def aput(self, *args, **kwargs):
+        await sync_to_async(self.put)(*args, **kwargs)
+
+    def evict(self, project_id: int):
+        entries = ResponseCacheRow.objects.filter(project_id=project_id)
+        entries.filter(date_created__lt=timezone.now() - self.max_age).delete()
+        stale = entries.order_by("-date_accessed").values_list("id", flat=True)[
+            self.max_entries :
+        ]
+        if ids := list(stale):
+            ResponseCacheRow.objects.filter(id__in=ids).delete()
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> float:
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(np.dot(a, b)) / norm if norm else 0.0
@@ -0,0 +1,41 @@
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from common.content.store import ContentStore
+from common.models import ChunkRow, ProjectRow, ResourceRow
+
+
+@receiver(pre_delete, sender=ResourceRow)
+def delete_resource_files(sender, instance: ResourceRow, **kwargs):
+    """Drop the resource's text and vectors once its deletion commits."""
+    project_id, resource_id = instance.project_id, instance.id
+    embedded = ChunkRow.embedded_ids(resource_id)
+
+    def delete():
+        from common.vectors.store import VectorStore  # numpy, kept off startup
+
+        ContentStore().delete(project_id, resource_id)
+        VectorStore(project_id).delete(embedded)
+
+    transaction.on_commit(delete)
+
+
+@receiver(post_delete, sender=ProjectRow)
+def delete_project_files(sender, instance: ProjectRow, **kwargs):
+    from common.vectors.store import VectorStore
+
+    dirs = [
+        Path(settings.CONTENT_STORE_DIR) / f"project-{instance.id}",
+        VectorStore(instance.id).dir,
+    ]
+
+    def delete():
+        for path in dirs:
+            shutil.rmtree(path, ignore_errors=True)
+
+    transaction.on_commit(delete)
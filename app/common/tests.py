@@ -1,3 +1,716 @@
-from django.test import TestCase
+import asyncio
+import io
+import random
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import import_module
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import djclick as click
+import httpx
+import numpy as np
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+from django.db import connections
+from asgiref.sync import async_to_sync
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+
+from common.constants import (
+    FAKE_MODELS,
+    ChunkerType,
+    CompressionCodec,
+    EventTypes,
+    Provider,
+    Stage,
+)
+from common.content.cache import ContentCache
+from common.content import compression
+from common.content.store import ContentStore, FramedReader, FramedWriter
+from common import notifications
+from common.http_client import AsyncHttpClient, HttpClient
+from common.jobs.async_runner import AsyncRunner
+from common.jobs.chunk.chunk_resource import chunk
+from common.jobs.embed.embed_chunks import aembed_resource_chunks
+from common.jobs.embed.embedders import OllamaEmbeddingClient
+from common.migrations._content_files import read_text
+from common.jobs.batch import ResourceBatch
+from common.jobs.rags.simple import run_dummy_rag
+from common.prompt import (
+    CHUNK_SEPARATOR,
+    CONTEXT_INTRO,
+    message_tokens,
+    pack_prompt,
+)
+from common.response_cache import ResponseCache
+from common.metrics import count_bytes, count_retry, measuring
+from common.jobs.chunk.chunkers import iter_text_chunks
+from common.tokens import estimate_tokens
+from common.models import (
+    ChunkRow,
+    StageMetricRow,
+    ContentCacheRow,
+    ContentCacheUsageRow,
+    ProjectRow,
+    ResourceRow,
+    ResponseCacheRow,
+)
+from common.vectors import ivf
+from common.vectors.ivf import IVFIndex
+from common.vectors.store import VectorStore, normalize
+from configuration.models import (
+    Chunker,
+    ConfigCache,
+    DownloaderRow,
+    EmbedderRow,
+    LLMModelRow,
+    ProcessorRow,
+    ProjectConfigRow,
+    TextExtractorRow,
+    create_default_rows,
+)
+
+
+def random_text(length: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = ["a", "reader", "reads", "é", "papers", "\n", "quickly", "ünïcode"]
+    parts, size = [], 0
+    while size < length:
+        word = rng.choice(words)
+        parts.append(word + ("" if word == "\n" else " "))
+        size += len(parts[-1])
+    return "".join(parts)[:length]
+
+
+def make_project(**config) -> ProjectRow:
+    """A project configured like a new one, with `config` overriding fields."""
+    create_default_rows()
+    project = ProjectRow.objects.create()
+    ProjectConfigRow.objects.create(
+        project=project,
+        downloader=DownloaderRow.objects.get(
+            downloader=DownloaderRow.Downloader.JINA_AI_API
+        ),
+        text_extractor=TextExtractorRow.objects.get(provider=Provider.JINA),
+        embedder=EmbedderRow.objects.get(
+            provider=Provider.FAKE, model_name=FAKE_MODELS.HASHING_EMBEDDINGS
+        ),
+        processor=ProcessorRow.objects.filter(
+            type=ProcessorRow.Type.SIMPLE_RAG, chunker__type=ChunkerType.FIXED
+        ).first(),
+        llm_model=LLMModelRow.objects.first(),
+        **config,
+    )
+    return project
+
+
+class TempStoresMixin:
+    """Content and vector stores in a directory removed after each test."""
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        stores = override_settings(
+            CONTENT_STORE_DIR=f"{tmp.name}/content",
+            VECTOR_STORE_DIR=f"{tmp.name}/vectors",
+        )
+        stores.enable()
+        self.addCleanup(stores.disable)
+        self.addCleanup(ivf._indexes.clear)
+
+
+class StreamingChunkerTests(SimpleTestCase):
+    def test_same_spans_as_the_text_in_one_block(self):
+        text = random_text(20_000)
+        for size in (1, 7, 100, 1024):
+            chunker = Chunker(ChunkerType.FIXED, size)
+            whole = [(c.start, c.end) for c, _ in iter_text_chunks([text], chunker)]
+            for block_size in (1, 13, 1000, 50_000):
+                blocks = [
+                    text[i : i + block_size] for i in range(0, len(text), block_size)
+                ]
+                chunks = list(iter_text_chunks(blocks, chunker))
+                self.assertEqual([(c.start, c.end) for c, _ in chunks], whole)
+                self.assertTrue(all(text[c.start : c.end] == t for c, t in chunks))
+
+    def test_cut_after_the_last_newline_or_space(self):
+        chunker = Chunker(ChunkerType.FIXED, 10)
+        texts = [t for _, t in iter_text_chunks(["abc de\nfghij klmnopqrstu"], chunker)]
+        self.assertEqual(texts, ["abc de\n", "fghij ", "klmnopqrst", "u"])
+
+    def test_no_chunk_and_empty_text(self):
+        no_chunk = Chunker(ChunkerType.NO_CHUNK, None)
+        [(c, t)] = iter_text_chunks(["ab", "cd"], no_chunk)
+        self.assertEqual((c.start, c.end, t), (0, 4, "abcd"))
+        self.assertEqual(list(iter_text_chunks([], no_chunk)), [])
+        fixed = Chunker(ChunkerType.FIXED, 10)
+        self.assertEqual(list(iter_text_chunks(["", ""], fixed)), [])
+
+
+class ChunkResourceTests(TempStoresMixin, TestCase):
+    def test_chunks_read_back_for_each_codec(self):
+        text = random_text(300_000)
+        for codec in (CompressionCodec.NONE, CompressionCodec.ZLIB):
+            project = make_project(compression_codec=codec)
+            config = ProjectConfigRow.get_config(project.id)
+            resource = ResourceRow.objects.create(project=project, url="https://x.y")
+            resource.add_scraped_content(text)
+
+            with override_settings(CONTENT_FRAME_SIZE=8 * 1024):
+                chunk(resource, config)
+
+            rows = list(ChunkRow.objects.filter(resource=resource).order_by("index"))
+            self.assertEqual(rows[-1].end, len(text))
+            contents = ChunkRow.get_contents([r.id for r in rows])
+            self.assertEqual("".join(contents[r.id] for r in rows), text)
+            self.assertEqual(resource.read_scraped_content(), text)
+
+    def test_rechunking_deletes_the_old_vectors(self):
+        project = make_project()
+        config = ProjectConfigRow.get_config(project.id)
+        resource = ResourceRow.objects.create(project=project, url="https://x.y")
+        resource.add_scraped_content(random_text(10_000))
+        chunk(resource, config)
+        ids = list(ChunkRow.objects.values_list("id", flat=True))
+        store = VectorStore(project.id)
+        store.append(ids, np.ones((len(ids), 4)))
+        ChunkRow.set_embedded(ids)
+
+        with override_settings(VECTOR_STORE_COMPACT_RATIO=2):
+            chunk(resource, config)
+        self.assertEqual(sorted(store.deleted().tolist()), sorted(ids))
+        self.assertEqual(len(store.search(np.ones(4), 5)[0]), 0)
+
+        ChunkRow.set_embedded(list(ChunkRow.objects.values_list("id", flat=True)))
+        chunk(resource, config)
+        self.assertEqual(len(store), 0)  # mostly deleted, so compacted
+
+
+class VectorStoreTests(TempStoresMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        rng = np.random.default_rng(0)
+        self.store = VectorStore(project_id=1)
+        self.ids = np.arange(100, 1100)
+        self.vectors = normalize(rng.normal(size=(1000, 16)))
+        self.store.append(self.ids[:600].tolist(), self.vectors[:600])
+        self.store.append(self.ids[600:].tolist(), self.vectors[600:])
+        self.query = rng.normal(size=16).astype(np.float32)
+
+    def exact(self, k, exclude=()):
+        scores = self.vectors @ normalize(self.query)
+        best = [i for i in np.argsort(-scores) if self.ids[i] not in exclude]
+        return self.ids[best[:k]].tolist()
+
+    def test_round_trip_and_search(self):
+        ids, vectors = self.store.load()
+        self.assertEqual(len(self.store), 1000)
+        np.testing.assert_array_equal(ids, self.ids)
+        np.testing.assert_allclose(vectors, self.vectors, rtol=1e-6)
+
+        found, scores = self.store.search(self.query, 10)
+        self.assertEqual(found.tolist(), self.exact(10))
+        self.assertTrue(np.all(np.diff(scores) <= 0))
+
+    def test_empty_store_finds_nothing(self):
+        found, scores = VectorStore(project_id=2).search(self.query, 10)
+        self.assertEqual(len(found), 0)
+        self.assertEqual(len(scores), 0)
+
+    def test_deleted_ids_are_left_out_before_top_k(self):
+        deleted = self.exact(5)
+        self.store.delete(deleted)
+        found, _ = self.store.search(self.query, 10)
+        self.assertEqual(found.tolist(), self.exact(10, deleted))
+
+        index = IVFIndex(self.store, nprobe=1000)
+        index.train()
+        found, _ = index.search(self.query, 10)
+        self.assertEqual(found.tolist(), self.exact(10, deleted))
+
+    def test_compaction_keeps_the_index_aligned(self):
+        index = IVFIndex(self.store, nprobe=1000)
+        index.train()
+        deleted = self.ids[::3].tolist()
+        self.store.delete(deleted)
+        with override_settings(VECTOR_STORE_COMPACT_RATIO=0.25):
+            self.assertTrue(self.store.needs_compaction())
+        index.compact()
+
+        self.assertEqual(len(self.store), 1000 - len(deleted))
+        self.assertEqual(index.assigned_count(), len(self.store))
+        self.assertEqual(len(self.store.deleted()), 0)
+        found, _ = index.search(self.query, 10)
+        self.assertEqual(found.tolist(), self.exact(10, deleted))
+
+    def test_project_index_is_reused_until_its_files_change(self):
+        index = IVFIndex.for_project(1)
+        self.assertIs(IVFIndex.for_project(1), index)
+        index.train()
+        lists = index.inverted_lists()
+        self.assertIs(index.inverted_lists()[1], lists[1])
+
+        # another process appending and updating the index invalidates the lists
+        rng = np.random.default_rng(1)
+        self.store.append([5000, 5001], normalize(rng.normal(size=(2, 16))))
+        IVFIndex(VectorStore(project_id=1)).update()
+        self.assertEqual(len(index.inverted_lists()[1]), 1002)
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(0.02)
+        with server.lock:
+            server.in_flight -= 1
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class PooledClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        self.server.lock = threading.Lock()
+        self.server.connections = set()
+        self.server.in_flight = self.server.max_in_flight = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def test_threads_share_one_keep_alive_client(self):
+        HttpClient._instance = None
+        self.addCleanup(setattr, HttpClient, "_instance", None)
+        client = HttpClient.get()
+        for _ in range(5):
+            self.assertIs(HttpClient.get(), client)
+            self.assertEqual(client.request("GET", self.url).text, "ok")
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_async_client_per_loop_caps_requests_per_host(self):
+        async def fetch_all():
+            client = AsyncHttpClient.get()
+            self.assertIs(AsyncHttpClient.get(), client)
+            responses = await asyncio.gather(
+                *(client.request("GET", self.url) for _ in range(12))
+            )
+            await client.aclose()
+            return client, responses
+
+        limits = {**settings.HTTP_CLIENT, "per_host_concurrency": 3}
+        with override_settings(HTTP_CLIENT=limits):
+            first, responses = asyncio.run(fetch_all())
+            second, _ = asyncio.run(fetch_all())
+        self.assertIsNot(first, second)
+        self.assertTrue(all(r.text == "ok" for r in responses))
+        self.assertEqual(self.server.max_in_flight, 3)
+        self.assertLessEqual(len(self.server.connections), 6)
+
+
+class EmbeddingClientTests(TestCase):
+    def test_requests_go_through_the_pooled_client(self):
+        url = f"{settings.OLLAMA_BASE_URL}/api/embed"
+        resp = httpx.Response(
+            200,
+            json={"embeddings": [[1, 0], [0, 1]]},
+            request=httpx.Request("POST", url),
+        )
+        with mock.patch.object(HttpClient, "request", return_value=resp) as request:
+            vectors = OllamaEmbeddingClient("m").embed_documents(["a", "b"])
+        np.testing.assert_array_equal(vectors, [[1, 0], [0, 1]])
+        request.assert_called_once_with(
+            "POST", url, json={"model": "m", "input": ["a", "b"]}
+        )
+
+
+class ContentCacheTests(TempStoresMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ContentCache(root=Path(self.tmp) / "cache", max_bytes=35)
+
+    def put(self, url: str, content: str):
+        return self.cache.put(url, "reader", "model", content)
+
+    def test_shared_blobs_count_once(self):
+        self.put("https://a.b/1", "0123456789")
+        self.put("https://a.b/2", "0123456789")
+        self.assertEqual(ContentCacheUsageRow.total(), 10)
+        self.put("https://a.b/1", "abc")
+        self.assertEqual(ContentCacheUsageRow.total(), 13)
+        self.put("https://a.b/2", "de")  # the 10 byte blob is no longer used
+        self.assertEqual(ContentCacheUsageRow.total(), 5)
+        self.assertEqual(len(list(self.cache.root.glob("*/*"))), 2)
+
+    def test_least_recently_used_are_evicted(self):
+        for i in range(3):
+            self.put(f"https://a.b/{i}", str(i) * 10)
+        self.cache.get("https://a.b/0", "reader", "model")
+        self.put("https://a.b/3", "3" * 10)
+
+        urls = set(ContentCacheRow.objects.values_list("url", flat=True))
+        self.assertEqual(urls, {"https://a.b/0", "https://a.b/2", "https://a.b/3"})
+        self.assertEqual(ContentCacheUsageRow.total(), 30)
+        self.assertEqual(len(list(self.cache.root.glob("*/*"))), 3)
+
+    def test_migration_counts_existing_blobs_once(self):
+        self.put("https://a.b/1", "0123456789")
+        self.put("https://a.b/2", "0123456789")
+        self.put("https://a.b/3", "abc")
+        ContentCacheUsageRow.objects.all().delete()
+        migration = import_module("common.migrations.0014_contentcacheusagerow")
+        migration.count_cached_bytes(django_apps, None)
+        self.assertEqual(ContentCacheUsageRow.total(), 13)
+
+
+class NotificationTests(TempStoresMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        notify = override_settings(CHANGE_NOTIFICATIONS_DIR=f"{self.tmp}/notify")
+        notify.enable()
+        self.addCleanup(notify.disable)
+
+    def test_listeners_are_cached_until_one_comes_or_goes(self):
+        async def receive():
+            first = notifications.ChangeSubscriber()
+            notifications.publish("resource", 1, [1, 2])
+            self.assertEqual((await first.__anext__()).entity_ids, (1, 2))
+            listeners = notifications._get_listeners()
+            self.assertIs(notifications._get_listeners(), listeners)
+
+            second = notifications.ChangeSubscriber()
+            notifications.publish("resource", 1, [3])
+            self.assertEqual((await second.__anext__()).entity_ids, (3,))
+
+            second.sock.close()  # exits without unlinking its socket
+            notifications.publish("resource", 1, [4])
+            self.assertFalse(second.path.exists())
+            self.assertEqual(notifications._get_listeners(), [first.path])
+            first.close()
+
+        asyncio.run(receive())
+
+
+class ImportArxivTests(TestCase):
+    def setUp(self):
+        ConfigCache.invalidate()  # of projects rolled back by earlier tests
+
+    def test_project_config_is_checked_before_searching(self):
+        project = ProjectRow.objects.create()
+        with mock.patch(
+            "common.management.commands.import_arxiv.search_arxiv"
+        ) as search:
+            with self.assertRaisesMessage(click.ClickException, "has no config"):
+                call_command("import_arxiv", "rag", "--project-id", str(project.id))
+        search.assert_not_called()
+
+
+class StartJobRunnersTests(SimpleTestCase):
+    def test_threads_mode_runs_a_single_worker(self):
+        with mock.patch(
+            "common.management.commands.start_job_runners.start_worker"
+        ) as start:
+            with self.assertRaisesMessage(click.ClickException, "--workers 1"):
+                call_command("start_job_runners", "--mode", "threads", "--workers", "2")
+        start.assert_not_called()
+
+
+class MeasurementTests(SimpleTestCase):
+    def test_pool_threads_count_into_the_job_measurement(self):
+        def work():
+            for _ in range(1000):
+                count_bytes(1, 2)
+                count_retry()
+
+        with measuring("extract", 1, [1, 2]) as m:
+            with ThreadPoolExecutor(8) as pool:
+                for _ in range(16):
+                    pool.submit(copy_context().run, work)
+        self.assertEqual((m.bytes_in, m.bytes_out, m.retries), (16000, 32000, 16000))
+
+
+class ContentFilesTests(TempStoresMixin, TestCase):
+    def test_files_are_deleted_with_their_rows(self):
+        project = make_project()
+        resources = [
+            ResourceRow.objects.create(project=project, url=f"https://a.b/{i}")
+            for i in range(2)
+        ]
+        for r in resources:
+            r.add_scraped_content("some text")
+        VectorStore(project.id).append([1], np.ones((1, 4)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resources[0].delete()
+        self.assertIsNone(ContentStore().stored_path(project.id, resources[0].id))
+        self.assertEqual(resources[1].read_scraped_content(), "some text")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            project.delete()
+        self.assertEqual(list(Path(self.tmp).glob("*/project-*")), [])
+
+    def test_migrations_read_text_stored_in_either_format(self):
+        text = random_text(100_000)
+        for codec in (CompressionCodec.NONE, CompressionCodec.ZLIB):
+            with override_settings(CONTENT_FRAME_SIZE=4096):
+                ContentStore(codec=codec, level=1).write(1, 2, text)
+            self.assertEqual(read_text(1, 2), text)
+        self.assertIsNone(read_text(1, 3))
+
+
+class FrameCodecTests(TempStoresMixin, SimpleTestCase):
+    codecs = [CompressionCodec.NONE, CompressionCodec.ZLIB]
+    if compression.zstandard is not None:
+        codecs.append(CompressionCodec.ZSTD)
+
+    def test_framed_round_trip_and_ranges(self):
+        text = random_text(50_000)
+        ranges = [(0, 0), (0, 1), (4095, 4097), (100, 20_000), (49_990, 50_000)]
+        for codec in self.codecs:
+            f = io.BytesIO()
+            w = FramedWriter(f, codec, 3, 4096)
+            for start in range(0, len(text), 1000):
+                w.write(text[start : start + 1000])
+            w.close()
+            path = Path(self.tmp) / f"{codec}.frames"
+            path.write_bytes(f.getvalue())
+
+            with FramedReader(path) as reader:
+                self.assertEqual(reader.codec, codec)
+                self.assertEqual(len(reader.frames), 13)
+                self.assertEqual("".join(reader.iter_frames()), text)
+                self.assertEqual(
+                    reader.read_ranges(ranges), [text[s:e] for s, e in ranges]
+                )
+
+    def test_store_reads_back_each_codec(self):
+        text = random_text(100_000)
+        for codec in self.codecs:
+            store = ContentStore(codec=codec, level=1)
+            store.write(1, 1, text)
+            self.assertEqual(store.read(1, 1), text)
+            self.assertEqual("".join(store.iter_read(1, 1, 777)), text)
+            self.assertEqual(store.read_ranges(1, 1, [(10, 70_000)]), [text[10:70_000]])
+
+    def test_zstd_without_the_package_names_the_extra(self):
+        with mock.patch.object(compression, "zstandard", None):
+            with self.assertRaisesMessage(ValueError, "critical-reader[zstd]"):
+                compression.compress(CompressionCodec.ZSTD, 3, b"text")
+
+
+class AsyncJobTests(TempStoresMixin, TransactionTestCase):
+    def test_async_variant_runs_the_sync_job(self):
+        project = make_project()
+        config = ProjectConfigRow.get_config(project.id)
+        resource = ResourceRow.objects.create(project=project, url="https://x.y")
+        resource.add_scraped_content(random_text(5000))
+        chunk(resource, config)
+
+        async_to_sync(aembed_resource_chunks)(project.id, resource.id)
+        ids = ChunkRow.embedded_ids(resource.id)
+        self.assertEqual(len(ids), ChunkRow.objects.count())
+        self.assertEqual(sorted(VectorStore(project.id).load()[0].tolist()), ids)
+        self.assertTrue(StageMetricRow.objects.filter(stage=Stage.EMBED).exists())
+
+
+class ClaimTests(TempStoresMixin, TransactionTestCase):
+    def claim(self, worker: str, limit: int = 100, stale_after: float = 900):
+        return async_to_sync(ResourceRow.aclaim)(worker, limit, stale_after)
+
+    def test_concurrent_workers_never_share_a_resource(self):
+        project = ProjectRow.objects.create()
+        ResourceRow.bulk_create_for_project(
+            project.id, [f"https://a.b/{i}" for i in range(200)]
+        )
+
+        def work(worker):
+            claimed = []
+            while batch := self.claim(worker, limit=7):
+                claimed += [id for id, _, _ in batch]
+            connections.close_all()
+            return claimed
+
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(work, [f"w{i}" for i in range(4)]))
+        ids = [id for r in results for id in r]
+        self.assertEqual(len(ids), 200)
+        self.assertEqual(len(set(ids)), 200)
+
+    def test_unfinished_work_of_a_dead_worker_is_taken_over(self):
+        project = ProjectRow.objects.create()
+        ids = ResourceRow.bulk_create_for_project(
+            project.id, [f"https://a.b/{i}" for i in range(5)]
+        )
+        self.claim("dead")
+        statuses = [
+            ResourceRow.Status.DOWNLOADED,
+            ResourceRow.Status.SCRAPED,
+            ResourceRow.Status.RETRYING,
+            ResourceRow.Status.PROCESSED,
+            ResourceRow.Status.ERROR,
+        ]
+        for id, status in zip(ids, statuses):
+            ResourceRow.objects.filter(id=id).update(status=status)
+
+        self.assertEqual(self.claim("live"), [])
+        hour_ago = timezone.now() - timedelta(hours=1)
+        ResourceRow.objects.update(claimed_at=hour_ago)
+        async_to_sync(ResourceRow.arenew_claims)("dead", ids[:1])  # still running
+        taken = self.claim("live", stale_after=60)
+        self.assertEqual(
+            [(id, status) for id, _, status in taken],
+            list(zip(ids[1:3], statuses[1:3])),
+        )
+        ResourceRow.objects.update(claimed_at=hour_ago)
+        self.assertEqual(len(self.claim("live", stale_after=60)), 3)
+
+        self.assertEqual(ResourceRow.release_claims("live"), 3)
+        self.assertEqual(len(self.claim("other")), 3)
+
+    def test_scraped_resources_resume_after_extraction(self):
+        project = make_project()
+        resource = ResourceRow.objects.create(
+            project=project, url="https://x.y", status=ResourceRow.Status.SCRAPED
+        )
+        resource.add_scraped_content(random_text(5000))
+        runner = AsyncRunner.from_settings(project.id)
+        async_to_sync(runner.arun_until_idle)()
+
+        resource.refresh_from_db()
+        self.assertEqual(resource.status, ResourceRow.Status.PROCESSED)
+        self.assertTrue(ChunkRow.objects.filter(resource=resource).exists())
+
+
+def words(n: int) -> str:
+    return " ".join(["abcd"] * n)  # a token each
+
+
+class PackPromptTests(SimpleTestCase):
+    system = words(3)
+    question = words(2)
+    # system and question messages
+    base = 3 + 2 + 2 * 4
+
+    def turns(self, n: int) -> list[dict]:
+        return [
+            {"role": role, "content": f"{role} {i} {words(4)}"}
+            for i in range(n)
+            for role in ("user", "assistant")
+        ]
+
+    def test_system_prompt_and_question_are_always_sent(self):
+        history = self.turns(2)
+        prompt = pack_prompt(
+            self.system, history, self.question, [(1, words(5), 5)], 0, 0.5
+        )
+        self.assertEqual(
+            prompt.messages,
+            [
+                {"role": "system", "content": self.system},
+                {"role": "user", "content": self.question},
+            ],
+        )
+        self.assertEqual(prompt.chunk_ids, [])
+        self.assertEqual(prompt.dropped_turns, 2)
+
+    def test_older_turns_are_dropped_in_pairs_with_a_note(self):
+        history = self.turns(4)
+        turn = sum(message_tokens(m) for m in history[:2])
+        # two turns fit, but not with the note on the two left out
+        budget = self.base + 2 * turn + 5
+        prompt = pack_prompt(self.system, history, self.question, [], budget, 1)
+
+        self.assertEqual(prompt.dropped_turns, 3)
+        note = prompt.messages[1]
+        self.assertEqual(note["role"], "system")
+        self.assertTrue(note["content"].startswith("3 earlier question(s)"))
+        self.assertEqual(prompt.messages[2:-1], history[6:])
+        self.assertLessEqual(prompt.tokens, budget)
+
+    def test_chunks_that_do_not_fit_are_skipped(self):
+        chunks = [(1, words(50), 50), (2, "two", 5), (3, "three", 5), (4, "four", 5)]
+        overhead = estimate_tokens(CONTEXT_INTRO) + estimate_tokens("Question: ")
+        cost = 5 + estimate_tokens(CHUNK_SEPARATOR)
+        budget = self.base + overhead + 2 * cost
+        prompt = pack_prompt(self.system, [], self.question, chunks, budget, 0.5)
+
+        self.assertEqual(prompt.chunk_ids, [2, 3])
+        self.assertEqual(prompt.tokens, budget)
+        self.assertEqual(
+            prompt.messages[-1]["content"],
+            f"{CONTEXT_INTRO}two{CHUNK_SEPARATOR}three\n\nQuestion: {self.question}",
+        )
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.project = ProjectRow.objects.create()
+        self.ids = ResourceRow.bulk_create_for_project(
+            self.project.id, [f"https://a.b/{i}" for i in range(3)]
+        )
+        self.cache = ResponseCache(enabled=True, similarity=None)
+
+    def context_key(self, history, question, chunks):
+        return pack_prompt("sys", history, question, chunks, 1000, 0.5).context_key
+
+    def test_context_key_ignores_past_turns_and_chunk_order(self):
+        chunks = [(1, "one", 1), (2, "two", 1)]
+        turns = [
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "hey"},
+        ]
+        key = self.context_key([], "what?", chunks)
+        self.assertEqual(key, self.context_key(turns, "what?", chunks))
+        self.assertEqual(key, self.context_key([], "what?", chunks[::-1]))
+        self.assertNotEqual(key, self.context_key([], "what?", chunks[:1]))
+
+    def test_question_is_matched_once_normalized(self):
+        self.cache.put(self.project.id, "m", "key", "What is  it?", "this")
+        self.assertEqual(
+            self.cache.get(self.project.id, "m", "key", "what is it?"), "this"
+        )
+        self.assertIsNone(self.cache.get(self.project.id, "m", "other", "what is it?"))
+
+    def test_processing_a_batch_invalidates_once(self):
+        self.cache.put(self.project.id, "m", "key", "q", "a")
+        batch = ResourceBatch(self.project.id, self.ids)
+        with mock.patch.object(
+            ResponseCacheRow, "invalidate", wraps=ResponseCacheRow.invalidate
+        ) as invalidate:
+            batch.start()
+            batch.save(EventTypes.RESOURCE_PROCESSED, ResourceRow.Status.PROCESSED)
+        invalidate.assert_called_once_with(self.project.id)
+        self.assertFalse(ResponseCacheRow.objects.exists())
+
+    def test_processing_one_resource_invalidates(self):
+        self.cache.put(self.project.id, "m", "key", "q", "a")
+        ResourceRow.bulk_transition(
+            self.project.id, self.ids, ResourceRow.Status.PROCESSED
+        )
+        self.assertTrue(ResponseCacheRow.objects.exists())
+        run_dummy_rag(self.project.id, self.ids[0])
+        self.assertFalse(ResponseCacheRow.objects.exists())
@@ -0,0 +1,12 @@
+import functools
+import re
+
+# a word piece of up to 4 characters or a punctuation mark, which overestimates
+# BPE tokenizers on English text a little, as a budget should
+TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+@functools.lru_cache(maxsize=4096)
+def estimate_tokens(text: str) -> int:
+    """Tokens `text` takes for an LLM, without loading the model's tokenizer."""
+    return len(TOKEN_RE.findall(text))
@@ -0,0 +1,177 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Self
+
+import numpy as np
+from django.conf import settings
+
+from common.vectors.store import VectorStore, normalize, top_k
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, nlist: int, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = np.bincount(assignments, minlength=nlist) == 0
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray, block: int = 65536):
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), block):
+        out[start : start + block] = np.argmax(
+            vectors[start : start + block] @ centroids.T, axis=1
+        )
+    return out
+
+
+@dataclass
+class IVFIndex:
+    """Inverted-file (IVF-flat) index over a project's `VectorStore`.
+
+    Vectors are clustered with spherical k-means; a query only scores the
+    vectors of its `nprobe` closest clusters. Centroids and the cluster of each
+    stored vector are persisted next to the vectors. New vectors are assigned
+    incrementally and the centroids are retrained once the store has grown by
+    `ANN_INDEX["retrain_growth"]` times since the last training.
+    """
+
+    store: VectorStore
+    nprobe: int = field(default_factory=lambda: settings.ANN_INDEX["nprobe"])
+    _lists: tuple[tuple, np.ndarray, np.ndarray, np.ndarray] | None = field(
+        default=None, init=False, repr=False
+    )
+
+    @property
+    def centroids_path(self) -> Path:
+        return self.store.dir / "ivf_centroids.npy"
+
+    @property
+    def assignments_path(self) -> Path:
+        return self.store.dir / "ivf_assignments.i32"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.store.dir / "ivf.json"
+
+    def is_trained(self) -> bool:
+        return self.meta_path.exists()
+
+    def trained_on(self) -> int:
+        return json.loads(self.meta_path.read_text())["trained_on"]
+
+    def assigned_count(self) -> int:
+        if not self.assignments_path.exists():
+            return 0
+        return self.assignments_path.stat().st_size // 4
+
+    def train(self, iterations: int = 10, sample_size: int = 100_000):
+        _, vectors = self.store.load()
+        if not len(vectors):
+            return
+        rng = np.random.default_rng(0)
+        nlist = max(1, int(np.sqrt(len(vectors))))
+        sample = vectors[
+            np.sort(
+                rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)
+            )
+        ]
+        centroids = spherical_kmeans(np.asarray(sample), nlist, iterations, rng)
+
+        with self.store.lock():
+            np.save(self.centroids_path, centroids)
+            assign(vectors, centroids).tofile(self.assignments_path)
+            self.meta_path.write_text(
+                json.dumps({"nlist": nlist, "trained_on": len(vectors)})
+            )
+        self._lists = None
+
+    def compact(self):
+        """Compact the store, dropping the assignments of deleted vectors too."""
+        self.store.compact({self.assignments_path: np.int32})
+        self._lists = None
+
+    def update(self):
+        """Bring the index up to date with the store, training it if needed."""
+        count = len(self.store)
+        if not self.is_trained():
+            if count >= settings.ANN_INDEX["min_train_size"]:
+                self.train()
+            return
+        if count >= settings.ANN_INDEX["retrain_growth"] * self.trained_on():
+            self.train()
+            return
+
+        with self.store.lock():
+            assigned = self.assigned_count()
+            if assigned >= count:
+                return
+            _, vectors = self.store.load()
+            new = assign(vectors[assigned:count], np.load(self.centroids_path))
+            with open(self.assignments_path, "ab") as f:
+                f.write(new.tobytes())
+
+    def inverted_lists(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the centroids, store positions grouped by cluster, and each
+        cluster's offset, rebuilt only once the files on disk have changed."""
+        version = tuple(
+            (s.st_size, s.st_mtime_ns)
+            for s in (self.assignments_path.stat(), self.centroids_path.stat())
+        )
+        if self._lists is None or self._lists[0] != version:
+            assignments = np.fromfile(self.assignments_path, dtype=np.int32)
+            centroids = np.load(self.centroids_path)
+            order = np.argsort(assignments, kind="stable")
+            offsets = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+            self._lists = (version, centroids, order, offsets)
+        return self._lists[1:]
+
+    def search(
+        self, query: np.ndarray, k: int, nprobe: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Approximate cosine top-`k`: returns `(chunk_ids, scores)`, best first.
+
+        Vectors appended after the last `update` are not searched.
+        """
+        query = normalize(query)
+        with self.store.lock(shared=True):
+            centroids, order, offsets = self.inverted_lists()
+            ids, vectors = self.store.load()
+            deleted = self.store.deleted()
+        nprobe = min(nprobe or self.nprobe, len(centroids))
+        probes = np.argpartition(centroids @ query, len(centroids) - nprobe)[-nprobe:]
+        positions = np.concatenate([order[offsets[c] : offsets[c + 1]] for c in probes])
+        positions.sort()
+        ids = ids[positions]
+        if len(deleted):
+            live = ~np.isin(ids, deleted)
+            ids, positions = ids[live], positions[live]
+        if not len(positions) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return top_k(ids, vectors[positions] @ query, k)
+
+    @classmethod
+    def for_project(cls, project_id: int) -> Self:
+        """The project's index, kept between searches with its inverted lists."""
+        if project_id not in _indexes:
+            _indexes[project_id] = cls(VectorStore(project_id))
+        return _indexes[project_id]
+
+    def recall(self, queries: np.ndarray, k: int, nprobe: int | None = None) -> float:
+        """Mean fraction of the brute-force top-`k` that the index also returns."""
+        hits = 0
+        for query in queries:
+            exact, _ = self.store.search(query, k)
+            approx, _ = self.search(query, k, nprobe)
+            hits += len(np.intersect1d(exact, approx))
+        return hits / (len(queries) * k)
+
+
+_indexes: dict[int, IVFIndex] = {}
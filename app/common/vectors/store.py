@@ -0,0 +1,183 @@
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+@dataclass
+class VectorStore:
+    """Append-only store of unit-length float32 chunk embeddings for a project.
+
+    Vectors live in one contiguous `vectors.f32` file and the matching chunk ids
+    in `ids.i64`, both read back as memory-mapped NumPy arrays so that large
+    projects are never materialized as Python lists. Deleted chunk ids are
+    appended to `deleted.i64` and left out of searches until `compact` drops
+    their vectors.
+    """
+
+    project_id: int
+    root: Path | None = None
+
+    @property
+    def dir(self) -> Path:
+        return (
+            Path(self.root or settings.VECTOR_STORE_DIR) / f"project-{self.project_id}"
+        )
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.dir / "vectors.f32"
+
+    @property
+    def ids_path(self) -> Path:
+        return self.dir / "ids.i64"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.dir / "meta.json"
+
+    @property
+    def deleted_path(self) -> Path:
+        return self.dir / "deleted.i64"
+
+    @contextmanager
+    def lock(self, shared: bool = False):
+        """Writers take it exclusively, searches shared so that `compact`
+        never swaps the files between reading the ids and the vectors."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with open(self.dir / ".lock", "w") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def dim(self) -> int | None:
+        if not self.meta_path.exists():
+            return
+        return json.loads(self.meta_path.read_text())["dim"]
+
+    def __len__(self) -> int:
+        dim = self.dim()
+        if not dim or not self.ids_path.exists():
+            return 0
+        return min(
+            self.ids_path.stat().st_size // 8,
+            self.vectors_path.stat().st_size // (4 * dim),
+        )
+
+    def append(self, ids: list[int], vectors: np.ndarray):
+        vectors = normalize(vectors)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError(
+                f"Expected {len(ids)} vectors, got array of shape {vectors.shape}"
+            )
+
+        with self.lock():
+            dim = self.dim()
+            if dim is None:
+                self.meta_path.write_text(json.dumps({"dim": vectors.shape[1]}))
+            elif dim != vectors.shape[1]:
+                raise ValueError(
+                    f"Vector dimension {vectors.shape[1]} does not match store dimension {dim}"
+                )
+            # Vectors are written before ids so readers, which size the store by
+            # the shorter of the two files, never see an id without its vector.
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self.ids_path, "ab") as f:
+                f.write(np.asarray(ids, dtype=np.int64).tobytes())
+
+    def delete(self, ids: list[int]):
+        """Leave the vectors of `ids` out of searches from now on."""
+        if not ids:
+            return
+        with self.lock():
+            with open(self.deleted_path, "ab") as f:
+                f.write(np.asarray(ids, dtype=np.int64).tobytes())
+
+    def deleted(self) -> np.ndarray:
+        if not self.deleted_path.exists():
+            return np.empty(0, dtype=np.int64)
+        return np.fromfile(self.deleted_path, dtype=np.int64)
+
+    def live(self, ids: np.ndarray) -> np.ndarray | None:
+        """Mask of `ids` that are not deleted, or None when none are."""
+        deleted = self.deleted()
+        if not len(deleted):
+            return None
+        return ~np.isin(ids, deleted)
+
+    def needs_compaction(self) -> bool:
+        deleted = (
+            self.deleted_path.stat().st_size // 8 if self.deleted_path.exists() else 0
+        )
+        return deleted > settings.VECTOR_STORE_COMPACT_RATIO * max(len(self), 1)
+
+    def compact(self, aligned: dict[Path, type] | None = None):
+        """Rewrite the store without the deleted vectors.
+
+        `aligned` maps files holding one `dtype` item per stored vector, like
+        the IVF assignments, to that dtype; they are filtered the same way.
+        """
+        with self.lock():
+            ids, vectors = self.load()
+            keep = self.live(ids)
+            if keep is None:
+                return
+            files = {self.vectors_path: vectors[keep], self.ids_path: ids[keep]}
+            for path, dtype in (aligned or {}).items():
+                if path.exists():
+                    files[path] = np.fromfile(path, dtype=dtype)[: len(keep)][keep]
+            for path, array in files.items():
+                np.asarray(array).tofile(path.with_suffix(".tmp"))
+            for path in files:
+                os.replace(path.with_suffix(".tmp"), path)
+            self.deleted_path.unlink()
+
+    def load(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return `(ids, vectors)` as read-only memory maps."""
+        count = len(self)
+        dim = self.dim()
+        if not count or not dim:
+            return np.empty(0, dtype=np.int64), np.empty((0, dim or 0), np.float32)
+
+        ids = np.memmap(self.ids_path, dtype=np.int64, mode="r", shape=(count,))
+        vectors = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r", shape=(count, dim)
+        )
+        return ids, vectors
+
+    def search(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Brute-force cosine top-`k`: returns `(chunk_ids, scores)`, best first."""
+        with self.lock(shared=True):
+            ids, vectors = self.load()
+            keep = self.live(ids)
+        if not len(ids) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = vectors @ normalize(query)
+        if keep is not None:
+            ids, scores = ids[keep], scores[keep]
+        if not len(ids):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return top_k(ids, scores, k)
+
+
+def top_k(ids: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    k = min(k, len(scores))
+    # argpartition finds the k best in O(n); only those k get sorted
+    top = np.argpartition(scores, len(scores) - k)[-k:]
+    top = top[np.argsort(scores[top])[::-1]]
+    return np.asarray(ids[top]), np.asarray(scores[top])
@@ -1,3 +1,10 @@
-from django.shortcuts import render
+from django.http import HttpResponse
 
-# Create your views here.
+from common.metrics import prometheus_text
+
+
+def metrics(request):
+    """Pipeline stage metrics for Prometheus to scrape."""
+    return HttpResponse(
+        prometheus_text(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -12,7 +12,7 @@ from .models import (
 
 @admin.register(LLMModelRow)
 class LLMModelTableAdmin(admin.ModelAdmin):
-    list_display = ("model_name",)
+    list_display = ("model_name", "context_window", "reply_tokens")
 
 
 @admin.register(ProcessorRow)
@@ -45,4 +45,4 @@ class ProjectConfigTableAdmin(admin.ModelAdmin):
 
 @admin.register(EmbedderRow)
 class EmbedderTableAdmin(admin.ModelAdmin):
-    list_display = ("provider", "model_name")
+    list_display = ("provider", "model_name", "batch_size")
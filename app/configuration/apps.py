@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ConfigurationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'configuration'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from . import signals
+
+        post_migrate.connect(signals.seed_default_rows, sender=self)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2025-12-03 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='embedderrow',
+            name='batch_size',
+            field=models.IntegerField(default=32),
+        ),
+        migrations.AlterField(
+            model_name='embedderrow',
+            name='model_name',
+            field=models.CharField(choices=[('jina-embeddings-v4', 'jina-embeddings-v4'), ('hashing-embeddings', 'hashing-embeddings')], max_length=1024),
+        ),
+        migrations.AlterField(
+            model_name='embedderrow',
+            name='provider',
+            field=models.CharField(choices=[('Ollama', 'Ollama'), ('Jina AI', 'Jina AI'), ('Fake', 'Fake')], max_length=1024),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2025-12-04 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuration', '0002_embedderrow_batch_size_and_fake_provider'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processorrow',
+            name='type',
+            field=models.CharField(choices=[('Simple RAG', 'Simple RAG'), ('IVF RAG', 'IVF RAG')], max_length=1024),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuration', '0003_alter_processorrow_type'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='downloaderrow',
+            name='downloader',
+            field=models.CharField(choices=[('Web page scraper', 'Web page scraper'), ('Jina AI reader using Jina API', 'Jina AI reader using Jina API'), ('PDF file', 'PDF file')], max_length=1024, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='textextractorrow',
+            name='model_name',
+            field=models.CharField(choices=[('ReaderLM-v2', 'ReaderLM-v2'), ('PyPDF2 text extraction', 'PyPDF2 text extraction')], max_length=1024),
+        ),
+        migrations.AlterField(
+            model_name='textextractorrow',
+            name='provider',
+            field=models.CharField(choices=[('Jina AI', 'Jina AI'), ('Ollama', 'Ollama'), ('PyPDF2', 'PyPDF2')], max_length=1024),
+        ),
+    ]
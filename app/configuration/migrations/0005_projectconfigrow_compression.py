@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuration', '0004_pdf_text_extractor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectconfigrow',
+            name='compression_codec',
+            field=models.CharField(choices=[('none', 'none'), ('zlib', 'zlib'), ('zstd', 'zstd')], default='zlib', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='projectconfigrow',
+            name='compression_level',
+            field=models.IntegerField(default=6),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuration', '0005_projectconfigrow_compression'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='llmmodelrow',
+            name='context_window',
+            field=models.PositiveIntegerField(default=8192),
+        ),
+        migrations.AddField(
+            model_name='llmmodelrow',
+            name='reply_tokens',
+            field=models.PositiveIntegerField(default=1024),
+        ),
+    ]
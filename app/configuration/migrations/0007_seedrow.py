@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuration', '0006_llmmodelrow_context_window'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('version', models.IntegerField()),
+            ],
+        ),
+    ]
@@ -1,23 +1,34 @@
+import time
 from dataclasses import dataclass
 from typing import Self
 
-from django.db import models
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, models, transaction
 from common.models import ProjectRow
 from common.constants import (
     DownloaderType,
+    FAKE_MODELS,
     JINA_AI_MODELS,
+    PDF_MODELS,
     Provider,
     ChunkerType,
+    CompressionCodec,
     ProcessorType,
 )
 
 
-@dataclass
+@dataclass(frozen=True)
 class Downloader:
     type: str
 
     def validate(self):
-        assert self.type in [DownloaderType.JINA_AI_READER_USING_JINA_API]
+        assert self.type in [
+            DownloaderType.JINA_AI_READER_USING_JINA_API,
+            DownloaderType.PDF_FILE,
+        ]
+
+    def to_dict(self) -> dict:
+        return {"name": self.type}
 
 
 class DownloaderRow(models.Model):
@@ -27,6 +38,7 @@ class DownloaderRow(models.Model):
             DownloaderType.JINA_AI_READER_USING_JINA_API,
             DownloaderType.JINA_AI_READER_USING_JINA_API,
         )
+        PDF_FILE = DownloaderType.PDF_FILE, DownloaderType.PDF_FILE
 
     downloader = models.CharField(
         max_length=1024, choices=Downloader.choices, unique=True
@@ -49,15 +61,16 @@ class DownloaderRow(models.Model):
         return {"name": self.downloader}
 
     @classmethod
-    def create_default_rows(cls):
-        cls.objects.get_or_create(downloader=cls.Downloader.WEB_SCRAPER)
-        cls.objects.get_or_create(downloader=cls.Downloader.JINA_AI_API)
+    def create_default_rows(cls, using: str = DEFAULT_DB_ALIAS):
+        cls.objects.using(using).get_or_create(downloader=cls.Downloader.WEB_SCRAPER)
+        cls.objects.using(using).get_or_create(downloader=cls.Downloader.JINA_AI_API)
+        cls.objects.using(using).get_or_create(downloader=cls.Downloader.PDF_FILE)
 
     def to_obj(self) -> Downloader:
         return Downloader(type=self.downloader)
 
 
-@dataclass
+@dataclass(frozen=True)
 class TextExtractor:
     provider: str
     model_name: str
@@ -67,15 +80,22 @@ class TextExtractor:
         if self.downloader.type == DownloaderType.JINA_AI_READER_USING_JINA_API:
             assert self.provider == TextExtractorRow.Provider.JINA_API
             assert self.model_name in JINA_AI_MODELS.reader_models()
+        if self.downloader.type == DownloaderType.PDF_FILE:
+            assert self.provider == TextExtractorRow.Provider.PYPDF2
+
+    def to_dict(self) -> dict:
+        return {"provider": self.provider, "model_name": self.model_name}
 
 
 class TextExtractorRow(models.Model):
     class Provider(models.TextChoices):
         JINA_API = Provider.JINA, Provider.JINA
         LOCAL = Provider.OLLAMA, Provider.OLLAMA
+        PYPDF2 = Provider.PYPDF2, Provider.PYPDF2
 
     class ModelName(models.TextChoices):
         READER_LM_V2 = JINA_AI_MODELS.READER_LM_V2, JINA_AI_MODELS.READER_LM_V2
+        PYPDF2_TEXT = PDF_MODELS.PYPDF2_TEXT, PDF_MODELS.PYPDF2_TEXT
 
     provider = models.CharField(max_length=1024, choices=Provider.choices)
     model_name = models.CharField(max_length=1024, choices=ModelName.choices)
@@ -105,34 +125,51 @@ class TextExtractorRow(models.Model):
         )
 
     @classmethod
-    def create_default_rows(cls):
-        cls.objects.get_or_create(
+    def create_default_rows(cls, using: str = DEFAULT_DB_ALIAS):
+        cls.objects.using(using).get_or_create(
             provider=cls.Provider.JINA_API, model_name=cls.ModelName.READER_LM_V2
         )
+        cls.objects.using(using).get_or_create(
+            provider=cls.Provider.PYPDF2, model_name=cls.ModelName.PYPDF2_TEXT
+        )
 
 
-@dataclass
+@dataclass(frozen=True)
 class Embedder:
     provider: str
     model_name: str
+    batch_size: int = 32
 
     def validate(self):
-        pass
+        assert self.batch_size > 0
+
+    def to_dict(self) -> dict:
+        return {
+            "provider": self.provider,
+            "model_name": self.model_name,
+            "batch_size": self.batch_size,
+        }
 
 
 class EmbedderRow(models.Model):
     class Provider(models.TextChoices):
         LOCAL = Provider.OLLAMA, Provider.OLLAMA
         JINA_API = Provider.JINA, Provider.JINA
+        FAKE = Provider.FAKE, Provider.FAKE
 
     class ModelName(models.TextChoices):
         JINA_EMBEDDINGS_V4 = (
             JINA_AI_MODELS.JINA_EMBEDDINGS_V4,
             JINA_AI_MODELS.JINA_EMBEDDINGS_V4,
         )
+        HASHING_EMBEDDINGS = (
+            FAKE_MODELS.HASHING_EMBEDDINGS,
+            FAKE_MODELS.HASHING_EMBEDDINGS,
+        )
 
     provider = models.CharField(max_length=1024, choices=Provider.choices)
     model_name = models.CharField(max_length=1024, choices=ModelName.choices)
+    batch_size = models.IntegerField(default=32)
 
     @classmethod
     def get(cls, id) -> Self:
@@ -151,23 +188,37 @@ class EmbedderRow(models.Model):
         return f"{self.provider}-{self.model_name}"
 
     def to_dict(self) -> dict:
-        return {"provider": self.provider, "model_name": self.model_name}
+        return {
+            "provider": self.provider,
+            "model_name": self.model_name,
+            "batch_size": self.batch_size,
+        }
 
     @classmethod
-    def create_default_rows(cls):
-        cls.objects.get_or_create(
+    def create_default_rows(cls, using: str = DEFAULT_DB_ALIAS):
+        cls.objects.using(using).get_or_create(
             provider=cls.Provider.JINA_API, model_name=cls.ModelName.JINA_EMBEDDINGS_V4
         )
+        cls.objects.using(using).get_or_create(
+            provider=cls.Provider.FAKE, model_name=cls.ModelName.HASHING_EMBEDDINGS
+        )
 
     def to_obj(self) -> Embedder:
-        return Embedder(provider=self.provider, model_name=self.model_name)
+        return Embedder(
+            provider=self.provider,
+            model_name=self.model_name,
+            batch_size=self.batch_size,
+        )
 
 
-@dataclass
+@dataclass(frozen=True)
 class Chunker:
     type: str
     size: int | None
 
+    def to_dict(self) -> dict:
+        return {"type": self.type, "size": self.size}
+
 
 class ChunkerRow(models.Model):
     class Type(models.TextChoices):
@@ -197,23 +248,23 @@ class ChunkerRow(models.Model):
         return f"{self.type}, {self.size}"
 
     @classmethod
-    def create_default_rows(cls):
-        cls.objects.get_or_create(type=cls.Type.FIXED, size=1024)
-        cls.objects.get_or_create(type=cls.Type.NO_CHUNK)
+    def create_default_rows(cls, using: str = DEFAULT_DB_ALIAS):
+        cls.objects.using(using).get_or_create(type=cls.Type.FIXED, size=1024)
+        cls.objects.using(using).get_or_create(type=cls.Type.NO_CHUNK)
 
     @classmethod
-    def default(cls) -> Self:
-        return cls.objects.get(type=cls.Type.FIXED, size=1024)
+    def default(cls, using: str = DEFAULT_DB_ALIAS) -> Self:
+        return cls.objects.using(using).get(type=cls.Type.FIXED, size=1024)
 
     @classmethod
-    def no_chunk(cls) -> Self:
-        return cls.objects.get(type=cls.Type.NO_CHUNK)
+    def no_chunk(cls, using: str = DEFAULT_DB_ALIAS) -> Self:
+        return cls.objects.using(using).get(type=cls.Type.NO_CHUNK)
 
     def to_obj(self) -> Chunker:
         return Chunker(type=self.type, size=self.size)
 
 
-@dataclass
+@dataclass(frozen=True)
 class Processor:
     type: str
     chunker: Chunker
@@ -221,10 +272,14 @@ class Processor:
     def validate(self):
         pass
 
+    def to_dict(self) -> dict:
+        return {"type": self.type, "chunker": self.chunker.to_dict()}
+
 
 class ProcessorRow(models.Model):
     class Type(models.TextChoices):
         SIMPLE_RAG = ProcessorType.SIMPLE_RAG, ProcessorType.SIMPLE_RAG
+        IVF_RAG = ProcessorType.IVF_RAG, ProcessorType.IVF_RAG
 
     type = models.CharField(max_length=1024, choices=Type.choices)
     chunker = models.ForeignKey(ChunkerRow, on_delete=models.CASCADE)
@@ -244,14 +299,18 @@ class ProcessorRow(models.Model):
         return res
 
     @classmethod
-    def create_default_rows(cls):
-        cls.objects.get_or_create(
+    def create_default_rows(cls, using: str = DEFAULT_DB_ALIAS):
+        cls.objects.using(using).get_or_create(
             type=cls.Type.SIMPLE_RAG,
-            chunker=ChunkerRow.default(),
+            chunker=ChunkerRow.default(using),
         )
-        cls.objects.get_or_create(
+        cls.objects.using(using).get_or_create(
             type=cls.Type.SIMPLE_RAG,
-            chunker=ChunkerRow.no_chunk(),
+            chunker=ChunkerRow.no_chunk(using),
+        )
+        cls.objects.using(using).get_or_create(
+            type=cls.Type.IVF_RAG,
+            chunker=ChunkerRow.default(using),
         )
 
     def to_dict(self) -> dict:
@@ -273,16 +332,32 @@ class ProcessorRow(models.Model):
         return Processor(type=self.type, chunker=chunker.to_obj())
 
 
-@dataclass
+@dataclass(frozen=True)
 class LLMModel:
     model_name: str
+    context_window: int
+    reply_tokens: int
 
     def validate(self):
-        pass
+        assert 0 < self.reply_tokens < self.context_window
+
+    @property
+    def prompt_budget(self) -> int:
+        """Tokens a prompt may take, leaving room for the reply."""
+        return self.context_window - self.reply_tokens
+
+    def to_dict(self) -> dict:
+        return {
+            "model_name": self.model_name,
+            "context_window": self.context_window,
+            "reply_tokens": self.reply_tokens,
+        }
 
 
 class LLMModelRow(models.Model):
     model_name = models.CharField(max_length=1024)
+    context_window = models.PositiveIntegerField(default=8192)  # tokens
+    reply_tokens = models.PositiveIntegerField(default=1024)  # kept for the reply
 
     @classmethod
     def get(cls, id) -> Self:
@@ -295,26 +370,66 @@ class LLMModelRow(models.Model):
         return res
 
     @classmethod
-    def create_default_rows(cls):
-        cls.objects.get_or_create(model_name="ollama_chat/qwen3:4b")
+    def create_default_rows(cls, using: str = DEFAULT_DB_ALIAS):
+        cls.objects.using(using).get_or_create(model_name="ollama_chat/qwen3:4b")
 
     def __str__(self):
         return self.model_name
 
     def to_dict(self) -> dict:
-        return {"model_name": self.model_name}
+        return {
+            "model_name": self.model_name,
+            "context_window": self.context_window,
+            "reply_tokens": self.reply_tokens,
+        }
 
     def to_obj(self) -> LLMModel:
-        return LLMModel(model_name=self.model_name)
+        return LLMModel(
+            model_name=self.model_name,
+            context_window=self.context_window,
+            reply_tokens=self.reply_tokens,
+        )
+
+
+@dataclass(frozen=True)
+class Compression:
+    codec: str
+    level: int
+
+    def validate(self):
+        assert self.codec in ProjectConfigRow.CompressionCodec.values
+        if self.codec == CompressionCodec.ZSTD:
+            from common.content.compression import require_zstd
+
+            require_zstd()  # fail resolving the config rather than mid-job
+
+    def to_dict(self) -> dict:
+        return {"codec": self.codec, "level": self.level}
+
+
+# zlib ships with Python, unlike zstd
+DEFAULT_COMPRESSION = Compression(codec=CompressionCodec.ZLIB, level=6)
 
 
 class ProjectConfigRow(models.Model):
+    class CompressionCodec(models.TextChoices):
+        NONE = CompressionCodec.NONE, CompressionCodec.NONE
+        ZLIB = CompressionCodec.ZLIB, CompressionCodec.ZLIB
+        ZSTD = CompressionCodec.ZSTD, CompressionCodec.ZSTD
+
     project = models.OneToOneField(ProjectRow, on_delete=models.CASCADE)
     downloader = models.ForeignKey(DownloaderRow, on_delete=models.CASCADE)
     text_extractor = models.ForeignKey(TextExtractorRow, on_delete=models.CASCADE)
     embedder = models.ForeignKey(EmbedderRow, on_delete=models.CASCADE)
     processor = models.ForeignKey(ProcessorRow, on_delete=models.CASCADE)
     llm_model = models.ForeignKey(LLMModelRow, on_delete=models.CASCADE)
+    # of the extracted text, see `common.content.store.ContentStore`
+    compression_codec = models.CharField(
+        max_length=16,
+        choices=CompressionCodec.choices,
+        default=DEFAULT_COMPRESSION.codec,
+    )
+    compression_level = models.IntegerField(default=DEFAULT_COMPRESSION.level)
     downloader_id: int
     text_extractor_id: int
     embedder_id: int
@@ -333,21 +448,14 @@ class ProjectConfigRow(models.Model):
             "embedder": self.embedder.to_dict(),
             "processor": self.processor.to_dict(),
             "llm_model": self.llm_model.to_dict(),
+            "compression": self.compression_obj().to_dict(),
         }
 
+    def compression_obj(self) -> Compression:
+        return Compression(codec=self.compression_codec, level=self.compression_level)
+
     async def ato_dict(self) -> dict:
-        downloader = await DownloaderRow.aget_by_id(self.downloader_id)
-        text_extractor = await TextExtractorRow.aget(self.text_extractor_id)
-        embedder = await EmbedderRow.aget(self.embedder_id)
-        processor = await ProcessorRow.aget(self.processor_id)
-        llm_model = await LLMModelRow.aget(self.llm_model_id)
-        return {
-            "downloader": downloader.to_dict(),
-            "text_extractor": text_extractor.to_dict(),
-            "embedder": embedder.to_dict(),
-            "processor": await processor.ato_dict(),
-            "llm_model": llm_model.to_dict(),
-        }
+        return (await self.ato_obj()).to_dict()
 
     @classmethod
     async def aget_by_project(cls, project_id: int) -> Self | None:
@@ -375,56 +483,68 @@ class ProjectConfigRow(models.Model):
         except cls.DoesNotExist:
             return
 
-    async def ato_obj(self) -> "Config":
-        downloader = await DownloaderRow.aget_by_id(self.downloader_id)
-        text_extractor = await TextExtractorRow.aget(self.text_extractor_id)
-        embedder = await EmbedderRow.aget(self.embedder_id)
-        processor = await ProcessorRow.aget(self.processor_id)
-        llm_model = await LLMModelRow.aget(self.llm_model_id)
-        project_row = await ProjectRow.aget_by_id(self.project_id)
-        assert project_row
+    @classmethod
+    def with_related(cls):
+        return cls.objects.select_related(
+            "downloader",
+            "text_extractor",
+            "embedder",
+            "processor__chunker",
+            "llm_model",
+        )
 
-        processor_obj = await processor.ato_obj()
-        downloader_obj = downloader.to_obj()
+    def build_obj(self) -> "Config":
+        """Build the `Config` from rows fetched through `with_related`."""
+        downloader_obj = self.downloader.to_obj()
 
         conf = Config(
-            project_id=project_row.id,
+            project_id=self.project_id,
             downloader=downloader_obj,
-            text_extractor=text_extractor.to_obj(downloader_obj),
-            embedder=embedder.to_obj(),
-            processor=processor_obj,
-            llm_model=llm_model.to_obj(),
+            text_extractor=self.text_extractor.to_obj(downloader_obj),
+            embedder=self.embedder.to_obj(),
+            processor=Processor(
+                type=self.processor.type,
+                chunker=self.processor.chunker.to_obj(),
+            ),
+            llm_model=self.llm_model.to_obj(),
+            compression=self.compression_obj(),
         )
 
         conf.validate()
         return conf
 
-    def to_obj(self) -> "Config":
-        downloader = DownloaderRow.get_by_id(self.downloader_id)
-        text_extractor = TextExtractorRow.get(self.text_extractor_id)
-        embedder = EmbedderRow.get(self.embedder_id)
-        processor = ProcessorRow.get(self.processor_id)
-        llm_model = LLMModelRow.get(self.processor_id)
-        project_row = ProjectRow.get_by_id(self.project_id)
-        assert project_row
+    @classmethod
+    def get_config(cls, project_id: int) -> "Config | None":
+        conf = ConfigCache.get(project_id)
+        if conf is None:
+            row = cls.with_related().filter(project_id=project_id).first()
+            if not row:
+                return
+            conf = ConfigCache.set(project_id, row.build_obj())
+        return conf
 
-        processor_obj = processor.to_obj()
-        downloader_obj = downloader.to_obj()
+    @classmethod
+    async def aget_config(cls, project_id: int) -> "Config | None":
+        conf = ConfigCache.get(project_id)
+        if conf is None:
+            row = await cls.with_related().filter(project_id=project_id).afirst()
+            if not row:
+                return
+            conf = ConfigCache.set(project_id, row.build_obj())
+        return conf
 
-        conf = Config(
-            project_id=project_row.id,
-            downloader=downloader_obj,
-            text_extractor=text_extractor.to_obj(downloader_obj),
-            embedder=embedder.to_obj(),
-            processor=processor_obj,
-            llm_model=llm_model.to_obj(),
-        )
+    async def ato_obj(self) -> "Config":
+        conf = await self.aget_config(self.project_id)
+        assert conf
+        return conf
 
-        conf.validate()
+    def to_obj(self) -> "Config":
+        conf = self.get_config(self.project_id)
+        assert conf
         return conf
 
 
-@dataclass
+@dataclass(frozen=True)
 class Config:
     project_id: int | str
     downloader: Downloader
@@ -432,6 +552,7 @@ class Config:
     embedder: Embedder
     processor: Processor
     llm_model: LLMModel
+    compression: Compression = DEFAULT_COMPRESSION
 
     def validate(self):
         self.downloader.validate()
@@ -439,12 +560,85 @@ class Config:
         self.embedder.validate()
         self.processor.validate()
         self.llm_model.validate()
+        self.compression.validate()
+
+    def to_dict(self) -> dict:
+        return {
+            "downloader": self.downloader.to_dict(),
+            "text_extractor": self.text_extractor.to_dict(),
+            "embedder": self.embedder.to_dict(),
+            "processor": self.processor.to_dict(),
+            "llm_model": self.llm_model.to_dict(),
+            "compression": self.compression.to_dict(),
+        }
+
+
+class ConfigCache:
+    """Per-process cache of resolved `Config`s keyed by project id.
+
+    `configuration.signals` drops entries whenever a `ProjectConfigRow` or a
+    row it references is saved or deleted in this process. Entries also expire
+    after `CONFIG_CACHE_TTL` seconds so that edits made by other processes,
+    e.g. in the admin while a job runner is up, are picked up.
+    """
+
+    _configs: dict[int, tuple[float, Config]] = {}
+
+    @classmethod
+    def get(cls, project_id: int) -> Config | None:
+        entry = cls._configs.get(int(project_id))
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+    @classmethod
+    def set(cls, project_id: int, conf: Config) -> Config:
+        expires_at = time.monotonic() + settings.CONFIG_CACHE_TTL
+        cls._configs[int(project_id)] = (expires_at, conf)
+        return conf
+
+    @classmethod
+    def invalidate(cls, project_id: int | None = None):
+        if project_id is None:
+            cls._configs.clear()
+        else:
+            cls._configs.pop(int(project_id), None)
+
+
+# bump when a `create_default_rows` changes, so existing databases get the rows
+DEFAULT_ROWS_VERSION = 1
+
+
+class SeedRow(models.Model):
+    """The version of a set of rows the database was seeded with."""
+
+    name = models.CharField(max_length=255, unique=True)
+    version = models.IntegerField()
+
+    @classmethod
+    def is_seeded(cls, name: str, version: int, using: str = DEFAULT_DB_ALIAS) -> bool:
+        return cls.objects.using(using).filter(name=name, version__gte=version).exists()
+
+    @classmethod
+    def mark_seeded(cls, name: str, version: int, using: str = DEFAULT_DB_ALIAS):
+        cls.objects.using(using).update_or_create(
+            name=name, defaults={"version": version}
+        )
+
+
+def create_default_rows(using: str = DEFAULT_DB_ALIAS):
+    DownloaderRow.create_default_rows(using)
+    TextExtractorRow.create_default_rows(using)
+    EmbedderRow.create_default_rows(using)
+    ChunkerRow.create_default_rows(using)
+    ProcessorRow.create_default_rows(using)
+    LLMModelRow.create_default_rows(using)
 
 
-def create_default_rows():
-    DownloaderRow.create_default_rows()
-    TextExtractorRow.create_default_rows()
-    EmbedderRow.create_default_rows()
-    ChunkerRow.create_default_rows()
-    ProcessorRow.create_default_rows()
-    LLMModelRow.create_default_rows()
+def ensure_default_rows(using: str = DEFAULT_DB_ALIAS):
+    """`create_default_rows` once per `DEFAULT_ROWS_VERSION`, a single query
+    after that. Also run after `migrate`."""
+    if SeedRow.is_seeded("default_rows", DEFAULT_ROWS_VERSION, using):
+        return
+    with transaction.atomic(using=using):
+        create_default_rows(using)
+        SeedRow.mark_seeded("default_rows", DEFAULT_ROWS_VERSION, using)
@@ -0,0 +1,43 @@
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    ChunkerRow,
+    ConfigCache,
+    DownloaderRow,
+    EmbedderRow,
+    LLMModelRow,
+    ProcessorRow,
+    ProjectConfigRow,
+    TextExtractorRow,
+    ensure_default_rows,
+)
+
+
+@receiver([post_save, post_delete], sender=ProjectConfigRow)
+def invalidate_project_config(sender, instance: ProjectConfigRow, **kwargs):
+    ConfigCache.invalidate(instance.project_id)
+
+
+@receiver([post_save, post_delete], sender=DownloaderRow)
+@receiver([post_save, post_delete], sender=TextExtractorRow)
+@receiver([post_save, post_delete], sender=EmbedderRow)
+@receiver([post_save, post_delete], sender=ProcessorRow)
+@receiver([post_save, post_delete], sender=ChunkerRow)
+@receiver([post_save, post_delete], sender=LLMModelRow)
+def invalidate_all_configs(sender, **kwargs):
+    # these rows are shared by many projects, so every cached config may be stale
+    ConfigCache.invalidate()
+
+
+def seed_default_rows(sender, using, plan=None, **kwargs):
+    """After `migrate` of the database `using`, unless it unapplied migrations
+    or left some unapplied, the rows are created with the latest models."""
+    if any(backwards for _, backwards in plan or []):
+        return
+    executor = MigrationExecutor(connections[using])
+    if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+        return
+    ensure_default_rows(using)
@@ -1,3 +1,55 @@
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.migrations.executor import MigrationExecutor
 from django.test import TestCase
 
-# Create your tests here.
+from common.constants import ChunkerType, CompressionCodec
+from common.tests import make_project
+from configuration.models import (
+    DEFAULT_ROWS_VERSION,
+    ChunkerRow,
+    Config,
+    ProjectConfigRow,
+    SeedRow,
+)
+from configuration.signals import seed_default_rows
+
+
+class CompressionDefaultTests(TestCase):
+    def test_new_rows_and_configs_default_alike(self):
+        project = make_project()
+        config = ProjectConfigRow.get_config(project.id)
+        row_default = config.compression
+        dataclass_default = Config(
+            project.id,
+            config.downloader,
+            config.text_extractor,
+            config.embedder,
+            config.processor,
+            config.llm_model,
+        ).compression
+        self.assertEqual(row_default, dataclass_default)
+        self.assertEqual(row_default.codec, CompressionCodec.ZLIB)
+
+
+class SeedDefaultRowsTests(TestCase):
+    def setUp(self):
+        SeedRow.objects.all().delete()
+
+    def test_seeds_the_migrated_database(self):
+        seed_default_rows(None, using=DEFAULT_DB_ALIAS, plan=[])
+        self.assertTrue(SeedRow.is_seeded("default_rows", DEFAULT_ROWS_VERSION))
+        self.assertTrue(ChunkerRow.objects.filter(type=ChunkerType.FIXED).exists())
+
+    def test_skips_migrating_backwards(self):
+        migration = mock.Mock()
+        seed_default_rows(None, using=DEFAULT_DB_ALIAS, plan=[(migration, True)])
+        self.assertFalse(SeedRow.objects.exists())
+
+    def test_skips_until_every_migration_is_applied(self):
+        with mock.patch.object(
+            MigrationExecutor, "migration_plan", return_value=[(mock.Mock(), False)]
+        ):
+            seed_default_rows(None, using=DEFAULT_DB_ALIAS, plan=[])
+        self.assertFalse(SeedRow.objects.exists())
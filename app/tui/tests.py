@@ -1,3 +1,84 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.test import TransactionTestCase, override_settings
+from textual.app import App
+from textual.widgets import Input, Markdown
+
+from common.management.commands.serve_stub_llm import REPLY, stub_llm_server
+from common.models import ProjectRow, ResourceRow
+from common.project_manager import Project
+from common.tests import TempStoresMixin, make_project
+from tui.models import AppState
+from tui.widgets.chat import ChatDetailsView
+from tui.widgets.resource import ResroucesList
+
+
+class ResourcesListApp(App):
+    def compose(self):
+        yield ResroucesList()
+
+
+@override_settings(TUI={"resources_page_size": 3})
+class ResourcesListTests(TransactionTestCase):
+    async def test_new_resources_are_listed_first(self):
+        project = await ProjectRow.objects.acreate()
+        for i in range(5):
+            await ResourceRow.objects.acreate(project=project, url=f"https://a.b/{i}")
+
+        app = ResourcesListApp()
+        async with app.run_test() as pilot:
+            table = app.query_one(ResroucesList)
+            await table.make_rows(project.id)
+            ids = [int(k.value) for k in table.rows]
+            self.assertEqual(len(ids), 3)
+
+            new = await ResourceRow.objects.acreate(project=project, url="https://c")
+            await table.aapply_changes([new.id, ids[-1] - 1])  # not loaded yet
+            await pilot.pause()
+            listed = [table.get_row_at(i)[0] for i in range(table.row_count)]
+            self.assertEqual(listed, [new.id, *ids])
+
+
+class ChatApp(App):
+    def on_mount(self):
+        self.push_screen(ChatDetailsView())
+
+
+class ChatStreamTests(TempStoresMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        server = stub_llm_server(0, first_token_delay=0, token_delay=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        llm = override_settings(
+            OLLAMA_BASE_URL=f"http://127.0.0.1:{server.server_port}"
+        )
+        llm.enable()
+        self.addCleanup(llm.disable)
+
+    async def test_reply_is_streamed_and_saved(self):
+        project = await sync_to_async(make_project)()
+        AppState.set_active_project(await Project.acreate_from_db_row(project))
+        djllm_chat = mock.Mock()
+        AppState.set_active_djllm_chat(djllm_chat)
+
+        app = ChatApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            question = app.screen.query_one(Input)
+            question.focus()
+            question.value = "what is a stub"
+            await pilot.press("enter")
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            reply = app.screen.query(Markdown).last()
+
+        answer = reply.source.strip()
+        self.assertEqual(answer, (REPLY + "what is a stub").strip())
+        djllm_chat.create_user_message.assert_called_once_with(text="what is a stub")
+        [call] = djllm_chat.create_assistant_message.call_args_list
+        self.assertEqual(call.kwargs["text"].strip(), answer)
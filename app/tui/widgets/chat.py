@@ -1,12 +1,20 @@
-from common.chat_manager import ChatManager
-from django.utils import timezone
-from textual.reactive import reactive
-from textual import events
+import time
+
+from common.chat_manager import SYSTEM_PROMPT, ChatManager
+from common.llm import astream_chat
+from common.prompt import ChatPrompt, abuild_chat_prompt
+from common.response_cache import ResponseCache
+from configuration.models import LLMModel
+from common.project_manager import ProjectManager
+from django.conf import settings
+from textual import events, work
+from textual.css.query import NoMatches
 from textual.app import App, ComposeResult
-from textual.containers import Horizontal
+from textual.containers import Horizontal, VerticalScroll
 from textual.message import Message
 from textual.screen import Screen
 from textual.widget import Widget
+from textual.worker import Worker, WorkerState
 from textual.widgets import (
     Footer,
     Header,
@@ -15,6 +23,7 @@ from textual.widgets import (
     ListItem,
     ListView,
     LoadingIndicator,
+    Markdown,
 )
 from tui.models import AppState
 
@@ -30,13 +39,10 @@ class ChatListItem(ListItem):
 
 
 class ChatList(Widget):
-    time = reactive(0.0)
-
     def compose(self) -> ComposeResult:
         yield ListView(id="chat-summary-list")
 
     async def on_mount(self):
-        self.set_interval(3, self.update_time)
         await self.apopulate_chat_summary_list()
 
     async def apopulate_chat_summary_list(self):
@@ -46,17 +52,29 @@ class ChatList(Widget):
         ):
             tui_list_items.append(ChatListItem(Label(c.preview), id=c.id_for_ui))
 
-    async def on_list_view_selected(self, item):
-        self.post_message(ChatListItem.Selected(item.item.id))
-
-    def update_time(self):
-        self.time = timezone.now()
-
-    async def watch_time(self):
+    async def areload(self):
         tui_list_items = self.query_one("#chat-summary-list", ListView)
         await tui_list_items.clear()
         await self.apopulate_chat_summary_list()
 
+    async def ainsert_chats(self, chat_ids):
+        """Add newly created chats to the top of the list."""
+        tui_list_items = self.query_one("#chat-summary-list", ListView)
+        async for c in ChatManager.aget_by_ids(
+            AppState.active_project.id_in_db, list(chat_ids)
+        ):
+            try:
+                tui_list_items.query_one(f"#{c.id_for_ui}")
+                continue
+            except NoMatches:
+                pass
+            await tui_list_items.insert(
+                0, [ChatListItem(Label(c.preview), id=c.id_for_ui)]
+            )
+
+    async def on_list_view_selected(self, item):
+        self.post_message(ChatListItem.Selected(item.item.id))
+
 
 class ChatDetailsView(Screen):
     BINDINGS = [
@@ -69,27 +87,95 @@ class ChatDetailsView(Screen):
 
     def compose(self) -> ComposeResult:
         yield Header()
+        yield VerticalScroll(id="chat_messages")
         with Horizontal(id="chat_user_input_box"):
             yield Input(placeholder="Enter message", id="chat_user_input_message")
         yield Footer()
 
     def on_mount(self):
         self.title = "Chat Details"
-
-    async def on_input_submitted(self, event):
-        djllm_chat = AppState.active_djllm_chat
-        first_user_msg = djllm_chat.create_user_message(
-            text=event.value,
+        # questions and answers without their retrieved context
+        self.history: list[dict] = []
+
+    async def on_input_submitted(self, event: Input.Submitted):
+        question = event.value.strip()
+        if not question:
+            return
+        event.input.clear()
+
+        messages = self.query_one("#chat_messages", VerticalScroll)
+        reply = Markdown(classes="chat_assistant_message")
+        await messages.mount_all(
+            [Markdown(question, classes="chat_user_message"), reply]
         )
-
-        model_name = "ollama_chat/qwen3:4b"
-
-        ai_msg: Message
-        user_msg: Message
-        llm_call: LLMCall
-
-        ai_msg, second_user_msg, llm_call = djllm_chat.send_user_msg_to_llm(
-            model_name=model_name,
-            text=event.value,
+        messages.scroll_end(animate=False)
+        self.astream_reply(question, reply)
+
+    @work(exclusive=True, group="llm", exit_on_error=False)
+    async def astream_reply(self, question: str, reply: Markdown):
+        """Write the answer into `reply`, from the cache or as it is generated."""
+        start = time.perf_counter()
+        project_id = AppState.active_project.id_in_db
+        llm_model = await ChatManager.allm_model(project_id)
+        model_name = llm_model.model_name
+        retrieved = await ProjectManager.aretrieve(
+            question, k=settings.CHAT_PROMPT["retrieve_k"]
+        )
+        prompt = await abuild_chat_prompt(
+            SYSTEM_PROMPT, self.history, question, retrieved, llm_model
         )
-        raise KeyboardInterrupt(event.value)
+        cache = ResponseCache()
+        cache_key = (project_id, model_name, prompt.context_key, question)
+
+        answer = await cache.aget(*cache_key, retrieved.query_vector)
+        if answer is not None:
+            await reply.update(answer)
+            self.sub_title = (
+                f"{model_name} · cached answer in"
+                f" {(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+        else:
+            answer = await self.astream_answer(llm_model, prompt, reply, start)
+            if answer:
+                await cache.aput(*cache_key, answer, retrieved.query_vector)
+
+        self.history += [
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": answer},
+        ]
+        await ChatManager.asave_exchange(AppState.active_djllm_chat, question, answer)
+
+    async def astream_answer(
+        self, llm_model: LLMModel, prompt: ChatPrompt, reply: Markdown, start: float
+    ) -> str:
+        model_name = llm_model.model_name
+        self.sub_title = f"{model_name} · {prompt.tokens} prompt tokens · waiting"
+        messages_view = self.query_one("#chat_messages", VerticalScroll)
+        stream = Markdown.get_stream(reply)
+        parts = []
+        first_token_at = None
+        try:
+            async for piece in astream_chat(
+                model_name, prompt.messages, llm_model.context_window
+            ):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter() - start
+                    self.sub_title = f"{model_name} · first token {first_token_at:.2f}s"
+                parts.append(piece)
+                await stream.write(piece)
+                messages_view.scroll_end(animate=False)
+        finally:
+            await stream.stop()
+
+        if first_token_at is not None:
+            generating = time.perf_counter() - start - first_token_at
+            self.sub_title = (
+                f"{model_name} · first token {first_token_at:.2f}s"
+                f" · {len(parts) / max(generating, 1e-6):.1f} tokens/s"
+            )
+        return "".join(parts)
+
+    def on_worker_state_changed(self, event: Worker.StateChanged):
+        if event.worker.group == "llm" and event.state == WorkerState.ERROR:
+            self.sub_title = ""
+            self.notify(str(event.worker.error), title="LLM error", severity="error")
@@ -1,13 +1,14 @@
 from common.chat_manager import ChatManager
-from common.models import EventLog, EventLogRows, ReadingPalChat
-from common.project_manager import Project
+from common.constants import ChangeKind
+from common.models import EventLogRows, ReadingPalChat, ResourceRow
+from common.notifications import ChangeSubscriber
+from common.project_manager import ProjectOverview
 from configuration.models import ProjectConfigRow
-from django.utils import timezone
+from django.conf import settings
 from textual import events
 from textual.app import ComposeResult
 from textual.css.query import NoMatches
 from textual.message import Message
-from textual.reactive import reactive
 from textual.screen import ModalScreen
 from textual.widgets import DataTable, Footer, Header, Label, RichLog
 from tui.models import AppState
@@ -17,27 +18,57 @@ from tui.widgets.resource import CreateResourceView, ResroucesList
 
 
 class ProjectSummary(DataTable):
+    """A project's resource counts, its resources are loaded a page at a time
+    once the summary is focused and as the cursor reaches the last row."""
+
     class Selected(Message):
         def __init__(self, id: str):
             self.project_id = id
             super().__init__()
 
+    overview: ProjectOverview | None = None
+    loaded = 0
+    last_resource_id: int | None = None
+
     def on_mount(self):
         self.add_columns("ID", "Resources", "Configuration")
 
-    def make_rows(self, c: Project):
-        rows = []
-        if len(c.resources) == 0:
-            rows = [[c.id_for_ui, "[bod][red]Add resources![/]", c.config]]
+    def make_rows(self, c: ProjectOverview):
+        self.overview = c
+        if c.resource_count == 0:
+            resources = "[bod][red]Add resources![/]"
         else:
-            for i, r in enumerate(c.resources):
-                if i == 0:
-                    row = [c.id_for_ui, f"{r.url} -> {r.status}", c.config]
-                else:
-                    row = ["", f"{r.url} -> {r.status}", ""]
-                rows.append(row)
-        for r in rows:
-            self.add_row(*r)
+            resources = ", ".join(
+                f"{count} {status.lower()}"
+                for status, count in c.status_counts.items()
+                if count
+            )
+        self.add_row(c.id_for_ui, resources, c.config)
+
+    def has_more(self) -> bool:
+        return self.overview is not None and self.loaded < self.overview.resource_count
+
+    async def aload_page(self):
+        assert self.overview
+        async for r in ResourceRow.aget_page(
+            self.overview.id_in_db,
+            self.last_resource_id,
+            settings.TUI["resources_page_size"],
+        ):
+            self.add_row("", f"{r.url} -> {r.status}", "")
+            self.last_resource_id = r.id
+            self.loaded += 1
+
+    async def on_focus(self):
+        if self.loaded == 0 and self.has_more():
+            await self.aload_page()
+
+    async def on_data_table_cell_highlighted(self, event: DataTable.CellHighlighted):
+        # the cursor starts on the summary row, which is the last before focus
+        if not self.has_focus or self.loaded == 0:
+            return
+        if event.coordinate.row == self.row_count - 1 and self.has_more():
+            await self.aload_page()
 
     def key_enter(self, event: events.Key) -> None:
         self.post_message(self.Selected(self.id))
@@ -51,7 +82,7 @@ class ProjectView(ModalScreen):
         ("q", "quit_app", "Quit app"),
     ]
 
-    time = reactive(0.0)
+    last_event_id = 0
 
     def action_quit_app(self):
         self.app.exit()
@@ -67,19 +98,34 @@ class ProjectView(ModalScreen):
         yield RichLog(id="event-log", markup=True)
 
     async def on_mount(self):
-        self.set_interval(3, self.update_time)
-        data_table = self.query_resources_list()
-        await data_table.make_rows(AppState.active_project.id_in_db)
+        await self.arecreate_resources_table()
+        await self.acreate_event_log()
+        self.run_worker(self.alisten_for_changes(), exclusive=True)
 
     def query_resources_list(self):
         return self.query_one("#resources-list", ResroucesList)
 
-    def update_time(self):
-        self.time = timezone.now()
-
-    async def watch_time(self):
-        await self.arecreate_resources_table()
-        await self.acreate_event_log()
+    async def alisten_for_changes(self):
+        """Apply the changes pushed by the pipeline workers as they happen."""
+        subscriber = ChangeSubscriber()
+        try:
+            async for change in subscriber:
+                if change.project_id != AppState.active_project.id_in_db:
+                    continue
+                try:
+                    if change.kind == ChangeKind.RESOURCE:
+                        await self.query_resources_list().aapply_changes(
+                            change.entity_ids
+                        )
+                    elif change.kind == ChangeKind.EVENT:
+                        await self.aappend_new_events()
+                    elif change.kind == ChangeKind.CHAT:
+                        await self.query_one(ChatList).ainsert_chats(change.entity_ids)
+                except NoMatches:
+                    # another screen is on top, it's reloaded on resume
+                    pass
+        finally:
+            subscriber.close()
 
     async def action_add_resource(self):
         project_config_row = await ProjectConfigRow.aget_by_project(
@@ -96,18 +142,21 @@ class ProjectView(ModalScreen):
             self.app.push_screen(ConfigMissing())
         else:
             AppState.set_active_readingpal_chat(chat_manager.readingpal_chat)
-            AppState.set_active_djllm_chat(chat_manager.readingpal_chat)
+            AppState.set_active_djllm_chat(chat_manager.djllmchat)
             self.app.push_screen(ChatDetailsView())
 
     async def acreate_event_log(self):
-        events: list[EventLog] = await EventLogRows.aget_logs_for_project(
-            AppState.active_project.id_in_db
-        )
-        event_log = self.query_one(RichLog)
-        event_log.clear()
+        self.query_one(RichLog).clear()
+        self.last_event_id = 0
+        await self.aappend_new_events()
 
-        for e in events:
+    async def aappend_new_events(self):
+        event_log = self.query_one(RichLog)
+        async for e in EventLogRows.aiter_after(
+            AppState.active_project.id_in_db, after_id=self.last_event_id
+        ):
             event_log.write(e.human_readable())
+            self.last_event_id = e.id
 
     async def on_screen_suspend(self):
         self.clear_resources_list()
@@ -118,14 +167,14 @@ class ProjectView(ModalScreen):
         return data_table
 
     async def on_screen_resume(self):
+        # changes pushed while another screen was on top were dropped
         try:
-            self.query_resources_list()
-            return
+            await self.arecreate_resources_table()
+            await self.acreate_event_log()
+            await self.query_one(ChatList).areload()
         except NoMatches:
             pass
 
-        await self.arecreate_resources_table()
-
     async def arecreate_resources_table(self):
         data_table = self.clear_resources_list()
         await data_table.make_rows(AppState.active_project.id_in_db)
@@ -6,6 +6,7 @@ from textual.containers import Grid
 from django.core.validators import URLValidator
 from textual.widgets import Static, Input, Label, DataTable
 from configuration.models import ProjectConfigRow
+from django.conf import settings
 
 from tui.models import AppState
 from tui.widgets.config import ConfigMissing
@@ -34,10 +35,10 @@ class CreateResourceView(ModalScreen):
             self.mount(Static("[red]Invalid URL[/]"))
             return
 
-        project_config_row = await ProjectConfigRow.aget_by_project(
+        project_config = await ProjectConfigRow.aget_config(
             AppState.active_project.id_in_db
         )
-        if not project_config_row:
+        if not project_config:
             self.app.pop_screen()
             self.app.push_screen(ConfigMissing())
             return
@@ -45,7 +46,6 @@ class CreateResourceView(ModalScreen):
         resource = await ProjectManager.aadd_resource(event.value)
         assert resource
 
-        project_config = await project_config_row.ato_obj()
         try:
             await create_resource_processing_pipeline(
                 Event.RESOURCE_CREATED,
@@ -60,14 +60,63 @@ class CreateResourceView(ModalScreen):
 
 
 class ResroucesList(DataTable):
+    """The project's resources, newest first, loaded a page at a time as the
+    cursor reaches the last row."""
+
+    last_resource_id: int | None = None
+    exhausted = False
+
     def on_mount(self):
-        self.add_columns("ID", "Name", "Status", "Error")
+        self.add_column("ID", key="id")
+        self.add_column("Name", key="name")
+        self.add_column("Status", key="status")
+        self.add_column("Error", key="error")
+
+    @staticmethod
+    def row_values(r: ResourceRow) -> tuple:
+        if len(r.url) > 50:
+            url = r.url[:50] + "..."
+        else:
+            url = r.url
+        error_msg = r.error_msg.replace("\n", " ") if r.error_msg else ""
+        return r.id, url, r.status, error_msg
 
     async def make_rows(self, project_id: int):
-        async for r in ResourceRow.aget_all_by_project_id(project_id):
-            if len(r.url) > 50:
-                url = r.url[:50] + "..."
-            else:
-                url = r.url
-            error_msg = r.error_msg.replace("\n", " ") if r.error_msg else ""
-            self.add_row(r.id, url, r.status, error_msg)
+        self.last_resource_id = None
+        self.exhausted = False
+        await self.aload_page(project_id)
+
+    async def aload_page(self, project_id: int):
+        page_size = settings.TUI["resources_page_size"]
+        loaded = 0
+        async for r in ResourceRow.aget_page(
+            project_id, self.last_resource_id, page_size
+        ):
+            loaded += 1
+            self.last_resource_id = r.id
+            if str(r.id) not in self.rows:  # added since by `aapply_changes`
+                self.add_row(*self.row_values(r), key=str(r.id))
+        self.exhausted = loaded < page_size
+
+    async def on_data_table_cell_highlighted(self, event: DataTable.CellHighlighted):
+        if event.coordinate.row == self.row_count - 1 and not self.exhausted:
+            await self.aload_page(AppState.active_project.id_in_db)
+
+    async def aapply_changes(self, resource_ids):
+        """Update only the rows of the resources that changed.
+
+        New resources are added in id order; those older than the loaded
+        pages are left for `aload_page`.
+        """
+        added = False
+        async for r in ResourceRow.aget_by_ids(resource_ids):
+            _, url, status, error_msg = self.row_values(r)
+            if str(r.id) in self.rows:
+                self.update_cell(str(r.id), "name", url)
+                self.update_cell(str(r.id), "status", status)
+                self.update_cell(str(r.id), "error", error_msg)
+            elif self.exhausted or r.id > (self.last_resource_id or 0):
+                self.add_row(*self.row_values(r), key=str(r.id))
+                added = True
+        if added:
+            self.sort("id", reverse=True)